@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+正文提取方式基准测试
+
+在本地生成一篇大文章页面（结构与微信文章页一致），分别用两种方式提取：
+1. legacy：通过WebDriver逐元素取值，innerHTML 传回后用 BeautifulSoup 重新解析
+2. js：页面内一次性提取标题、正文HTML、正文文本和图片属性
+
+输出每种方式的平均耗时，并检查两者的正文文本和图片列表是否一致。
+需要本机可用的Chrome和ChromeDriver。
+
+用法:
+    python benchmarks/bench_extraction.py --paragraphs 3000 --images 200 --repeat 5
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from weixin_spider_simple import WeixinSpiderWithImages
+
+
+def build_article_html(paragraphs: int, images: int) -> str:
+    """生成测试用的大文章页面"""
+    body = []
+    image_every = max(1, paragraphs // max(images, 1))
+    image_index = 0
+    for i in range(paragraphs):
+        if i % 50 == 0:
+            body.append(f"<h2>第 {i // 50 + 1} 节 小标题</h2>")
+        body.append(
+            f"<p><span style='color:#333'>第 {i + 1} 段：人工智能与&nbsp;大模型 "
+            f"<strong>重点内容 {i}</strong> 以及 <a href='#'>链接</a> 的说明文字。</span></p>"
+        )
+        if i % image_every == 0 and image_index < images:
+            image_index += 1
+            body.append(
+                f"<p><img data-src='https://mmbiz.qpic.cn/mmbiz_png/bench/{image_index}/640' "
+                f"alt='图{image_index}' src='data:image/gif;base64,R0lGODlhAQABAAAAACw='></p>"
+            )
+        if i % 200 == 0:
+            body.append("<ul><li>要点一</li><li>要点二</li></ul><script>var x = 1;</script><style>p{}</style>")
+
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>bench</title></head>
+<body>
+<h1 class="rich_media_title" id="activity-name">基准测试文章标题</h1>
+<a id="js_name">测试公众号</a><em id="publish_time">2024-01-01</em>
+<div class="rich_media_content" id="js_content">{''.join(body)}</div>
+</body></html>"""
+
+
+def time_extraction(spider: WeixinSpiderWithImages, mode: str, repeat: int):
+    """重复提取并返回 (耗时列表, 最后一次的结果)"""
+    spider.extract_mode = mode
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = spider._extract_article_content()
+        timings.append(time.perf_counter() - started)
+    return timings, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="正文提取方式基准测试")
+    parser.add_argument("--paragraphs", type=int, default=3000, help="段落数量")
+    parser.add_argument("--images", type=int, default=200, help="图片数量")
+    parser.add_argument("--repeat", type=int, default=5, help="每种方式重复次数")
+    args = parser.parse_args()
+
+    html = build_article_html(args.paragraphs, args.images)
+    with tempfile.NamedTemporaryFile("w", suffix=".html", encoding="utf-8", delete=False) as f:
+        f.write(html)
+        page_path = f.name
+    print(f"测试页面: {len(html.encode('utf-8')) / 1024:.0f} KB, {args.paragraphs} 段, {args.images} 张图片")
+
+    spider = WeixinSpiderWithImages(headless=True, download_images=True)
+    try:
+        spider.driver.get("file://" + page_path)
+
+        results = {}
+        for mode in ("legacy", "js"):
+            timings, result = time_extraction(spider, mode, args.repeat)
+            results[mode] = result
+            print(f"{mode:>7}: 平均 {statistics.mean(timings) * 1000:.1f} ms, "
+                  f"最快 {min(timings) * 1000:.1f} ms（{args.repeat} 次）")
+
+        legacy, fast = results["legacy"], results["js"]
+        print(f"正文文本一致: {legacy['content_text'] == fast['content_text']}")
+        print(f"图片列表一致: {[img['url'] for img in legacy['images']] == [img['url'] for img in fast['images']]}")
+    finally:
+        spider.close()
+        os.remove(page_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+正文文本提取器基准测试
+
+对已保存文章的正文HTML（articles/ 下JSON文件中的 content_html）分别用各个文本提取器
+转换为纯文本，输出平均耗时和相对BeautifulSoup的加速比，并检查输出是否与BeautifulSoup一致。
+没有已保存的文章时使用生成的大文章页面。不需要浏览器。
+
+用法:
+    python benchmarks/bench_html_to_text.py --articles-dir articles --repeat 5
+"""
+
+import argparse
+import glob
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from weixin_spider_simple import TEXT_EXTRACTORS
+
+from bench_extraction import build_article_html
+
+
+def load_recorded_html(articles_dir: str):
+    """读取已保存文章的正文HTML"""
+    samples = []
+    for path in sorted(glob.glob(os.path.join(articles_dir, "**", "*.json"), recursive=True)):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if isinstance(data, dict) and data.get("content_html"):
+            samples.append(data["content_html"])
+    return samples
+
+
+def generated_content_html(paragraphs: int) -> str:
+    """生成大文章页面并取出正文容器的innerHTML（与爬取时的 content_html 一致）"""
+    page = build_article_html(paragraphs, paragraphs // 15)
+    start = page.index('id="js_content">') + len('id="js_content">')
+    return page[start:page.rindex("</div>")]
+
+
+def time_extractor(extractor, samples, repeat: int):
+    """重复提取全部样本并返回 (耗时列表, 最后一次的结果)"""
+    timings = []
+    results = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        results = [extractor(html) for html in samples]
+        timings.append(time.perf_counter() - started)
+    return timings, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="正文文本提取器基准测试")
+    parser.add_argument("--articles-dir", default="articles", help="已保存文章的目录")
+    parser.add_argument("--paragraphs", type=int, default=3000, help="无已保存文章时生成页面的段落数量")
+    parser.add_argument("--repeat", type=int, default=5, help="每个提取器重复次数")
+    args = parser.parse_args()
+
+    samples = load_recorded_html(args.articles_dir)
+    if samples:
+        print(f"已保存文章: {len(samples)} 篇")
+    else:
+        samples = [generated_content_html(args.paragraphs)]
+        print(f"未找到已保存文章，使用生成页面（{args.paragraphs} 段）")
+    print(f"正文HTML共 {sum(len(html.encode('utf-8')) for html in samples) / 1024:.0f} KB")
+
+    results = {}
+    means = {}
+    for name, extractor in TEXT_EXTRACTORS.items():
+        timings, results[name] = time_extractor(extractor, samples, args.repeat)
+        means[name] = statistics.mean(timings)
+        print(f"{name:>5}: 平均 {means[name] * 1000:.1f} ms, 最快 {min(timings) * 1000:.1f} ms（{args.repeat} 次）")
+
+    for name in TEXT_EXTRACTORS:
+        if name == "bs4":
+            continue
+        print(f"{name} 相对 bs4 加速 {means['bs4'] / means[name]:.1f} 倍，"
+              f"输出一致: {results[name] == results['bs4']}")
+
+
+if __name__ == "__main__":
+    main()
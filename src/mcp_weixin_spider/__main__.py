@@ -7,6 +7,8 @@ MCP微信爬虫模块入口点
 1. python3 -m mcp_weixin_spider.server  # 启动MCP服务器
 2. python3 -m mcp_weixin_spider         # 默认启动MCP服务器
 3. python3 -m mcp_weixin_spider.client  # 启动客户端演示
+4. python3 -m mcp_weixin_spider batch urls.txt --workers 4  # 多进程批量爬取
+5. python3 -m mcp_weixin_spider export                       # 增量导出列式语料
 """
 
 import sys
@@ -34,9 +36,17 @@ def main():
             from client import InteractiveClient
             client = InteractiveClient()
             asyncio.run(client.run())
+        elif mode == "batch":
+            # 多进程批量爬取，不启动MCP服务器
+            from batch import main as batch_main
+            sys.exit(batch_main(sys.argv[2:]))
+        elif mode == "export":
+            # 增量导出列式语料，不启动MCP服务器
+            from export import main as export_main
+            sys.exit(export_main(sys.argv[2:]))
         else:
             print(f"未知模式: {mode}")
-            print("可用模式: server, client, interactive")
+            print("可用模式: server, client, interactive, batch, export")
             sys.exit(1)
     else:
         # 默认启动MCP服务器
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+公众号/合集增量同步
+
+按公众号入口（合集页 mp/appmsgalbum 或 __biz 主页）遍历文章列表，
+为每个入口保存检查点（已取到的最新发布时间、补齐更早文章的游标、已见文章），
+再次同步时只返回检查点之后的新文章，由调用方送入正常的爬取流程。
+提交了爬取任务的文章在任务完成前保留在检查点的 pending 中，任务失败时下次同步重新提交。
+"""
+
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from storage import canonicalize_url, make_article_id
+
+logger = logging.getLogger(__name__)
+
+ALBUM_API = "https://mp.weixin.qq.com/mp/appmsgalbum"
+
+# 合集接口每页文章数
+ALBUM_PAGE_SIZE = 10
+
+# 最多保存的已见文章ID数量（主页入口没有发布时间，只能按文章去重）
+MAX_SEEN_IDS = 2000
+
+# 爬取任务失败的文章最多重新提交的次数
+MAX_RESUBMITS = 3
+
+# 合集接口的一页：(文章列表, 是否还有下一页)
+AlbumPage = Tuple[List[Dict[str, Any]], bool]
+
+
+def parse_account_entry(entry_url: str) -> Dict[str, str]:
+    """
+    解析公众号入口URL
+
+    Args:
+        entry_url: 合集页URL（含 __biz 和 album_id）或公众号主页URL（含 __biz）
+
+    Returns:
+        {"kind": "album"/"profile", "biz", "album_id", "key", "url"}
+
+    Raises:
+        ValueError: 无法识别的入口
+    """
+    parsed = urlparse(entry_url.strip())
+    if parsed.hostname != "mp.weixin.qq.com":
+        raise ValueError("入口必须是 mp.weixin.qq.com 的合集页或公众号主页URL")
+
+    query = parse_qs(parsed.query)
+    biz = (query.get("__biz") or [""])[0]
+    album_id = (query.get("album_id") or [""])[0]
+    if not biz:
+        raise ValueError("入口URL缺少 __biz 参数")
+
+    if "appmsgalbum" in parsed.path and album_id:
+        return {"kind": "album", "biz": biz, "album_id": album_id,
+                "key": f"album:{biz}:{album_id}", "url": entry_url}
+    return {"kind": "profile", "biz": biz, "album_id": "", "key": f"profile:{biz}", "url": entry_url}
+
+
+class AccountSyncer:
+    """
+    公众号增量同步器
+
+    合集入口通过HTTP接口按页读取文章列表；公众号主页需要微信客户端凭证才能调用
+    列表接口，因此使用浏览器打开入口页面并收集其中的文章链接。
+    """
+
+    def __init__(self, checkpoint_path: str, session_getter: Callable[[], Any],
+                 link_collector: Optional[Callable[[str], List[Dict[str, Any]]]] = None,
+                 job_status: Optional[Callable[[str], Optional[str]]] = None):
+        """
+        初始化同步器
+
+        Args:
+            checkpoint_path: 检查点文件路径
+            session_getter: 返回 requests.Session 的函数，用于调用合集接口
+            link_collector: 用浏览器打开入口并返回 [{"url", "title"}] 的函数，用于主页入口
+            job_status: 返回爬取任务状态（queued/running/done/failed，不存在时为None）的函数，
+                用于确认已提交的文章是否爬取完成
+        """
+        self.checkpoint_path = checkpoint_path
+        self.session_getter = session_getter
+        self.link_collector = link_collector
+        self.job_status = job_status
+        self._checkpoints: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        """从磁盘加载检查点"""
+        if not os.path.exists(self.checkpoint_path):
+            return
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                self._checkpoints = json.load(f).get("accounts", {})
+        except Exception as e:
+            logger.error(f"加载同步检查点失败: {e}")
+
+    def _save(self):
+        """将检查点写回磁盘（先写临时文件再替换）"""
+        os.makedirs(os.path.dirname(self.checkpoint_path) or ".", exist_ok=True)
+        temp_path = self.checkpoint_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"accounts": self._checkpoints}, f, ensure_ascii=False)
+        os.replace(temp_path, self.checkpoint_path)
+
+    def get_checkpoint(self, key: str) -> Dict[str, Any]:
+        """获取入口的检查点副本"""
+        with self._lock:
+            return dict(self._checkpoints.get(key, {}))
+
+    @staticmethod
+    def _summarize(state: Dict[str, Any]) -> Dict[str, Any]:
+        """检查点摘要：不含已见文章列表，待完成文章只给出数量"""
+        summary = {k: v for k, v in state.items() if k not in ("seen_ids", "pending")}
+        summary["pending"] = len(state.get("pending", {}))
+        return summary
+
+    def list_checkpoints(self) -> Dict[str, Dict[str, Any]]:
+        """获取全部检查点（不含已见文章列表）"""
+        with self._lock:
+            return {key: self._summarize(state) for key, state in self._checkpoints.items()}
+
+    def _fetch_album_page(self, biz: str, album_id: str,
+                          cursor: Optional[Tuple[str, str]]) -> AlbumPage:
+        """
+        读取合集的一页文章
+
+        Returns:
+            (文章列表, 是否还有下一页)
+        """
+        params = {
+            "action": "getalbum",
+            "__biz": biz,
+            "album_id": album_id,
+            "count": ALBUM_PAGE_SIZE,
+            "f": "json",
+        }
+        if cursor:
+            params["begin_msgid"], params["begin_itemidx"] = cursor
+
+        response = self.session_getter().get(ALBUM_API, params=params, timeout=30)
+        response.raise_for_status()
+        data = response.json()
+
+        ret = (data.get("base_resp") or {}).get("ret", 0)
+        if ret != 0:
+            raise RuntimeError(f"合集接口返回错误: ret={ret}")
+
+        resp = data.get("getalbum_resp") or {}
+        items = resp.get("article_list") or []
+        if isinstance(items, dict):
+            # 只有一篇文章时接口返回对象而不是列表
+            items = [items]
+
+        articles = []
+        for item in items:
+            url = (item.get("url") or "").replace("http://", "https://", 1)
+            if not url:
+                continue
+            articles.append({
+                "url": url,
+                "title": item.get("title", ""),
+                "create_time": int(item.get("create_time") or 0),
+                "cursor": [str(item.get("msgid", "")), str(item.get("itemidx", ""))],
+            })
+        return articles, str(resp.get("continue_flag", "0")) == "1"
+
+    def _iter_album(self, biz: str, album_id: str, cursor: Optional[Tuple[str, str]],
+                    first_page: Optional[AlbumPage] = None) -> Iterator[List[Dict[str, Any]]]:
+        """逐页遍历合集，first_page 为已读取的起始页（_fetch_album_page 的返回值）"""
+        while True:
+            if first_page is not None:
+                (articles, has_more), first_page = first_page, None
+            else:
+                articles, has_more = self._fetch_album_page(biz, album_id, cursor)
+            if articles:
+                yield articles
+            if not has_more or not articles:
+                return
+            cursor = tuple(articles[-1]["cursor"])
+
+    def _walk_album(self, entry: Dict[str, str], cursor: Optional[Tuple[str, str]], until: int,
+                    seen: set, budget: int,
+                    first_page: Optional[AlbumPage] = None) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        从游标处按列表顺序向后读取未见过的文章
+
+        Args:
+            entry: 合集入口
+            cursor: 起始游标，None 表示从头读取
+            until: 遇到发布时间早于该值的文章时停止（倒序合集中之后的文章都已取过）
+            seen: 已见文章ID，同一时间发布的多篇文章按ID去重
+            budget: 最多读取的文章数量
+            first_page: 游标处已读取的一页，传入时不再重复请求
+
+        Returns:
+            (文章列表, 是否已读到 until 或合集末尾)
+        """
+        articles = []
+        for page in self._iter_album(entry["biz"], entry["album_id"], cursor, first_page):
+            for article in page:
+                if article["create_time"] < until:
+                    return articles, True
+                if make_article_id(article["url"]) in seen:
+                    continue
+                if len(articles) >= budget:
+                    return articles, False
+                articles.append(article)
+        return articles, True
+
+    def _sync_album(self, entry: Dict[str, str], state: Dict[str, Any],
+                    max_articles: int) -> List[Dict[str, Any]]:
+        """
+        同步合集，返回按发布时间升序的新文章
+
+        按正序排列的合集从上次保存的游标继续向后读取。
+        按倒序排列的合集分两部分读取，开销都只与本次取到的文章数量成正比：
+        1. 从头读取晚于 high_water（已取到的最新发布时间）的新文章，最多 max_articles 篇；
+           未读到 high_water 就用完数量时，剩余部分记为一段待补齐区间
+        2. 用剩余数量从各待补齐区间（backfill，每段为游标和下限）的游标处继续向后读取
+        """
+        seen = set(state.get("seen_ids", []))
+        order = state.get("order")
+        # 判断顺序时读取的第一页在之后从头读取时复用
+        first_page = None
+        if order is None:
+            first_page = self._fetch_album_page(entry["biz"], entry["album_id"], None)
+            head = first_page[0]
+            if len(head) > 1 and head[0]["create_time"] != head[-1]["create_time"]:
+                order = state["order"] = "desc" if head[0]["create_time"] > head[-1]["create_time"] else "asc"
+
+        if order == "asc":
+            cursor = tuple(state["cursor"]) if state.get("cursor") else None
+            new_articles, _ = self._walk_album(entry, cursor, 0, seen, max_articles,
+                                               first_page if cursor is None else None)
+            if new_articles:
+                state["cursor"] = new_articles[-1]["cursor"]
+                state["high_water"] = max(state.get("high_water", 0), new_articles[-1]["create_time"])
+            return new_articles
+
+        # 倒序（或尚无法判断顺序）：先取新文章
+        high_water = state.get("high_water", 0)
+        backfill = state.get("backfill", [])
+        new_articles, reached = self._walk_album(entry, None, high_water, seen, max_articles, first_page)
+        if new_articles:
+            state["high_water"] = max(high_water, new_articles[0]["create_time"])
+            if not reached:
+                backfill.append({"cursor": new_articles[-1]["cursor"], "until": high_water})
+
+        # 再补齐之前未读完的区间
+        for gap in list(backfill):
+            budget = max_articles - len(new_articles)
+            if budget <= 0:
+                break
+            seen.update(make_article_id(article["url"]) for article in new_articles)
+            articles, reached = self._walk_album(entry, tuple(gap["cursor"]), gap["until"], seen, budget)
+            new_articles.extend(articles)
+            if reached:
+                backfill.remove(gap)
+            elif articles:
+                gap["cursor"] = articles[-1]["cursor"]
+        state["backfill"] = backfill
+
+        new_articles.sort(key=lambda article: article["create_time"])
+        return new_articles
+
+    def _sync_profile(self, entry: Dict[str, str], state: Dict[str, Any],
+                      max_articles: int) -> List[Dict[str, Any]]:
+        """同步公众号主页，按已见文章去重"""
+        if self.link_collector is None:
+            raise RuntimeError("公众号主页入口需要浏览器支持")
+
+        seen = set(state.get("seen_ids", []))
+        new_articles = []
+        for link in self.link_collector(entry["url"]):
+            article_id = make_article_id(link["url"])
+            if article_id in seen:
+                continue
+            seen.add(article_id)
+            new_articles.append({"url": link["url"], "title": link.get("title", ""), "create_time": 0})
+            if len(new_articles) >= max_articles:
+                break
+
+        # 主页按时间倒序展示，反转后按发布顺序送入爬取流程
+        new_articles.reverse()
+        return new_articles
+
+    def _check_pending(self, state: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        检查已提交文章的爬取任务，移除已完成的文章
+
+        Returns:
+            任务失败或已不存在、需要重新提交的文章
+        """
+        pending = state.get("pending", {})
+        if self.job_status is None:
+            return []
+
+        resubmit = []
+        for article_id, article in list(pending.items()):
+            status = self.job_status(article["job_id"])
+            if status == "done":
+                del pending[article_id]
+                state["synced_count"] = state.get("synced_count", 0) + 1
+            elif status in ("queued", "running"):
+                continue
+            elif article.get("resubmits", 0) >= MAX_RESUBMITS:
+                del pending[article_id]
+                state["abandoned_count"] = state.get("abandoned_count", 0) + 1
+                logger.warning(f"文章多次爬取失败，不再提交: {article['url']}")
+            else:
+                resubmit.append(article)
+        return resubmit
+
+    def sync(self, entry_url: str, max_articles: int = 50,
+             submit: Optional[Callable[[str], str]] = None) -> Dict[str, Any]:
+        """
+        同步一个入口，返回检查点之后的新文章并推进检查点
+
+        提供 submit 时每篇文章提交为爬取任务；同步器有 job_status 时文章保留在检查点的
+        pending 中，直到任务完成，任务失败的文章在之后的同步中重新提交（最多 MAX_RESUBMITS 次）。
+        否则返回的文章即视为同步完成。
+
+        Args:
+            entry_url: 合集页或公众号主页URL
+            max_articles: 本次最多返回的文章数量（含重新提交的文章），其余留待下次同步
+            submit: 提交爬取任务的函数 submit(url) -> 任务ID
+
+        Returns:
+            {"key", "kind", "new_articles": [{"url", "title", "create_time", "job_id"}], "checkpoint"}
+        """
+        entry = parse_account_entry(entry_url)
+        state = self.get_checkpoint(entry["key"])
+        state["pending"] = pending = dict(state.get("pending", {}))
+
+        resubmit = self._check_pending(state)[:max_articles]
+        budget = max_articles - len(resubmit)
+        if budget <= 0:
+            new_articles = []
+        elif entry["kind"] == "album":
+            new_articles = self._sync_album(entry, state, budget)
+        else:
+            new_articles = self._sync_profile(entry, state, budget)
+
+        seen_ids = state.get("seen_ids", [])
+        seen_ids.extend(make_article_id(article["url"]) for article in new_articles)
+        state["seen_ids"] = seen_ids[-MAX_SEEN_IDS:]
+
+        delivered = []
+        for article in resubmit + new_articles:
+            item = {"url": canonicalize_url(article["url"]), "title": article["title"],
+                    "create_time": article["create_time"], "job_id": None}
+            if submit is not None:
+                item["job_id"] = submit(item["url"])
+            if item["job_id"] and self.job_status is not None:
+                previous = pending.get(make_article_id(item["url"]))
+                pending[make_article_id(item["url"])] = dict(
+                    item, resubmits=previous["resubmits"] + 1 if previous else 0
+                )
+            else:
+                state["synced_count"] = state.get("synced_count", 0) + 1
+            delivered.append(item)
+
+        state["entry_url"] = entry_url
+        state["last_sync"] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+        with self._lock:
+            self._checkpoints[entry["key"]] = state
+            try:
+                self._save()
+            except Exception as e:
+                logger.error(f"保存同步检查点失败: {e}")
+
+        logger.info(f"同步 {entry['key']}: 发现 {len(new_articles)} 篇新文章，重新提交 {len(resubmit)} 篇")
+        return {
+            "key": entry["key"],
+            "kind": entry["kind"],
+            "new_articles": delivered,
+            "checkpoint": self._summarize(state),
+        }
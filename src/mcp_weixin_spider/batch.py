@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多进程批量爬取
+
+不经过MCP服务器，直接用多个工作进程爬取URL列表：
+1. URL按轮转方式分片，每个工作进程拥有独立的爬虫实例（独立的Chrome），
+   指定 --tabs 时每个Chrome用多个标签页并发爬取
+2. 工作进程通过队列把结果流式发回主进程
+3. 主进程把结果逐行写为JSONL，并登记到文章存储和相似文章索引
+4. 结束时输出总吞吐量
+
+用法:
+    python -m mcp_weixin_spider batch urls.txt --workers 4 --output results.jsonl
+    python -m mcp_weixin_spider batch urls.txt --workers 2 --tabs 4
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from storage import ArticleStore, make_article_id
+from similarity import SimHashIndex, simhash
+from keywords import CorpusKeywordIndex
+from urls import load_urls
+
+logger = logging.getLogger(__name__)
+
+# 项目根目录（爬虫模块与文章目录所在位置，与服务器保持一致）
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ARTICLES_DIR = os.path.join(project_root, "articles")
+
+# 只在主进程使用、不写入JSONL的字段
+_PRIVATE_FIELDS = ("fingerprint", "content_text", "statistics")
+
+
+def shard_urls(urls: List[str], workers: int) -> List[List[str]]:
+    """
+    将URL轮转分配给各工作进程
+
+    Args:
+        urls: URL列表
+        workers: 工作进程数量
+
+    Returns:
+        每个工作进程的URL列表（去掉空分片）
+    """
+    return [shard for shard in (urls[i::workers] for i in range(workers)) if shard]
+
+
+def _crawl_sequential(spider, urls: List[str]) -> Iterator[Tuple[str, Optional[Dict[str, Any]], Optional[Exception]]]:
+    """使用单个爬虫实例依次爬取，结果格式与 TabPoolCrawler.crawl 相同"""
+    for url in urls:
+        try:
+            article_data = spider.crawl_article_by_url(url)
+            if not article_data:
+                raise RuntimeError("无法获取文章内容")
+            yield url, article_data, None
+        except Exception as e:
+            yield url, None, e
+
+
+def _worker(worker_index: int, urls: List[str], options: Dict[str, Any], result_queue):
+    """
+    工作进程：创建自己的爬虫实例并爬取分到的URL
+
+    tabs 大于1时在同一个Chrome中用多个标签页并发爬取，否则依次爬取。
+    每个URL发送一条 ("result", 记录)，结束时发送 ("done", 工作进程序号)。
+    """
+    if project_root not in sys.path:
+        sys.path.append(project_root)
+
+    tabs = options.get("tabs", 1)
+    try:
+        if tabs > 1:
+            from tab_pool import TabPoolCrawler
+            crawler = TabPoolCrawler(
+                tabs=tabs,
+                headless=options.get("headless", True),
+                wait_time=options.get("wait_time", 10),
+                download_images=options.get("download_images", True),
+                compression=options.get("compression")
+            )
+            spider = crawler.spider
+            results = crawler.crawl(urls)
+        else:
+            from weixin_spider_simple import WeixinSpiderWithImages
+            crawler = spider = WeixinSpiderWithImages(
+                headless=options.get("headless", True),
+                wait_time=options.get("wait_time", 10),
+                download_images=options.get("download_images", True),
+                compression=options.get("compression")
+            )
+            results = _crawl_sequential(spider, urls)
+    except Exception as e:
+        # 浏览器无法启动时，分片内的URL全部记为失败，保证输出覆盖每个URL
+        for url in urls:
+            result_queue.put(("result", {
+                "url": url, "worker": worker_index, "status": "error",
+                "error_type": "worker_failed", "error": f"爬虫初始化失败: {e}"
+            }))
+        result_queue.put(("done", worker_index))
+        return
+
+    try:
+        # 并发模式下结果按完成顺序返回，elapsed 为距上一条结果的时间
+        started = time.time()
+        for url, article_data, error in results:
+            record = {"url": url, "worker": worker_index, "article_id": make_article_id(url)}
+            try:
+                if error is not None:
+                    raise error
+                article_data["article_id"] = record["article_id"]
+                if not spider.save_article_to_file(article_data, options.get("custom_filename")):
+                    raise RuntimeError("保存文件时出错")
+
+                content_text = article_data.get("content_text", "")
+                record.update({
+                    "status": "success",
+                    "title": article_data.get("title", ""),
+                    "author": article_data.get("author", ""),
+                    "publish_time": article_data.get("publish_time", ""),
+                    "crawl_time": article_data.get("crawl_time", ""),
+                    "content_length": len(content_text),
+                    "images_count": len(article_data.get("images", [])),
+                    "files": article_data.get("files"),
+                    "statistics": article_data.get("statistics"),
+                    "timings": article_data.get("timings"),
+                    "images_pending": bool(article_data.get("images_pending")),
+                    "fingerprint": simhash(content_text),
+                    "content_text": content_text,
+                })
+            except Exception as e:
+                record.update({
+                    "status": "error",
+                    "error_type": getattr(e, "reason", "crawl_failed"),
+                    "error": str(e)
+                })
+            record["elapsed"] = round(time.time() - started, 3)
+            started = time.time()
+            result_queue.put(("result", record))
+    except Exception as e:
+        # 浏览器整体失效时剩余URL由主进程记为失败
+        logger.error(f"工作进程 {worker_index} 出错: {e}")
+    finally:
+        try:
+            crawler.close()
+        except Exception as e:
+            logger.warning(f"关闭爬虫实例时出错: {e}")
+        result_queue.put(("done", worker_index))
+
+
+class BatchCrawler:
+    """
+    多进程批量爬取器
+
+    每个工作进程持有一个爬虫实例；主进程负责汇总结果、写JSONL和登记文章。
+    """
+
+    def __init__(self, workers: int = 2, download_images: bool = True, headless: bool = True,
+                 wait_time: int = 10, articles_dir: str = ARTICLES_DIR, tabs: int = 1):
+        """
+        初始化批量爬取器
+
+        Args:
+            workers: 工作进程数量
+            download_images: 是否下载图片
+            headless: 是否使用无头浏览器
+            wait_time: 页面等待时间（秒）
+            articles_dir: 文章目录（用于登记文章存储和相似文章索引）
+            tabs: 每个工作进程的并发标签页数量，大于1时一个Chrome同时爬取多篇文章
+        """
+        self.workers = max(1, workers)
+        # 与MCP服务器写入同一文章目录，正文HTML同样压缩单独保存
+        self.options = {"download_images": download_images, "headless": headless, "wait_time": wait_time,
+                        "tabs": max(1, tabs), "compression": "gzip"}
+        self.articles_dir = articles_dir
+
+    def _register(self, record: Dict[str, Any], store: ArticleStore, similarity_index: SimHashIndex,
+                  keyword_index: CorpusKeywordIndex):
+        """将成功的结果登记到文章存储、相似文章索引和关键词索引"""
+        try:
+            article_id = store.register(record)
+            similarity_index.add(article_id, record.get("fingerprint") or 0)
+            keyword_index.add_document(article_id, record.get("content_text", ""))
+        except Exception as e:
+            logger.warning(f"登记文章失败 {record['url']}: {e}")
+
+    def run(self, urls: List[str], output: TextIO) -> Dict[str, Any]:
+        """
+        批量爬取URL
+
+        Args:
+            urls: URL列表
+            output: JSONL输出流，每完成一篇写入一行
+
+        Returns:
+            汇总信息：总数、成功/失败数量、耗时和吞吐量
+        """
+        shards = shard_urls(urls, self.workers)
+        store = ArticleStore(self.articles_dir)
+        similarity_index = SimHashIndex(os.path.join(self.articles_dir, "simhash_index.json"))
+        keyword_index = CorpusKeywordIndex(os.path.join(self.articles_dir, "keyword_df.json"))
+
+        # 浏览器驱动持有线程和子进程，使用spawn启动干净的工作进程
+        context = multiprocessing.get_context("spawn")
+        result_queue = context.Queue()
+        processes = [
+            context.Process(target=_worker, args=(index, shard, self.options, result_queue),
+                            name=f"batch-worker-{index}", daemon=True)
+            for index, shard in enumerate(shards)
+        ]
+
+        started = time.time()
+        for process in processes:
+            process.start()
+        logger.info(f"批量爬取开始: {len(urls)} 个URL，{len(processes)} 个工作进程")
+
+        summary = {"total": len(urls), "succeeded": 0, "failed": 0, "workers": len(processes)}
+        pending = set(range(len(processes)))
+        reported = set()
+        while pending:
+            try:
+                kind, payload = result_queue.get(timeout=5)
+            except queue.Empty:
+                # 工作进程异常退出（如浏览器崩溃导致进程被杀）时不再等待
+                for index in list(pending):
+                    if not processes[index].is_alive():
+                        logger.error(f"工作进程 {index} 异常退出: exitcode={processes[index].exitcode}")
+                        pending.discard(index)
+                continue
+
+            if kind == "done":
+                pending.discard(payload)
+                continue
+
+            reported.add(payload["url"])
+            if payload["status"] == "success":
+                summary["succeeded"] += 1
+                self._register(payload, store, similarity_index, keyword_index)
+            else:
+                summary["failed"] += 1
+
+            line = {key: value for key, value in payload.items() if key not in _PRIVATE_FIELDS}
+            output.write(json.dumps(line, ensure_ascii=False) + "\n")
+            output.flush()
+
+            done = summary["succeeded"] + summary["failed"]
+            elapsed = time.time() - started
+            logger.info(f"[{done}/{len(urls)}] {payload['status']} {payload['url']}（{done / elapsed * 60:.1f} 篇/分钟）")
+
+        for process in processes:
+            process.join(timeout=10)
+        keyword_index.flush()
+        similarity_index.flush()
+
+        # 异常退出的工作进程未报告的URL也记为失败
+        for url in urls:
+            if url not in reported:
+                summary["failed"] += 1
+                output.write(json.dumps({
+                    "url": url, "status": "error", "error_type": "worker_failed", "error": "工作进程异常退出"
+                }, ensure_ascii=False) + "\n")
+        output.flush()
+
+        elapsed = time.time() - started
+        summary["elapsed_seconds"] = round(elapsed, 2)
+        summary["articles_per_minute"] = round(summary["succeeded"] / elapsed * 60, 2) if elapsed > 0 else 0.0
+        return summary
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """创建批量模式的命令行参数解析器"""
+    parser = argparse.ArgumentParser(
+        prog="python -m mcp_weixin_spider batch",
+        description="多进程批量爬取微信公众号文章，结果以JSONL格式输出"
+    )
+    parser.add_argument("urls_file", help="URL列表文件，每行一个URL，\"-\" 表示标准输入")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="工作进程数量（每个进程一个Chrome），默认CPU核数的一半")
+    parser.add_argument("--output", "-o", default="-", help="JSONL输出文件，默认标准输出")
+    parser.add_argument("--tabs", type=int, default=1,
+                        help="每个工作进程在同一个Chrome中并发的标签页数量，默认1（不使用多标签页）")
+    parser.add_argument("--no-images", action="store_true", help="不下载图片")
+    parser.add_argument("--show-browser", action="store_true", help="显示浏览器窗口（调试用）")
+    parser.add_argument("--wait-time", type=int, default=10, help="页面等待时间（秒）")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """批量模式入口"""
+    args = create_parser().parse_args(argv)
+
+    # 日志输出到标准错误，标准输出只用于JSONL结果
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        stream=sys.stderr
+    )
+
+    urls = load_urls(args.urls_file)
+    if not urls:
+        print("URL列表为空", file=sys.stderr)
+        return 1
+
+    crawler = BatchCrawler(
+        workers=args.workers,
+        download_images=not args.no_images,
+        headless=not args.show_browser,
+        wait_time=args.wait_time,
+        tabs=args.tabs
+    )
+
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        summary = crawler.run(urls, output)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    # 汇总信息输出到标准错误，不混入JSONL
+    print(json.dumps(summary, ensure_ascii=False), file=sys.stderr)
+    return 0 if summary["failed"] == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
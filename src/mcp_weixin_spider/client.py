@@ -15,12 +15,21 @@ import asyncio
 import json
 import logging
 import sys
+import time
+from contextlib import AsyncExitStack
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+import anyio
 
 # 导入MCP客户端相关模块
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
+from mcp.shared.exceptions import McpError
+from mcp.types import CONNECTION_CLOSED
+
+# 会话连接中断时抛出的传输层异常
+_TRANSPORT_ERRORS = (anyio.ClosedResourceError, anyio.BrokenResourceError, anyio.EndOfStream, ConnectionError)
 
 # 配置日志
 logging.basicConfig(
@@ -39,51 +48,155 @@ class MCPWeixinClient:
     - 管理客户端会话
     - 调用MCP工具
     - 处理用户交互
+    
+    连接建立后会话一直保持（服务器进程和其中的浏览器只启动一次），直到 close_session。
+    会话由一个后台任务持有：stdio_client 和 ClientSession 的上下文在该任务中进入和退出，
+    其他任务可以同时在同一个会话上调用工具。连接中断时自动重连并重试一次。
+    
+    用法：
+        async with MCPWeixinClient("server.py") as client:
+            await client.crawl_article(url)
     """
     
-    def __init__(self, server_script_path: str):
+    def __init__(self, server_script_path: str, max_reconnects: int = 3):
         """
         初始化MCP客户端
         
         Args:
             server_script_path: MCP服务器脚本路径
+            max_reconnects: 连接失败时的最大重试次数
         """
         self.server_script_path = server_script_path
+        self.max_reconnects = max_reconnects
         self.session: Optional[ClientSession] = None
         self.server_params: Optional[StdioServerParameters] = None
         self.available_tools: List[Dict[str, Any]] = []
+        self._owner_task: Optional[asyncio.Task] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self._connect_lock: Optional[asyncio.Lock] = None
+        # 每次建立连接加一，用于判断调用失败后是否已被其他任务重连
+        self._generation = 0
+    
+    async def __aenter__(self) -> "MCPWeixinClient":
+        if not await self.connect_to_server():
+            raise ConnectionError(f"无法连接到MCP服务器: {self.server_script_path}")
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close_session()
+    
+    @property
+    def connected(self) -> bool:
+        """会话是否处于连接状态"""
+        return self.session is not None and self._owner_task is not None and not self._owner_task.done()
+    
+    async def _own_session(self, ready: asyncio.Future):
+        """
+        后台任务：建立并持有会话，直到收到关闭信号
         
+        anyio 要求上下文在进入它的同一个任务中退出，因此连接的建立和关闭都在这里完成。
+        """
+        try:
+            async with AsyncExitStack() as stack:
+                read, write = await stack.enter_async_context(stdio_client(self.server_params))
+                self.session = await stack.enter_async_context(ClientSession(read, write))
+                await self._initialize_session()
+                ready.set_result(True)
+                await self._stop_event.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                logger.warning(f"MCP会话异常结束: {e}")
+        finally:
+            self.session = None
+    
     async def connect_to_server(self) -> bool:
         """
-        连接到MCP服务器并初始化会话
+        连接到MCP服务器并初始化会话（已连接时直接返回）
         
         Returns:
             连接是否成功
         """
-        try:
-            logger.info(f"正在连接到MCP服务器: {self.server_script_path}")
-            
-            # 创建服务器参数
-            self.server_params = StdioServerParameters(
-                command="python",
-                args=[self.server_script_path]
-            )
-            
-            # 使用stdio_client连接服务器
-            async with stdio_client(self.server_params) as (read, write):
-                # 创建客户端会话
-                async with ClientSession(read, write) as session:
-                    self.session = session
-                    
-                    # 初始化会话
-                    await self._initialize_session()
-                    
-                    logger.info("成功连接到MCP服务器")
-                    return True
-                    
-        except Exception as e:
-            logger.error(f"连接MCP服务器失败: {e}")
-            return False
+        async with self._get_connect_lock():
+            return await self._connect_locked()
+    
+    def _get_connect_lock(self) -> asyncio.Lock:
+        """连接锁在事件循环中首次使用时创建"""
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        return self._connect_lock
+    
+    async def _connect_locked(self) -> bool:
+        """建立连接（调用方持有连接锁），失败时按指数退避重试"""
+        if self.connected:
+            return True
+        
+        # 创建服务器参数
+        self.server_params = StdioServerParameters(
+            command="python",
+            args=[self.server_script_path]
+        )
+        
+        for attempt in range(self.max_reconnects + 1):
+            if attempt:
+                await asyncio.sleep(min(2 ** attempt, 10))
+            try:
+                logger.info(f"正在连接到MCP服务器: {self.server_script_path}")
+                self._stop_event = asyncio.Event()
+                ready = asyncio.get_running_loop().create_future()
+                self._owner_task = asyncio.create_task(self._own_session(ready))
+                await ready
+                self._generation += 1
+                logger.info("成功连接到MCP服务器")
+                return True
+            except Exception as e:
+                logger.error(f"连接MCP服务器失败（第 {attempt + 1} 次）: {e}")
+                await self._stop_owner()
+        return False
+    
+    async def _stop_owner(self):
+        """通知持有会话的后台任务退出并等待其结束"""
+        if self._stop_event:
+            self._stop_event.set()
+        if self._owner_task:
+            try:
+                await self._owner_task
+            except Exception as e:
+                logger.warning(f"关闭MCP会话时出错: {e}")
+            self._owner_task = None
+        self.session = None
+    
+    async def _reconnect(self, generation: int) -> bool:
+        """
+        调用因连接中断失败后重新连接
+        
+        多个并发调用同时失败时只重连一次：连接代数已变化说明其他任务已完成重连。
+        """
+        async with self._get_connect_lock():
+            if self._generation == generation:
+                logger.warning("MCP会话已断开，正在重新连接")
+                await self._stop_owner()
+            return await self._connect_locked()
+    
+    def _current_session(self) -> ClientSession:
+        """
+        取当前会话
+        
+        连接检查与调用之间会话可能已被其他任务关闭（self.session 置为 None），
+        此时按连接中断处理，由调用方重连。
+        """
+        session = self.session
+        if session is None:
+            raise ConnectionError("MCP会话已关闭")
+        return session
+    
+    @staticmethod
+    def _is_connection_error(error: Exception) -> bool:
+        """是否为连接中断（而非工具本身的错误）"""
+        if isinstance(error, McpError):
+            return error.error.code == CONNECTION_CLOSED
+        return isinstance(error, _TRANSPORT_ERRORS)
     
     async def _initialize_session(self):
         """
@@ -151,15 +264,21 @@ class MCPWeixinClient:
         Returns:
             工具调用结果
         """
-        if not self.session:
+        if not self.connected and not await self.connect_to_server():
             raise RuntimeError("未连接到服务器")
         
         try:
             logger.info(f"调用工具: {tool_name}，参数: {arguments}")
             
-            # 调用工具
-            result = await self.session.call_tool(tool_name, arguments)
-            
+            # 调用工具；连接中断（包括会话已被关闭）时重连并重试一次
+            generation = self._generation
+            try:
+                result = await self._current_session().call_tool(tool_name, arguments)
+            except Exception as e:
+                if not self._is_connection_error(e) or not await self._reconnect(generation):
+                    raise
+                result = await self._current_session().call_tool(tool_name, arguments)
+
             # 处理结果
             if result.isError:
                 error_msg = f"工具调用失败: {result.content}"
@@ -205,37 +324,104 @@ class MCPWeixinClient:
         
         return await self.call_tool("crawl_weixin_article", arguments)
     
-    async def analyze_article(self, article_data: Dict[str, Any], analysis_type: str = "full") -> Dict[str, Any]:
+    async def _crawl_one(self, url: str, download_images: bool) -> Dict[str, Any]:
+        """爬取单篇文章，并把工具返回的JSON解析为字典"""
+        started = time.monotonic()
+        response = await self.crawl_article(url, download_images)
+        record: Dict[str, Any] = {"url": url}
+        if response["status"] == "success" and response["result"]:
+            try:
+                record.update(json.loads(response["result"][0].text))
+            except (AttributeError, ValueError) as e:
+                record.update({"status": "error", "message": f"结果解析失败: {e}"})
+        else:
+            record.update({"status": "error", "message": response.get("message", "未知错误")})
+        record["elapsed"] = round(time.monotonic() - started, 3)
+        return record
+    
+    async def crawl_many(self, urls: Iterable[str], concurrency: int = 4,
+                         download_images: bool = True) -> AsyncIterator[Dict[str, Any]]:
+        """
+        在同一个会话上并发爬取多篇文章，按完成顺序逐个返回结果
+        
+        同时最多有 concurrency 个请求在途；服务器端的浏览器操作仍按顺序执行，
+        并发使请求排队、图片下载与下一篇文章的爬取相互重叠。
+        
+        Args:
+            urls: URL列表（可以是惰性迭代器）
+            concurrency: 最大在途请求数
+            download_images: 是否下载图片
+        
+        Yields:
+            每篇文章的结果：工具返回的JSON字段，加上 url 和 elapsed（秒）
+        """
+        pending = iter(urls)
+        running = set()
+        
+        def start_next():
+            url = next(pending, None)
+            if url is not None:
+                running.add(asyncio.create_task(self._crawl_one(url, download_images)))
+        
+        for _ in range(max(1, concurrency)):
+            start_next()
+        
+        try:
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    running.discard(task)
+                    start_next()
+                    yield task.result()
+        finally:
+            # 调用方提前停止迭代时取消未完成的请求，并等待其结束，避免任务在关闭会话后仍在运行
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+    
+    async def analyze_article(self, article_data: Dict[str, Any] = None, analysis_type: str = "full",
+                              article_id: str = None) -> Dict[str, Any]:
         """
         分析文章内容
         
         Args:
-            article_data: 文章数据
+            article_data: 文章数据（提供 article_id 时可省略）
             analysis_type: 分析类型
+            article_id: 已保存文章的ID或URL
         
         Returns:
             分析结果
         """
         arguments = {
-            "article_data": article_data,
             "analysis_type": analysis_type
         }
         
+        if article_id:
+            arguments["article_id"] = article_id
+        else:
+            arguments["article_data"] = article_data
+        
         return await self.call_tool("analyze_article_content", arguments)
     
-    async def get_statistics(self, article_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def get_statistics(self, article_data: Dict[str, Any] = None, article_id: str = None) -> Dict[str, Any]:
         """
         获取文章统计信息
         
         Args:
-            article_data: 文章数据
+            article_data: 文章数据（提供 article_id 时可省略）
+            article_id: 已保存文章的ID或URL
         
         Returns:
             统计信息
         """
-        arguments = {
-            "article_data": article_data
-        }
+        if article_id:
+            arguments = {
+                "article_id": article_id
+            }
+        else:
+            arguments = {
+                "article_data": article_data
+            }
         
         return await self.call_tool("get_article_statistics", arguments)
     
@@ -271,6 +457,15 @@ class MCPWeixinClient:
                 elif user_input.lower() in ['tools', 'list']:
                     await self._show_tools()
                 
+                # 处理批量爬取命令
+                elif user_input.lower().startswith('crawl-file '):
+                    args = user_input[11:].split()
+                    if args:
+                        concurrency = int(args[1]) if len(args) > 1 and args[1].isdigit() else 4
+                        await self._handle_crawl_file_command(args[0], concurrency)
+                    else:
+                        print("请提供URL列表文件路径")
+                
                 # 处理爬取命令
                 elif user_input.lower().startswith('crawl '):
                     url = user_input[6:].strip()
@@ -298,10 +493,13 @@ class MCPWeixinClient:
   help, h          - 显示此帮助信息
   tools, list      - 显示可用工具列表
   crawl <URL>      - 爬取指定URL的微信文章
+  crawl-file <文件> [并发数]
+                   - 批量爬取文件中的URL（每行一个，# 开头为注释），默认并发数4
   quit, exit, q    - 退出程序
 
 示例：
   crawl https://mp.weixin.qq.com/s/example
+  crawl-file urls.txt 8
 """
         print(help_text)
     
@@ -338,6 +536,8 @@ class MCPWeixinClient:
                                 print(f"发布时间: {article.get('publish_time', 'N/A')}")
                                 print(f"内容长度: {article.get('content_length', 0)} 字符")
                                 print(f"图片数量: {article.get('images_count', 0)}")
+                            if "article_id" in article_info:
+                                print(f"文章ID: {article_info['article_id']}")
                         except json.JSONDecodeError:
                             print("结果解析失败")
             else:
@@ -346,15 +546,44 @@ class MCPWeixinClient:
         except Exception as e:
             print(f"爬取过程中出错: {e}")
     
+    async def _handle_crawl_file_command(self, path: str, concurrency: int):
+        """处理批量爬取命令：逐篇输出进度，结束时输出汇总"""
+        from urls import load_urls
+        
+        try:
+            urls = load_urls(path)
+        except OSError as e:
+            print(f"读取URL列表失败: {e}")
+            return
+        if not urls:
+            print("URL列表为空")
+            return
+        
+        print(f"开始批量爬取 {len(urls)} 篇文章（并发数 {concurrency}）")
+        started = time.monotonic()
+        succeeded = failed = 0
+        async for record in self.crawl_many(urls, concurrency=concurrency):
+            if record.get("status") == "error":
+                failed += 1
+                detail = f"失败: {record.get('message', '未知错误')}"
+            else:
+                succeeded += 1
+                detail = record.get("article", {}).get("title") or record.get("status", "")
+            done = succeeded + failed
+            print(f"[{done}/{len(urls)}] {record['elapsed']:.1f}s {record['url']} {detail}")
+        
+        elapsed = time.monotonic() - started
+        print(f"批量爬取完成: 成功 {succeeded}，失败 {failed}，耗时 {elapsed:.1f} 秒，"
+              f"{len(urls) / elapsed * 60:.1f} 篇/分钟")
+    
     async def close_session(self):
         """
         关闭会话和连接
         """
         try:
-            if self.session:
-                # 注意：在实际的stdio_client上下文中，session会自动关闭
+            if self._owner_task:
+                await self._stop_owner()
                 logger.info("会话已关闭")
-                self.session = None
         except Exception as e:
             logger.error(f"关闭会话时出错: {e}")
 
@@ -369,27 +598,12 @@ async def run_client(server_script_path: str):
     client = MCPWeixinClient(server_script_path)
     
     try:
-        # 连接到服务器
+        # 连接到服务器，整个交互过程共用一个会话
         logger.info("正在启动MCP客户端...")
-        
-        # 创建服务器参数
-        server_params = StdioServerParameters(
-            command="python",
-            args=[server_script_path]
-        )
-        
-        # 使用stdio_client连接服务器
-        async with stdio_client(server_params) as (read, write):
-            # 创建客户端会话
-            async with ClientSession(read, write) as session:
-                client.session = session
-                
-                # 初始化会话
-                await client._initialize_session()
-                
-                # 开始交互式会话
-                await client.interactive_session()
-                
+        async with client:
+            # 开始交互式会话
+            await client.interactive_session()
+    
     except Exception as e:
         logger.error(f"客户端运行出错: {e}")
     finally:
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+并发请求合并
+
+多个调用方（MCP工具调用、后台任务）同时请求同一篇文章时只执行一次爬取：
+第一个调用方执行，其余调用方等待同一次执行并得到相同的结果；执行失败时
+每个等待者抛出各自的异常副本。执行结束后立即移除，之后的请求会重新执行。
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+def _copy_error(error: BaseException) -> BaseException:
+    """
+    复制异常供等待者抛出
+
+    异常对象在抛出时会被修改（__traceback__、__context__），多个线程抛出同一个
+    对象会互相覆盖。副本不调用 __init__，保留类型、args 和实例属性（如 reason、
+    retriable），无法复制时包装为 RuntimeError。
+    """
+    try:
+        copied = type(error).__new__(type(error), *error.args)
+        copied.args = error.args
+        copied.__dict__.update(error.__dict__)
+        return copied
+    except Exception:
+        return RuntimeError(f"{type(error).__name__}: {error}")
+
+
+class _Flight:
+    """一次进行中的执行"""
+
+    __slots__ = ("event", "result", "error", "started", "waiters")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.started = time.time()
+        self.waiters = 0
+
+
+class RequestCoalescer:
+    """
+    按键合并并发请求（线程安全）
+
+    统计请求总数、实际执行次数和被合并的次数，用于观察去重节省的工作量。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._stats = {"requests": 0, "executed": 0, "coalesced": 0, "failed": 0}
+
+    def run(self, key: Hashable, func: Callable[..., Any], *args, **kwargs) -> Tuple[Any, bool]:
+        """
+        执行请求，相同键已有执行在进行时等待其结果
+
+        Args:
+            key: 合并键
+            func: 执行函数
+            *args: 执行函数的位置参数
+            **kwargs: 执行函数的关键字参数
+
+        Returns:
+            (结果, 是否为合并的请求)；合并的请求与执行者得到同一个结果对象
+
+        Raises:
+            执行函数抛出的异常；合并的请求抛出该异常的副本，__cause__ 为原异常
+        """
+        with self._lock:
+            self._stats["requests"] += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self._stats["executed"] += 1
+            else:
+                flight.waiters += 1
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise _copy_error(flight.error) from flight.error
+            return flight.result, True
+
+        try:
+            flight.result = func(*args, **kwargs)
+            return flight.result, False
+        except BaseException as e:
+            flight.error = e
+            with self._lock:
+                self._stats["failed"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.event.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取合并统计
+
+        Returns:
+            请求数、执行数、合并数、失败数、合并比例和进行中的执行
+        """
+        now = time.time()
+        with self._lock:
+            stats = dict(self._stats)
+            in_flight = [
+                {"key": str(key), "waiters": flight.waiters, "running_seconds": round(now - flight.started, 1)}
+                for key, flight in self._flights.items()
+            ]
+        stats["coalesced_ratio"] = round(stats["coalesced"] / stats["requests"], 3) if stats["requests"] else 0.0
+        stats["in_flight"] = in_flight
+        return stats
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文章语料的列式导出
+
+把已保存的文章和图片信息增量导出为按抓取日期分区的列式文件，供批量分析直接加载，
+不必逐个解析 articles/*/*.json：
+
+    articles/export/
+        articles/crawl_date=2024-01-01/part-20240101T120000.parquet
+        images/crawl_date=2024-01-01/part-20240101T120000.parquet
+        export_state.json
+
+1. 每次导出只处理上次导出后新增或重新保存（JSON文件修改时间变化）的文章，每个分区写一个新的分片文件
+2. 重新爬取的文章会出现在多个分片中，load_corpus 按文章ID只保留最后导出的一份
+   （图片表跟随文章表选择的分片，重新爬取后没有图片的文章不会保留旧的图片行）
+3. 安装了pyarrow或fastparquet时写Parquet，否则写gzip压缩的CSV（Feather同样依赖pyarrow，无法作为替代）
+
+用法:
+    python -m mcp_weixin_spider export
+    python -m mcp_weixin_spider export --full
+"""
+
+import argparse
+import glob
+import json
+import logging
+import os
+import sys
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from storage import ArticleStore
+
+logger = logging.getLogger(__name__)
+
+# 项目根目录（文章目录所在位置，与服务器保持一致）
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ARTICLES_DIR = os.path.join(project_root, "articles")
+
+# 导出表名
+TABLES = ("articles", "images")
+
+# 图片表的列
+IMAGE_COLUMNS = ("article_id", "index", "url", "alt", "title", "filename", "local_path", "download_success")
+
+
+def _detect_parquet_engine() -> Optional[str]:
+    """返回可用的Parquet引擎，没有时返回None"""
+    for engine in ("pyarrow", "fastparquet"):
+        try:
+            __import__(engine)
+            return engine
+        except ImportError:
+            continue
+    return None
+
+
+PARQUET_ENGINE = _detect_parquet_engine()
+
+# 分片文件格式：parquet 或 csv.gz
+EXPORT_FORMAT = "parquet" if PARQUET_ENGINE else "csv.gz"
+
+
+def _crawl_date(crawl_time: str) -> str:
+    """抓取时间（YYYY-MM-DD HH:MM:SS）对应的分区日期"""
+    return (crawl_time or "")[:10] or "unknown"
+
+
+def article_rows(article_id: str, article_data: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    将一篇文章转换为文章表和图片表的行
+
+    Args:
+        article_id: 文章ID
+        article_data: 文章数据
+
+    Returns:
+        {"articles": [行], "images": [行]}；抓取日期只作为分区目录，不写入行中，
+        避免按目录加载时分区列与文件中的同名列类型冲突
+    """
+    statistics = article_data.get("statistics") or {}
+    content_statistics = statistics.get("content_statistics") or {}
+    images = article_data.get("images") or []
+
+    article = {
+        "article_id": article_id,
+        "url": article_data.get("url", ""),
+        "title": article_data.get("title", ""),
+        "author": article_data.get("author", ""),
+        "publish_time": article_data.get("publish_time", ""),
+        "crawl_time": article_data.get("crawl_time", ""),
+        "content_text": article_data.get("content_text", ""),
+        "total_characters": content_statistics.get("total_characters", len(article_data.get("content_text", ""))),
+        "total_words": content_statistics.get("total_words"),
+        "paragraphs": content_statistics.get("paragraphs"),
+        "images_count": len(images),
+        "images_downloaded": sum(1 for img in images if img.get("download_success")),
+    }
+    image_rows = []
+    for img in images:
+        row = {column: img.get(column) for column in IMAGE_COLUMNS}
+        row["article_id"] = article_id
+        image_rows.append(row)
+    return {"articles": [article], "images": image_rows}
+
+
+class CorpusExporter:
+    """
+    增量列式导出器
+
+    导出状态（每篇文章已导出的JSON修改时间）保存在导出目录的 export_state.json 中，
+    先写临时文件再替换。
+    """
+
+    def __init__(self, store: ArticleStore, export_dir: Optional[str] = None):
+        """
+        初始化导出器
+
+        Args:
+            store: 文章存储
+            export_dir: 导出目录，默认为文章目录下的 export
+        """
+        self.store = store
+        self.export_dir = export_dir or os.path.join(store.articles_dir, "export")
+        self.state_path = os.path.join(self.export_dir, "export_state.json")
+        self._exported: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        """从磁盘加载导出状态"""
+        if not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                self._exported = json.load(f).get("exported", {})
+        except Exception as e:
+            logger.error(f"加载导出状态失败: {e}")
+
+    def _save(self):
+        """将导出状态写回磁盘"""
+        os.makedirs(self.export_dir, exist_ok=True)
+        temp_path = self.state_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"format": EXPORT_FORMAT, "exported": self._exported}, f, ensure_ascii=False)
+        os.replace(temp_path, self.state_path)
+
+    def _write_part(self, table: str, crawl_date: str, rows: List[Dict[str, Any]], part_name: str) -> str:
+        """写出一个分区的分片文件（先写临时文件再替换）"""
+        partition_dir = os.path.join(self.export_dir, table, f"crawl_date={crawl_date}")
+        os.makedirs(partition_dir, exist_ok=True)
+        path = os.path.join(partition_dir, f"{part_name}.{EXPORT_FORMAT}")
+        temp_path = path + ".tmp"
+
+        frame = pd.DataFrame(rows)
+        if PARQUET_ENGINE:
+            frame.to_parquet(temp_path, engine=PARQUET_ENGINE, index=False)
+        else:
+            frame.to_csv(temp_path, index=False, compression="gzip")
+        os.replace(temp_path, path)
+        return path
+
+    def export(self, full: bool = False) -> Dict[str, Any]:
+        """
+        导出新增或更新的文章
+
+        Args:
+            full: 忽略导出状态，重新导出全部文章
+
+        Returns:
+            导出结果摘要
+        """
+        with self._lock:
+            if full:
+                self._exported = {}
+
+            pending: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+            exported: Dict[str, float] = {}
+            skipped = 0
+            for entry in self.store.list_articles(limit=None):
+                json_path = entry["files"]["json"]
+                try:
+                    mtime = os.path.getmtime(json_path)
+                except OSError:
+                    skipped += 1
+                    continue
+                if self._exported.get(entry["article_id"]) == mtime:
+                    continue
+                try:
+                    with open(json_path, "r", encoding="utf-8") as f:
+                        article_data = json.load(f)
+                except Exception as e:
+                    logger.warning(f"读取文章失败，跳过导出 {json_path}: {e}")
+                    skipped += 1
+                    continue
+
+                rows = article_rows(entry["article_id"], article_data)
+                partition = pending.setdefault(_crawl_date(article_data.get("crawl_time", "")),
+                                               {table: [] for table in TABLES})
+                for table in TABLES:
+                    partition[table].extend(rows[table])
+                exported[entry["article_id"]] = mtime
+
+            part_name = "part-" + datetime.now().strftime("%Y%m%dT%H%M%S%f")
+            files = []
+            for crawl_date, tables in sorted(pending.items()):
+                for table in TABLES:
+                    if tables[table]:
+                        files.append(self._write_part(table, crawl_date, tables[table], part_name))
+
+            # 分片全部写出后再记录状态，中途失败时下次导出会重新处理这些文章
+            self._exported.update(exported)
+            if exported or full:
+                self._save()
+
+        return {
+            "format": EXPORT_FORMAT,
+            "export_dir": self.export_dir,
+            "articles_exported": len(exported),
+            "images_exported": sum(len(tables["images"]) for tables in pending.values()),
+            "partitions": sorted(pending),
+            "files": files,
+            "skipped": skipped,
+            "total_exported": len(self._exported),
+        }
+
+    def _part_files(self, table: str) -> List[str]:
+        """某张表的全部分片文件，按分区和写入时间排序"""
+        pattern = os.path.join(self.export_dir, table, "crawl_date=*", f"part-*.{EXPORT_FORMAT}")
+        return sorted(glob.glob(pattern), key=lambda path: (os.path.basename(os.path.dirname(path)),
+                                                             os.path.basename(path)))
+
+    def _read_parts(self, table: str, since: Optional[str], until: Optional[str],
+                    columns: Optional[List[str]]) -> Optional[pd.DataFrame]:
+        """
+        读取日期范围内某张表的全部分片
+
+        Returns:
+            加上 crawl_date（来自分区目录）和 _part（分片文件名）列的DataFrame，没有分片时返回None
+        """
+        read_columns = None
+        if columns:
+            read_columns = list(dict.fromkeys(["article_id", *(c for c in columns if c != "crawl_date")]))
+
+        frames = []
+        for path in self._part_files(table):
+            crawl_date = os.path.basename(os.path.dirname(path)).split("=", 1)[1]
+            if (since and crawl_date < since) or (until and crawl_date > until):
+                continue
+            if PARQUET_ENGINE:
+                frame = pd.read_parquet(path, engine=PARQUET_ENGINE, columns=read_columns)
+            else:
+                frame = pd.read_csv(path, compression="gzip", usecols=read_columns,
+                                    dtype={"article_id": str})
+            frame["crawl_date"] = crawl_date
+            frame["_part"] = os.path.basename(path)
+            frames.append(frame)
+        return pd.concat(frames, ignore_index=True) if frames else None
+
+    def load_corpus(self, table: str = "articles", since: Optional[str] = None,
+                    until: Optional[str] = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        加载导出的语料
+
+        Args:
+            table: articles 或 images
+            since: 起始抓取日期（YYYY-MM-DD，含），只读取对应分区
+            until: 截止抓取日期（YYYY-MM-DD，含）
+            columns: 只读取的列（Parquet格式下不读取其他列）
+
+        Returns:
+            DataFrame；同一篇文章导出多次时只保留最后一次导出的数据。先在全部分区中去重再按日期筛选，
+            最后一次导出落在日期范围之外的文章不会返回范围内的旧版本
+        """
+        if table not in TABLES:
+            raise ValueError(f"未知的表: {table}，可选: {', '.join(TABLES)}")
+
+        # 每篇文章的最新分片由文章表决定：重新爬取后没有图片的文章，新分片中没有图片行
+        articles = self._read_parts("articles", since, until, columns if table == "articles" else ["article_id"])
+        if articles is None:
+            return pd.DataFrame(columns=list(columns or []))
+        if since or until:
+            # 最新分片可能在日期范围之外，需读取全部分区的 article_id 列确定
+            all_articles = self._read_parts("articles", None, None, ["article_id"])
+        else:
+            all_articles = articles
+        latest = all_articles.groupby("article_id")["_part"].max()
+
+        if table == "articles":
+            corpus = articles[articles["_part"] == articles["article_id"].map(latest)]
+            corpus = corpus.drop_duplicates("article_id", keep="last")
+        else:
+            images = self._read_parts("images", since, until, columns)
+            if images is None:
+                return pd.DataFrame(columns=list(columns or []))
+            corpus = images[images["_part"] == images["article_id"].map(latest)]
+        return corpus.drop(columns="_part").reset_index(drop=True)
+
+    def summary(self, since: Optional[str] = None, until: Optional[str] = None, top: int = 10) -> Dict[str, Any]:
+        """
+        统计导出语料的概况
+
+        Args:
+            since: 起始抓取日期（YYYY-MM-DD，含）
+            until: 截止抓取日期（YYYY-MM-DD，含）
+            top: 返回的高产作者数量
+
+        Returns:
+            文章数量、按日期和作者的分布等
+        """
+        articles = self.load_corpus(
+            "articles", since=since, until=until,
+            columns=["author", "crawl_date", "total_characters", "images_count"]
+        )
+        if articles.empty:
+            return {"format": EXPORT_FORMAT, "articles": 0, "images": 0, "by_date": {}, "top_authors": {}}
+
+        return {
+            "format": EXPORT_FORMAT,
+            "articles": int(len(articles)),
+            "images": int(articles["images_count"].sum()),
+            "total_characters": int(articles["total_characters"].sum()),
+            "date_range": [articles["crawl_date"].min(), articles["crawl_date"].max()],
+            "by_date": {date: int(count) for date, count in articles["crawl_date"].value_counts().sort_index().items()},
+            "top_authors": {str(author): int(count)
+                            for author, count in articles["author"].fillna("").value_counts().head(top).items()},
+        }
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """创建导出模式的命令行参数解析器"""
+    parser = argparse.ArgumentParser(
+        prog="python -m mcp_weixin_spider export",
+        description="将已保存的文章增量导出为按抓取日期分区的列式文件"
+    )
+    parser.add_argument("--articles-dir", default=ARTICLES_DIR, help="文章保存目录")
+    parser.add_argument("--export-dir", default=None, help="导出目录，默认为文章目录下的 export")
+    parser.add_argument("--full", action="store_true", help="忽略导出状态，重新导出全部文章")
+    parser.add_argument("--summary", action="store_true", help="只输出已导出语料的概况，不导出")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """导出模式入口"""
+    args = create_parser().parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        stream=sys.stderr
+    )
+
+    exporter = CorpusExporter(ArticleStore(args.articles_dir), args.export_dir)
+    result = exporter.summary() if args.summary else exporter.export(full=args.full)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+持久化爬取任务队列
+
+任务保存在文章目录下的SQLite数据库中：
+1. 提交任务立即返回任务ID
+2. 后台工作线程按提交顺序取出任务并调用处理函数
+3. 服务器重启后，未完成（排队中或运行中）的任务会自动恢复
+4. 失败的任务按最大尝试次数重新排队，按指数退避（带随机抖动）推迟到 not_before 之后再执行，
+   排在它后面的任务先执行
+"""
+
+import json
+import logging
+import random
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUSES = ("queued", "running", "done", "failed")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    options TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    not_before TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at);
+"""
+
+
+def _now(delay: float = 0) -> str:
+    """
+    当前时间字符串（精确到毫秒，保证同一秒内提交的任务有序）
+
+    Args:
+        delay: 在当前时间上增加的秒数
+    """
+    return (datetime.now() + timedelta(seconds=delay)).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+
+
+class CrawlJobQueue:
+    """
+    基于SQLite的爬取任务队列
+
+    每次数据库操作使用独立连接，工作线程与MCP工具调用可以并发访问。
+    """
+
+    def __init__(self, db_path: str, handler: Callable[[str, Dict[str, Any]], Dict[str, Any]],
+                 num_workers: int = 1, max_attempts: int = 3,
+                 retry_base: float = 30.0, retry_max: float = 30 * 60):
+        """
+        初始化任务队列
+
+        Args:
+            db_path: SQLite数据库路径
+            handler: 任务处理函数 handler(url, options) -> 结果字典，抛出异常表示失败；
+                异常带有 retriable=False 属性时不再重试
+            num_workers: 工作线程数量
+            max_attempts: 每个任务的最大尝试次数
+            retry_base: 第一次重试前的等待秒数，之后每次翻倍
+            retry_max: 重试等待的上限（秒）
+        """
+        self.db_path = db_path
+        self.handler = handler
+        self.num_workers = num_workers
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self._workers: List[threading.Thread] = []
+        self._stop_event = threading.Event()
+        self._wakeup = threading.Condition()
+        self._claim_lock = threading.Lock()
+
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            # 旧版本创建的数据库没有 not_before 列
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "not_before" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN not_before TEXT NOT NULL DEFAULT ''")
+
+    @contextmanager
+    def _connect(self):
+        """打开数据库连接，退出时提交事务并关闭连接"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> Dict[str, Any]:
+        """将数据库行转换为任务字典"""
+        job = dict(row)
+        job["options"] = json.loads(job["options"]) if job["options"] else {}
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def start(self):
+        """恢复未完成的任务并启动工作线程"""
+        if self._workers:
+            return
+
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'queued', updated_at = ? WHERE status = 'running'",
+                (_now(),)
+            )
+            resumed = cursor.rowcount
+            pending = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+        if pending:
+            logger.info(f"恢复未完成的爬取任务: {pending} 个（其中 {resumed} 个在上次运行中中断）")
+
+        self._stop_event.clear()
+        for i in range(self.num_workers):
+            worker = threading.Thread(target=self._worker_loop, name=f"crawl-job-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        停止工作线程
+
+        正在执行的任务会在处理函数返回后结束；被中断的任务下次启动时恢复。
+
+        Args:
+            timeout: 等待每个工作线程退出的秒数
+        """
+        self._stop_event.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for worker in self._workers:
+            worker.join(timeout)
+        self._workers = []
+
+    def submit(self, url: str, options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        提交爬取任务
+
+        Args:
+            url: 文章URL
+            options: 传给处理函数的选项
+
+        Returns:
+            任务字典
+        """
+        job_id = uuid.uuid4().hex[:12]
+        now = _now()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, url, options, status, created_at, updated_at) VALUES (?, ?, ?, 'queued', ?, ?)",
+                (job_id, url, json.dumps(options or {}, ensure_ascii=False), now, now)
+            )
+        with self._wakeup:
+            self._wakeup.notify()
+        logger.info(f"已提交爬取任务 {job_id}: {url}")
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        查询任务
+
+        Args:
+            job_id: 任务ID
+
+        Returns:
+            任务字典，不存在时返回None
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def list(self, status: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        列出任务
+
+        Args:
+            status: 按状态过滤（queued/running/done/failed），为空时返回全部
+            limit: 返回数量上限
+
+        Returns:
+            任务字典列表，按提交时间倒序
+        """
+        with self._connect() as conn:
+            if status:
+                rows = conn.execute(
+                    "SELECT * FROM jobs WHERE status = ? ORDER BY created_at DESC LIMIT ?", (status, limit)
+                ).fetchall()
+            else:
+                rows = conn.execute("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        """按状态统计任务数量"""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = {status: 0 for status in JOB_STATUSES}
+        counts.update({row[0]: row[1] for row in rows})
+        return counts
+
+    def retry_delay(self, attempts: int) -> float:
+        """
+        第 attempts 次尝试失败后到下一次尝试的等待秒数
+
+        retry_base · 2^(attempts-1)，不超过 retry_max，再乘以 [0.5, 1) 的随机系数，
+        避免同时失败的任务（如同一主机限流）在同一时刻一起重试。
+        """
+        delay = min(self.retry_max, self.retry_base * 2 ** max(0, attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    def _claim_next(self) -> Optional[Dict[str, Any]]:
+        """取出最早提交的、已到重试时间的排队任务并标记为运行中"""
+        with self._claim_lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' AND not_before <= ? ORDER BY created_at LIMIT 1",
+                (_now(),)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (_now(), row["id"])
+            )
+        return self.get(row["id"])
+
+    def _next_wait(self, limit: float) -> float:
+        """距离最早一个等待重试的任务到期的秒数，不超过 limit"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT MIN(not_before) FROM jobs WHERE status = 'queued'").fetchone()
+        if not row or not row[0]:
+            return limit
+        due = datetime.strptime(row[0], '%Y-%m-%d %H:%M:%S.%f')
+        return min(limit, max(0.01, (due - datetime.now()).total_seconds()))
+
+    def _finish(self, job_id: str, status: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None,
+                not_before: str = ""):
+        """记录任务结果"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ?, not_before = ? WHERE id = ?",
+                (status, json.dumps(result, ensure_ascii=False) if result is not None else None, error, _now(),
+                 not_before, job_id)
+            )
+
+    def _fail(self, job: Dict[str, Any], error: Exception):
+        """
+        记录一次失败：可重试且未达到最大尝试次数时推迟后重新排队，否则标记为失败
+
+        Args:
+            job: 执行的任务
+            error: 处理函数抛出的异常
+        """
+        retriable = getattr(error, "retriable", True)
+        if retriable and job["attempts"] < self.max_attempts:
+            delay = self.retry_delay(job["attempts"])
+            self._finish(job["id"], "queued", error=str(error), not_before=_now(delay))
+            logger.warning(f"爬取任务 {job['id']} 失败，{delay:.0f} 秒后重试: {error}")
+        else:
+            self._finish(job["id"], "failed", error=str(error))
+            logger.error(f"爬取任务 {job['id']} 失败: {error}")
+
+    def _worker_loop(self):
+        """工作线程主循环"""
+        while not self._stop_event.is_set():
+            job = self._claim_next()
+            if job is None:
+                # 没有可执行的任务时等待新任务提交，或最早一个等待重试的任务到期
+                with self._wakeup:
+                    self._wakeup.wait(timeout=self._next_wait(5))
+                continue
+
+            logger.info(f"开始执行爬取任务 {job['id']}（第 {job['attempts']} 次）: {job['url']}")
+            try:
+                result = self.handler(job["url"], job["options"])
+                self._finish(job["id"], "done", result=result)
+                logger.info(f"爬取任务完成 {job['id']}")
+            except Exception as e:
+                self._fail(job, e)
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文章关键词提取
+
+基于语料库的TF-IDF关键词提取：
+1. 中文分词（优先使用jieba，不可用时回退到CJK二元组）
+2. 停用词过滤
+3. 文档频率（DF）随文章保存增量更新，合并写盘（见 persist.DeferredWriter）
+4. 使用NumPy向量化计算TF-IDF得分
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from persist import DeferredWriter
+
+try:
+    import jieba
+    jieba.setLogLevel(logging.WARNING)
+except ImportError:
+    # jieba为可选依赖，不可用时使用二元组切分
+    jieba = None
+
+logger = logging.getLogger(__name__)
+
+# 连续的中文字符、英文单词或数字
+_TOKEN_RE = re.compile(r"[\u4e00-\u9fff]+|[A-Za-z][A-Za-z0-9_\-]*|\d+(?:\.\d+)?")
+_CJK_RE = re.compile(r"^[\u4e00-\u9fff]+$")
+
+# 常见虚词，包含这些字的二元组基本不构成关键词
+STOP_CHARS = set("的了是在和与及或也都就而着过吗呢吧啊这那之其为以于把被让从对等个我你他她它们")
+
+STOPWORDS = {
+    # 中文
+    "我们", "你们", "他们", "她们", "它们", "这个", "那个", "这些", "那些", "这样", "那样",
+    "什么", "怎么", "为什么", "因为", "所以", "但是", "而且", "如果", "虽然", "然后", "还是",
+    "可以", "没有", "就是", "不是", "一个", "一些", "已经", "现在", "自己", "非常", "以及",
+    "进行", "通过", "对于", "其中", "之后", "之前", "时候", "今天", "点击", "阅读", "原文",
+    "关注", "公众号", "分享", "收藏", "在看", "点赞", "微信", "扫码", "长按", "识别", "二维码",
+    # 英文
+    "the", "and", "for", "with", "that", "this", "from", "are", "was", "were", "you", "your",
+    "have", "has", "not", "but", "can", "will", "all", "any", "its", "our", "they", "their",
+    "http", "https", "www", "com",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    将文章文本切分为候选词
+
+    Args:
+        text: 文章纯文本
+
+    Returns:
+        过滤停用词后的词列表（保留重复，用于统计词频）
+    """
+    if not text:
+        return []
+
+    tokens: List[str] = []
+    if jieba is not None:
+        for word in jieba.lcut(text):
+            word = word.strip().lower()
+            if _is_candidate(word):
+                tokens.append(word)
+        return tokens
+
+    for match in _TOKEN_RE.finditer(text):
+        chunk = match.group()
+        if _CJK_RE.match(chunk):
+            # 中文没有空格分隔，使用字符二元组近似词语
+            for i in range(len(chunk) - 1):
+                bigram = chunk[i:i + 2]
+                if bigram[0] in STOP_CHARS or bigram[1] in STOP_CHARS:
+                    continue
+                if bigram not in STOPWORDS:
+                    tokens.append(bigram)
+        else:
+            word = chunk.lower()
+            if _is_candidate(word):
+                tokens.append(word)
+    return tokens
+
+
+def _is_candidate(word: str) -> bool:
+    """判断是否为有效候选词"""
+    if len(word) < 2 or word in STOPWORDS:
+        return False
+    if word.replace(".", "").isdigit():
+        return False
+    return bool(_TOKEN_RE.fullmatch(word))
+
+
+class CorpusKeywordIndex:
+    """
+    语料库文档频率索引
+
+    DF表保存在文章目录下的JSON文件中，每保存一篇文章在内存中增量更新，
+    最多 flush_interval 秒后写盘一次；关键词得分计算时只需查表，不再重新扫描整个语料库。
+    进程退出前应调用 flush 写回剩余修改。
+    """
+
+    def __init__(self, index_path: str, flush_interval: float = 5.0):
+        """
+        初始化索引
+
+        Args:
+            index_path: DF表文件路径
+            flush_interval: 修改后延迟写盘的秒数，0 表示每次添加立即写盘
+        """
+        self.index_path = index_path
+        self.doc_count = 0
+        self.doc_freq: Dict[str, int] = {}
+        self.doc_ids = set()
+        self._lock = threading.Lock()
+        self._writer = DeferredWriter(self._save, self._lock, flush_interval, "关键词索引")
+        self._load()
+
+    def _load(self):
+        """从磁盘加载DF表"""
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.doc_count = data.get("doc_count", 0)
+            self.doc_freq = data.get("doc_freq", {})
+            self.doc_ids = set(data.get("doc_ids", []))
+            logger.info(f"关键词索引已加载: {self.doc_count} 篇文档, {len(self.doc_freq)} 个词")
+        except Exception as e:
+            logger.error(f"加载关键词索引失败: {e}")
+
+    def _save(self):
+        """将DF表写回磁盘（先写临时文件再替换）"""
+        os.makedirs(os.path.dirname(self.index_path) or ".", exist_ok=True)
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "doc_count": self.doc_count,
+                "doc_freq": self.doc_freq,
+                "doc_ids": sorted(self.doc_ids),
+            }, f, ensure_ascii=False)
+        os.replace(temp_path, self.index_path)
+
+    def add_document(self, doc_id: str, text: str) -> bool:
+        """
+        将一篇文章计入语料库
+
+        Args:
+            doc_id: 文档唯一标识，重复添加同一文档会被忽略
+            text: 文章纯文本
+
+        Returns:
+            是否实际更新了索引
+        """
+        if not doc_id or not text:
+            return False
+
+        terms = set(tokenize(text))
+        with self._lock:
+            if doc_id in self.doc_ids:
+                return False
+            self.doc_ids.add(doc_id)
+            self.doc_count += 1
+            for term in terms:
+                self.doc_freq[term] = self.doc_freq.get(term, 0) + 1
+            self._writer.mark_dirty()
+        return True
+
+    def flush(self) -> bool:
+        """
+        立即写回未保存的DF表
+
+        Returns:
+            磁盘上的DF表是否已是最新
+        """
+        return self._writer.flush()
+
+    def score(self, text: str, top_k: int = 10) -> List[Tuple[str, float]]:
+        """
+        计算文章的TF-IDF关键词得分
+
+        Args:
+            text: 文章纯文本
+            top_k: 返回的关键词数量
+
+        Returns:
+            (关键词, 得分) 列表，按得分降序
+        """
+        tokens = tokenize(text)
+        if not tokens:
+            return []
+
+        terms, counts = np.unique(np.array(tokens), return_counts=True)
+        with self._lock:
+            doc_count = self.doc_count
+            df = np.fromiter(
+                (self.doc_freq.get(term, 0) for term in terms),
+                dtype=np.float64,
+                count=len(terms)
+            )
+
+        tf = counts / counts.sum()
+        idf = np.log((1.0 + doc_count) / (1.0 + df)) + 1.0
+        scores = tf * idf
+
+        top = np.argsort(-scores, kind="stable")[:top_k]
+        return [(str(terms[i]), float(scores[i])) for i in top]
+
+    def extract(self, text: str, top_k: int = 10) -> List[str]:
+        """
+        提取关键词
+
+        Args:
+            text: 文章纯文本
+            top_k: 返回的关键词数量
+
+        Returns:
+            关键词列表
+        """
+        return [term for term, _ in self.score(text, top_k)]
@@ -7,6 +7,8 @@ MCP微信爬虫主启动脚本
 1. MCP服务器模式
 2. 客户端演示模式
 3. 交互式客户端模式
+4. 多进程批量爬取模式
+5. 列式语料导出模式
 """
 
 import argparse
@@ -37,6 +39,12 @@ def create_parser():
   # 启动交互式客户端
   python main.py interactive
   
+  # 多进程批量爬取（结果以JSONL输出）
+  python main.py batch urls.txt --workers 4 --output results.jsonl
+  
+  # 增量导出列式语料（Parquet，按抓取日期分区）
+  python main.py export
+  
   # 显示版本信息
   python main.py --version
         """
@@ -44,8 +52,33 @@ def create_parser():
     
     parser.add_argument(
         "mode",
-        choices=["server", "client", "interactive"],
-        help="运行模式：server(服务器), client(客户端演示), interactive(交互式客户端)"
+        choices=["server", "client", "interactive", "batch", "export"],
+        help="运行模式：server(服务器), client(客户端演示), interactive(交互式客户端), batch(批量爬取), export(语料导出)"
+    )
+    
+    parser.add_argument(
+        "urls_file",
+        nargs="?",
+        help="batch模式的URL列表文件，每行一个URL"
+    )
+    
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=2,
+        help="batch模式的工作进程数量（每个进程一个Chrome）"
+    )
+    
+    parser.add_argument(
+        "--output",
+        default="-",
+        help="batch模式的JSONL输出文件，默认标准输出"
+    )
+    
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="export模式忽略导出状态，重新导出全部文章"
     )
     
     parser.add_argument(
@@ -108,6 +141,14 @@ def main():
             asyncio.run(run_client_demo(args.debug))
         elif args.mode == "interactive":
             asyncio.run(run_interactive_client(args.debug))
+        elif args.mode == "batch":
+            if not args.urls_file:
+                parser.error("batch模式需要提供URL列表文件")
+            from batch import main as batch_main
+            sys.exit(batch_main([args.urls_file, "--workers", str(args.workers), "--output", args.output]))
+        elif args.mode == "export":
+            from export import main as export_main
+            sys.exit(export_main(["--full"] if args.full else []))
     except KeyboardInterrupt:
         print("\n👋 程序已退出")
     except Exception as e:
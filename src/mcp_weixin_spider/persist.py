@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+索引延迟写盘
+
+关键词DF表、相似文章指纹等索引每次写盘都要序列化整个文件，逐篇写回时
+批量入库的开销随语料规模线性增长。索引修改后只标记为脏，由定时器在
+interval 秒后合并写回一次；关闭时调用 flush 立即写回剩余修改。
+"""
+
+import logging
+import threading
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DeferredWriter:
+    """
+    合并写盘
+
+    save 回调序列化索引并写盘，调用时已持有索引的锁；mark_dirty 由索引在持锁
+    修改后调用，flush 和定时器会自行获取该锁。
+    """
+
+    def __init__(self, save: Callable[[], None], lock: threading.Lock,
+                 interval: float = 5.0, label: str = "索引"):
+        """
+        初始化写盘器
+
+        Args:
+            save: 写盘回调
+            lock: 保护索引数据的锁（不可重入）
+            interval: 标记为脏后最多等待多少秒写回，0 表示每次修改立即写回
+            label: 日志中的索引名称
+        """
+        self._save = save
+        self._lock = lock
+        self.interval = interval
+        self.label = label
+        self.dirty = False
+        self._timer: Optional[threading.Timer] = None
+
+    def mark_dirty(self):
+        """标记有未写回的修改（调用方持有锁）"""
+        self.dirty = True
+        if self.interval <= 0:
+            self._write()
+        elif self._timer is None:
+            self._timer = threading.Timer(self.interval, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self) -> bool:
+        """
+        立即写回未保存的修改
+
+        Returns:
+            索引在磁盘上是否已是最新
+        """
+        with self._lock:
+            timer, self._timer = self._timer, None
+            if timer is not None and timer is not threading.current_thread():
+                timer.cancel()
+            if self.dirty:
+                self._write()
+            return not self.dirty
+
+    def _write(self):
+        """执行写盘，失败时保留脏标记，等待下次修改或 flush 重试"""
+        try:
+            self._save()
+            self.dirty = False
+        except Exception as e:
+            logger.error(f"保存{self.label}失败: {e}")
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自适应重新爬取调度
+
+为每篇已保存的文章记录检查历史（内容哈希、检查次数、变化次数、最近检查/变化时间），
+按观测到的变化率估计下次检查时间：
+
+    变化率 λ = (变化次数 + 0.5) / (观测时长 + 先验时长)
+    下次检查间隔 = -ln(1 - p) / λ
+
+其中 p 为目标变化概率。刚保存的文章观测时长短，按先验较快复查；
+长期没有变化的文章随观测时长增加，检查间隔逐渐拉长。每个调度周期只提交
+有限数量的重新爬取，优先处理预计错过变化最多的文章。
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+
+def content_hash(text: str) -> str:
+    """计算文章正文哈希"""
+    return hashlib.sha1((text or "").encode("utf-8")).hexdigest()
+
+
+def _format_time(timestamp: Optional[float]) -> Optional[str]:
+    """格式化时间戳"""
+    if not timestamp:
+        return None
+    return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
+
+
+class RecrawlScheduler:
+    """
+    重新爬取调度器
+
+    调度器只负责决定何时重新爬取，实际爬取通过 submit 回调提交（通常是任务队列），
+    爬取完成后由调用方通过 observe 回报结果。
+    """
+
+    def __init__(self, history_path: str, submit: Callable[[str, str], Any],
+                 interval: float = 10 * 60, budget: int = 5,
+                 min_interval: float = 6 * HOUR, max_interval: float = 30 * DAY,
+                 target_probability: float = 0.3):
+        """
+        初始化调度器
+
+        Args:
+            history_path: 检查历史文件路径
+            submit: 提交重新爬取的回调 submit(article_id, url)
+            interval: 调度周期（秒）
+            budget: 每个调度周期最多提交的重新爬取数量
+            min_interval: 最短检查间隔（秒），同时作为变化率估计的先验时长
+            max_interval: 最长检查间隔（秒）
+            target_probability: 期望每次检查时文章已发生变化的概率
+        """
+        self.history_path = history_path
+        self.submit = submit
+        self.interval = interval
+        self.budget = budget
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target_probability = target_probability
+        self._history: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._load()
+
+    def _load(self):
+        """从磁盘加载检查历史"""
+        if not os.path.exists(self.history_path):
+            return
+        try:
+            with open(self.history_path, "r", encoding="utf-8") as f:
+                self._history = json.load(f).get("articles", {})
+            logger.info(f"重新爬取历史已加载: {len(self._history)} 篇")
+        except Exception as e:
+            logger.error(f"加载重新爬取历史失败: {e}")
+
+    def _save(self):
+        """将检查历史写回磁盘（先写临时文件再替换）"""
+        os.makedirs(os.path.dirname(self.history_path) or ".", exist_ok=True)
+        temp_path = self.history_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"articles": self._history}, f, ensure_ascii=False)
+        os.replace(temp_path, self.history_path)
+
+    def change_rate(self, record: Dict[str, Any], now: Optional[float] = None) -> float:
+        """
+        估计文章的变化率（每秒变化次数）
+
+        Args:
+            record: 文章检查历史
+            now: 当前时间戳
+
+        Returns:
+            变化率
+        """
+        now = now or time.time()
+        observed = max(now - record["first_seen"], 0.0)
+        return (record["changes"] + 0.5) / (observed + self.min_interval)
+
+    def next_interval(self, record: Dict[str, Any], now: Optional[float] = None) -> float:
+        """
+        计算下次检查间隔（秒）
+
+        Args:
+            record: 文章检查历史
+            now: 当前时间戳
+
+        Returns:
+            检查间隔，限制在 [min_interval, max_interval] 范围内
+        """
+        rate = self.change_rate(record, now)
+        interval = -math.log(1.0 - self.target_probability) / rate
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def is_changed(self, article_id: str, text_hash: str) -> Optional[bool]:
+        """
+        比较正文哈希与上次记录的哈希，不修改检查历史
+
+        Args:
+            article_id: 文章ID
+            text_hash: 正文哈希（见 content_hash）
+
+        Returns:
+            正文是否发生变化；没有记录时返回None
+        """
+        with self._lock:
+            record = self._history.get(article_id)
+            if record is None:
+                return None
+            return bool(text_hash) and text_hash != record["content_hash"]
+
+    def observe(self, article_id: str, url: str, text_hash: str, unavailable: Optional[str] = None) -> Optional[bool]:
+        """
+        记录一次爬取结果并重新安排下次检查
+
+        Args:
+            article_id: 文章ID
+            url: 文章URL
+            text_hash: 正文哈希（见 content_hash）
+            unavailable: 文章已不可访问时的原因（如 deleted），此后不再调度
+
+        Returns:
+            正文是否发生变化；首次记录时返回None
+        """
+        now = time.time()
+        with self._lock:
+            record = self._history.get(article_id)
+            if record is None:
+                record = {
+                    "url": url,
+                    "content_hash": text_hash,
+                    "first_seen": now,
+                    "last_check": now,
+                    "last_change": now,
+                    "checks": 0,
+                    "changes": 0,
+                }
+                changed = None
+            else:
+                record["checks"] += 1
+                record["last_check"] = now
+                changed = bool(text_hash) and text_hash != record["content_hash"]
+                if changed:
+                    record["changes"] += 1
+                    record["last_change"] = now
+                    record["content_hash"] = text_hash
+
+            if unavailable:
+                record["unavailable"] = unavailable
+                record["next_check"] = None
+            else:
+                record.pop("unavailable", None)
+                record["next_check"] = now + self.next_interval(record, now)
+            self._history[article_id] = record
+
+            try:
+                self._save()
+            except Exception as e:
+                logger.error(f"保存重新爬取历史失败: {e}")
+        return changed
+
+    def run_due(self, budget: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        提交到期的重新爬取
+
+        按 变化率 × 逾期时长（预计错过的变化次数）从高到低选取，最多提交 budget 篇。
+
+        Args:
+            budget: 本次最多提交数量，默认使用初始化时的预算
+
+        Returns:
+            已提交的 [{"article_id", "url"}] 列表
+        """
+        budget = self.budget if budget is None else budget
+        now = time.time()
+        with self._lock:
+            due = [
+                (self.change_rate(record, now) * (now - record["last_check"]), article_id, record)
+                for article_id, record in self._history.items()
+                if record.get("next_check") and record["next_check"] <= now
+            ]
+            due.sort(key=lambda item: item[0], reverse=True)
+            selected = due[:budget]
+            # 提交后先按当前估计推迟下次检查，避免任务完成前被重复提交
+            for _, _, record in selected:
+                record["next_check"] = now + self.next_interval(record, now)
+
+        submitted = []
+        for _, article_id, record in selected:
+            try:
+                self.submit(article_id, record["url"])
+                submitted.append({"article_id": article_id, "url": record["url"]})
+            except Exception as e:
+                logger.error(f"提交重新爬取失败 {article_id}: {e}")
+
+        if submitted:
+            logger.info(f"已提交 {len(submitted)} 篇重新爬取（到期 {len(due)} 篇）")
+        return submitted
+
+    def schedule(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        查看即将到期的检查计划
+
+        Args:
+            limit: 返回数量上限
+
+        Returns:
+            按下次检查时间排序的文章列表
+        """
+        now = time.time()
+        with self._lock:
+            items = [
+                (record["next_check"], article_id, record)
+                for article_id, record in self._history.items()
+                if record.get("next_check")
+            ]
+        items.sort(key=lambda item: item[0])
+        return [
+            {
+                "article_id": article_id,
+                "url": record["url"],
+                "checks": record["checks"],
+                "changes": record["changes"],
+                "changes_per_day": round(self.change_rate(record, now) * DAY, 4),
+                "last_check": _format_time(record["last_check"]),
+                "last_change": _format_time(record["last_change"]),
+                "next_check": _format_time(next_check),
+            }
+            for next_check, article_id, record in items[:limit]
+        ]
+
+    def start(self):
+        """启动后台调度线程"""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._loop, name="recrawl-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止后台调度线程"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _loop(self):
+        """调度线程主循环"""
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.run_due()
+            except Exception as e:
+                logger.error(f"重新爬取调度出错: {e}")
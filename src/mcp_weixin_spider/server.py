@@ -16,8 +16,12 @@ import json
 import logging
 import sys
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set
 
 # 导入MCP FastMCP
 try:
@@ -33,11 +37,25 @@ sys.path.append(project_root)
 
 try:
     # 使用简化版爬虫
-    from weixin_spider_simple import WeixinSpiderWithImages
+    from weixin_spider_simple import (
+        WeixinSpiderWithImages, ArticleUnavailableError, compute_article_statistics, rate_limiter
+    )
     logging.info("使用简化版爬虫模块")
 except ImportError as e:
     logging.error(f"导入简化版爬虫模块失败: {e}")
     WeixinSpiderWithImages = None
+    ArticleUnavailableError = None
+    compute_article_statistics = None
+    rate_limiter = None
+
+from keywords import CorpusKeywordIndex
+from storage import ArticleStore, PAGE_SIZE, canonicalize_url, file_signature, make_article_id
+from similarity import SimHashIndex, simhash
+from jobs import JOB_STATUSES, CrawlJobQueue
+from accounts import AccountSyncer
+from scheduler import RecrawlScheduler, content_hash
+from export import CorpusExporter
+from coalescing import RequestCoalescer
 
 # 配置日志
 logging.basicConfig(
@@ -49,9 +67,63 @@ logger = logging.getLogger(__name__)
 # 创建FastMCP应用实例
 app = FastMCP("mcp-weixin-spider")
 
+# 文章保存目录（与爬虫模块保持一致）
+ARTICLES_DIR = os.path.join(project_root, "articles")
+
+# 爬虫实例参数（MCP服务器中使用无头模式）
+SPIDER_OPTIONS = {"headless": True, "wait_time": 10, "download_images": True, "compression": "gzip"}
+
 # 全局爬虫实例
 spider_instance: Optional[WeixinSpiderWithImages] = None
 
+# 后台图片下载实例（每个下载线程一个，不启动浏览器，与爬取用的实例互不影响）
+image_spiders = threading.local()
+all_image_spiders: List[WeixinSpiderWithImages] = []
+
+# 全局关键词索引
+keyword_index: Optional[CorpusKeywordIndex] = None
+
+# 全局文章存储
+article_store: Optional[ArticleStore] = None
+
+# 全局相似文章索引
+similarity_index: Optional[SimHashIndex] = None
+
+# 全局爬取任务队列
+job_queue: Optional[CrawlJobQueue] = None
+
+# 全局公众号同步器
+account_syncer: Optional[AccountSyncer] = None
+
+# 全局重新爬取调度器
+recrawl_scheduler: Optional[RecrawlScheduler] = None
+
+# 全局语料导出器
+corpus_exporter: Optional[CorpusExporter] = None
+
+# 后台图片下载线程池
+image_executor: Optional[ThreadPoolExecutor] = None
+
+# 爬虫实例锁（MCP工具调用与后台任务共用同一个浏览器）
+spider_lock = threading.RLock()
+
+# 同一篇文章的并发爬取请求合并为一次（按规范化URL）
+crawl_coalescer = RequestCoalescer()
+
+# 服务器启动时间，用于指标统计
+server_started_at = time.time()
+
+# 爬取状态（按文章ID记录后台图片下载进度）
+crawl_status: Dict[str, Dict[str, Any]] = {}
+crawl_status_lock = threading.Lock()
+
+# 正在后台补充下载图片的文章ID（受 crawl_status_lock 保护），同一篇文章同时只有一个补充下载
+images_in_flight: Set[str] = set()
+
+# 按文章的写入锁：保存、重写文章文件和重新登记互斥
+article_locks: Dict[str, threading.Lock] = {}
+article_locks_lock = threading.Lock()
+
 
 def get_spider_instance() -> WeixinSpiderWithImages:
     """获取爬虫实例（单例模式）"""
@@ -60,11 +132,7 @@ def get_spider_instance() -> WeixinSpiderWithImages:
         if WeixinSpiderWithImages is None:
             raise RuntimeError("爬虫模块未正确导入")
         try:
-            spider_instance = WeixinSpiderWithImages(
-                headless=True,  # MCP服务器中使用无头模式
-                wait_time=10,
-                download_images=True
-            )
+            spider_instance = WeixinSpiderWithImages(**SPIDER_OPTIONS)
             logger.info("爬虫实例初始化成功")
         except Exception as e:
             logger.error(f"爬虫实例初始化失败: {e}")
@@ -80,11 +148,7 @@ def get_spider_instance() -> WeixinSpiderWithImages:
             logger.error(f"驱动重新初始化失败: {e}")
             # 创建新的爬虫实例
             try:
-                spider_instance = WeixinSpiderWithImages(
-                    headless=True,
-                    wait_time=10,
-                    download_images=True
-                )
+                spider_instance = WeixinSpiderWithImages(**SPIDER_OPTIONS)
                 logger.info("创建新的爬虫实例成功")
             except Exception as new_e:
                 logger.error(f"创建新爬虫实例失败: {new_e}")
@@ -93,26 +157,240 @@ def get_spider_instance() -> WeixinSpiderWithImages:
     return spider_instance
 
 
-@app.tool()
-def crawl_weixin_article(url: str, download_images: bool = True, custom_filename: str = None) -> str:
+def get_image_spider() -> WeixinSpiderWithImages:
     """
-    爬取微信公众号文章内容和图片
+    获取当前线程的图片下载实例
+    
+    后台补充下载图片不借用爬取用的实例：爬取时会修改其 download_images、重建浏览器
+    甚至替换整个实例。图片下载实例不启动浏览器，有独立的网络会话。
+    """
+    spider = getattr(image_spiders, "spider", None)
+    if spider is None:
+        if WeixinSpiderWithImages is None:
+            raise RuntimeError("爬虫模块未正确导入")
+        spider = image_spiders.spider = WeixinSpiderWithImages(**SPIDER_OPTIONS, browser=False)
+        with article_locks_lock:
+            all_image_spiders.append(spider)
+    return spider
+
+
+def get_article_lock(article_id: str) -> threading.Lock:
+    """获取文章的写入锁"""
+    with article_locks_lock:
+        return article_locks.setdefault(article_id, threading.Lock())
+
+
+def get_keyword_index() -> CorpusKeywordIndex:
+    """获取语料库关键词索引（单例模式）"""
+    global keyword_index
+    if keyword_index is None:
+        keyword_index = CorpusKeywordIndex(os.path.join(ARTICLES_DIR, "keyword_df.json"))
+    return keyword_index
+
+
+def get_article_store() -> ArticleStore:
+    """获取文章存储（单例模式）"""
+    global article_store
+    if article_store is None:
+        article_store = ArticleStore(ARTICLES_DIR)
+    return article_store
+
+
+def get_similarity_index() -> SimHashIndex:
+    """获取相似文章指纹索引（单例模式）"""
+    global similarity_index
+    if similarity_index is None:
+        similarity_index = SimHashIndex(os.path.join(ARTICLES_DIR, "simhash_index.json"))
+    return similarity_index
+
+
+def get_image_executor() -> ThreadPoolExecutor:
+    """获取后台图片下载线程池"""
+    global image_executor
+    if image_executor is None:
+        image_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="image-download")
+    return image_executor
+
+
+def update_crawl_status(article_id: str, **fields):
+    """更新文章的爬取状态"""
+    with crawl_status_lock:
+        status = crawl_status.setdefault(article_id, {"article_id": article_id})
+        status.update(fields)
+        status["updated_at"] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+def start_image_completion(article_data: dict, signature: str) -> bool:
+    """
+    提交后台补充下载图片
+    
+    同一篇文章已在下载时不再提交，避免两个线程下载同样的图片并同时重写文章文件
     
     Args:
-        url: 微信公众号文章的URL链接
-        download_images: 是否下载文章中的图片
-        custom_filename: 自定义文件名（可选）
+        article_data: 已保存的文章数据（包含 article_id 和 files）
+        signature: 读取或保存 article_data 时文章JSON的版本标识（见 file_signature）
     
     Returns:
-        爬取结果的JSON字符串
+        是否已提交；已在下载时返回False
     """
+    article_id = article_data["article_id"]
+    missing = [img for img in article_data.get("images", []) if not img.get("download_success")]
+    with crawl_status_lock:
+        if article_id in images_in_flight:
+            return False
+        images_in_flight.add(article_id)
+    
+    update_crawl_status(article_id, state="downloading_images", images_done=0, images_total=len(missing))
     try:
-        # 验证URL
-        if not url or not isinstance(url, str) or not url.startswith("https://mp.weixin.qq.com/"):
-            raise ValueError("无效的微信文章URL，必须以 https://mp.weixin.qq.com/ 开头")
+        get_image_executor().submit(finish_images_in_background, article_data, signature)
+    except Exception:
+        with crawl_status_lock:
+            images_in_flight.discard(article_id)
+        raise
+    return True
+
+
+def finish_images_in_background(article_data: dict, signature: str):
+    """
+    后台补充下载文章图片
+    
+    下载完成后在文章写入锁内重写文章文件并重新登记，使统计信息包含图片下载结果。
+    下载期间文章已被重新保存（重新爬取）时放弃写入，不用旧数据覆盖新保存的文章
+    
+    Args:
+        article_data: 已保存（图片尚未全部下载）的文章数据
+        signature: 提交时文章JSON的版本标识
+    """
+    article_id = article_data["article_id"]
+    
+    def on_progress(done: int, total: int):
+        update_crawl_status(article_id, images_done=done, images_total=total)
+    
+    try:
+        spider = get_image_spider()
+        if not spider.download_missing_images(article_data, progress_callback=on_progress):
+            raise RuntimeError("补充下载图片失败")
         
-        logger.info(f"开始爬取文章: {url}")
+        with get_article_lock(article_id):
+            if file_signature(article_data["files"]["json"]) != signature:
+                logger.warning(f"下载图片期间文章已被重新保存，放弃本次写入: {article_id}")
+                return
+            if not spider.rewrite_article_files(article_data):
+                raise RuntimeError("更新文章文件失败")
+            get_article_store().register(article_data)
         
+        image_stats = article_data["statistics"]["image_statistics"]
+        update_crawl_status(
+            article_id,
+            state="images_pending" if article_data.get("images_pending") else "completed",
+            images_downloaded=f"{image_stats['downloaded_successfully']}/{image_stats['total_images']}"
+        )
+        if article_data.get("images_pending"):
+            logger.warning(f"后台图片下载超过时限，剩余图片可通过 resume_article_images 继续下载: {article_id}")
+        else:
+            logger.info(f"后台图片下载完成: {article_id}")
+    except Exception as e:
+        logger.error(f"后台图片下载失败 {article_id}: {e}")
+        update_crawl_status(article_id, state="failed", error=str(e))
+    finally:
+        with crawl_status_lock:
+            images_in_flight.discard(article_id)
+
+
+def resolve_article_data(article_data: Optional[dict], article_id: Optional[str]) -> dict:
+    """
+    获取工具要处理的文章数据
+    
+    优先按 article_id（文章ID或URL）从服务器端存储读取，
+    未提供时使用调用方传入的 article_data。
+    
+    Args:
+        article_data: 调用方传入的文章数据
+        article_id: 文章ID或文章URL
+    
+    Returns:
+        文章数据
+    """
+    if article_id:
+        try:
+            return get_article_store().load_article(article_id)
+        except KeyError:
+            raise ValueError(f"未找到已保存的文章: {article_id}")
+    
+    if not article_data or not isinstance(article_data, dict):
+        raise ValueError("必须提供 article_id，或字典格式的 article_data")
+    return article_data
+
+
+def get_statistics_record(article_data: dict) -> dict:
+    """
+    获取文章统计信息
+    
+    优先使用保存文章时预先计算的结果，旧数据或调用方传入的数据才现场计算
+    
+    Args:
+        article_data: 文章数据
+    
+    Returns:
+        统计信息
+    """
+    stats = article_data.get("statistics")
+    if stats:
+        return stats
+    if compute_article_statistics is None:
+        raise RuntimeError("爬虫模块未正确导入")
+    return compute_article_statistics(article_data)
+
+
+def crawl_and_store(url: str, download_images: bool = True, custom_filename: str = None,
+                    dedup_threshold: float = None, wait_for_images: bool = False,
+                    recrawl: bool = False) -> Dict[str, Any]:
+    """
+    爬取文章并保存、登记到文章存储
+    
+    供 crawl_weixin_article 工具和后台爬取任务共用，参数含义与工具相同。
+    文章保存并登记成功后才把正文哈希回报给重新爬取调度器；recrawl 为True（调度器
+    发起的重新爬取）且正文与上次保存的相同时不再保存文章
+    
+    同一篇文章（规范化URL相同）以相同参数已在爬取时不再重复爬取，而是等待进行中的
+    爬取并返回相同的结果（带 "coalesced": true）；参数不同的请求各自执行
+    
+    Returns:
+        爬取结果字典，出错时抛出异常
+    """
+    # 验证URL
+    if not url or not isinstance(url, str) or not url.startswith("https://mp.weixin.qq.com/"):
+        raise ValueError("无效的微信文章URL，必须以 https://mp.weixin.qq.com/ 开头")
+    
+    # 影响结果的参数都计入合并键，避免请求得到按其他参数执行的结果
+    key = (canonicalize_url(url), download_images, custom_filename, dedup_threshold, wait_for_images, recrawl)
+    result, coalesced = crawl_coalescer.run(
+        key, _crawl_and_store,
+        url, download_images, custom_filename, dedup_threshold, wait_for_images, recrawl
+    )
+    # 每个调用方得到自己的副本（run_crawl_job 会删除其中的正文）
+    result = dict(result)
+    if coalesced:
+        logger.info(f"合并到进行中的爬取: {url}")
+        result["coalesced"] = True
+    return result
+
+
+def _crawl_and_store(url: str, download_images: bool, custom_filename: Optional[str],
+                     dedup_threshold: Optional[float], wait_for_images: bool, recrawl: bool) -> Dict[str, Any]:
+    """执行一次爬取和保存（由 crawl_and_store 合并并发请求后调用）"""
+    if WeixinSpiderWithImages is None:
+        raise RuntimeError("爬虫模块未正确导入")
+    
+    # 近期已确认不可访问（删除、屏蔽等）的文章直接失败，不再打开浏览器
+    unavailable = get_article_store().get_unavailable(url)
+    if unavailable:
+        raise ArticleUnavailableError(unavailable["reason"], url, unavailable["message"])
+    
+    logger.info(f"开始爬取文章: {url}")
+    
+    # 浏览器驱动不是线程安全的，工具调用与后台任务串行使用爬虫实例
+    with spider_lock:
         # 获取爬虫实例
         spider = get_spider_instance()
         
@@ -120,48 +398,258 @@ def crawl_weixin_article(url: str, download_images: bool = True, custom_filename
         spider.download_images = download_images
         
         # 爬取文章
-        article_data = spider.crawl_article_by_url(url)
-        
-        if not article_data:
-            raise RuntimeError("无法获取文章内容")
-        
-        # 保存文章到文件
-        success = spider.save_article_to_file(article_data, custom_filename)
-        
-        if success:
-            # 构建返回结果
+        try:
+            article_data = spider.crawl_article_by_url(url)
+        except ArticleUnavailableError as e:
+            get_article_store().record_unavailable(url, e.reason, str(e))
+            if e.reason != "captcha":
+                # 文章已不存在，停止重新爬取
+                get_recrawl_scheduler().observe(make_article_id(url), url, "", unavailable=e.reason)
+            raise
+    
+    if not article_data:
+        raise RuntimeError("无法获取文章内容")
+    
+    article_data["article_id"] = make_article_id(url)
+    fingerprint = simhash(article_data.get("content_text", ""))
+    text_hash = content_hash(article_data.get("content_text", ""))
+    
+    # 只与已保存的正文比较；保存失败时不更新检查历史，下次重新爬取仍会保存
+    scheduler = get_recrawl_scheduler()
+    changed = scheduler.is_changed(article_data["article_id"], text_hash)
+    if recrawl and changed is False and get_article_store().resolve(article_data["article_id"]):
+        logger.info(f"重新爬取: 文章内容未变化 {article_data['article_id']}")
+        scheduler.observe(article_data["article_id"], url, text_hash)
+        return {
+            "status": "unchanged",
+            "message": "文章内容未变化，未重新保存",
+            "article_id": article_data["article_id"]
+        }
+    
+    # 与已保存文章高度相似时跳过图片下载和保存
+    if dedup_threshold is not None:
+        matches = get_similarity_index().query(
+            fingerprint, threshold=dedup_threshold, limit=1, exclude=article_data["article_id"]
+        )
+        if matches:
+            match = matches[0]
+            entry = get_article_store().resolve(match["article_id"]) or {}
+            logger.info(f"文章与已保存文章 {match['article_id']} 相似度 {match['similarity']}，跳过保存")
             result = {
-                "status": "success",
-                "message": "文章爬取成功",
+                "status": "duplicate",
+                "message": "文章与已保存文章高度相似，已跳过图片下载和保存",
                 "article": {
                     "title": article_data.get("title", ""),
                     "author": article_data.get("author", ""),
-                    "publish_time": article_data.get("publish_time", ""),
                     "url": article_data.get("url", ""),
-                    "content_length": len(article_data.get("content", "")),
-                    "images_count": len(article_data.get("images", [])),
-                    "crawl_time": article_data.get("crawl_time", "")
+                    "content_length": len(article_data.get("content_text", ""))
                 },
-                "files_saved": {
-                    "json": True,
-                    "txt": True,
-                    "images": download_images
+                "duplicate_of": {
+                    "article_id": match["article_id"],
+                    "similarity": match["similarity"],
+                    "title": entry.get("title", ""),
+                    "url": entry.get("url", "")
                 }
             }
-            
-            if download_images:
-                images = article_data.get("images", [])
-                success_count = sum(1 for img in images if img.get("download_success", False))
-                result["article"]["images_downloaded"] = f"{success_count}/{len(images)}"
-            
-            return json.dumps(result, ensure_ascii=False, indent=2)
+            return result
+    
+    # 保存文章到文件，需要时图片稍后在后台下载；保存与登记和后台重写文章文件互斥
+    images_in_background = download_images and not wait_for_images and bool(article_data.get("images"))
+    with spider_lock, get_article_lock(article_data["article_id"]):
+        success = spider.save_article_to_file(
+            article_data, custom_filename, download_images=download_images and not images_in_background
+        )
+        if success:
+            # 登记到文章存储，后续工具可按文章ID读取
+            article_id = get_article_store().register(article_data)
+            signature = file_signature(article_data["files"]["json"])
+    
+    if success:
+        get_similarity_index().add(article_id, fingerprint)
+        scheduler.observe(article_id, url, text_hash)
+        
+        # 更新语料库文档频率
+        try:
+            get_keyword_index().add_document(article_data["article_id"], article_data.get("content_text", ""))
+        except Exception as e:
+            logger.warning(f"更新关键词索引失败: {e}")
+        
+        # 正文第一页随结果返回，其余部分通过资源分页读取
+        first_page = get_article_store().read_page(article_id, "content_text", 0)
+        
+        # 构建返回结果
+        result = {
+            "status": "success",
+            "message": "文章爬取成功",
+            "article_id": article_id,
+            "resources": {
+                "meta": f"weixin://article/{article_id}/meta",
+                "text": f"weixin://article/{article_id}/text/0",
+                "html": f"weixin://article/{article_id}/html/0"
+            },
+            "article": {
+                "title": article_data.get("title", ""),
+                "author": article_data.get("author", ""),
+                "publish_time": article_data.get("publish_time", ""),
+                "url": article_data.get("url", ""),
+                "content_length": len(article_data.get("content_text", "")),
+                "images_count": len(article_data.get("images", [])),
+                "crawl_time": article_data.get("crawl_time", "")
+            },
+            "files_saved": {
+                "json": True,
+                "txt": True,
+                "markdown": True,
+                "images": download_images
+            },
+            "content_text": first_page["text"],
+            "content_pages": first_page["total_pages"]
+        }
+        
+        # 各阶段耗时与时限；后台下载图片时随后补充 images 阶段，这里复制一份
+        timings = article_data.get("timings")
+        if timings:
+            result["timings"] = {**timings, "stages": dict(timings.get("stages", {}))}
+        
+        # 先构建返回结果再提交，后台线程会修改 article_data 中的图片信息
+        images_total = len(article_data.get("images", []))
+        if images_in_background and start_image_completion(article_data, signature):
+            result["images_status"] = {
+                "state": "downloading_images",
+                "images_total": images_total,
+                "status_tool": "get_crawl_status"
+            }
+        elif article_data.get("images_pending"):
+            # 图片下载超过时限，或上一次保存的图片仍在后台下载（本次保存的图片未下载），
+            # 剩余图片留待 resume_article_images 继续下载
+            update_crawl_status(article_id, state="images_pending")
+            result["images_status"] = {
+                "state": "images_pending",
+                "resume_tool": "resume_article_images"
+            }
         else:
-            raise RuntimeError("保存文件时出错")
+            update_crawl_status(article_id, state="completed")
+            if download_images:
+                image_stats = article_data["statistics"]["image_statistics"]
+                result["article"]["images_downloaded"] = (
+                    f"{image_stats['downloaded_successfully']}/{image_stats['total_images']}"
+                )
+        
+        return result
+    else:
+        raise RuntimeError("保存文件时出错")
+
+
+def run_crawl_job(url: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    执行一个后台爬取任务
+    
+    任务本身已在后台运行，因此同步等待图片下载完成，保证任务完成时文章文件完整
+    
+    Args:
+        url: 文章URL
+        options: 提交任务时的选项
+    
+    Returns:
+        爬取结果（不含正文，正文通过文章ID读取）
+    """
+    result = crawl_and_store(
+        url,
+        download_images=options.get("download_images", True),
+        custom_filename=options.get("custom_filename"),
+        dedup_threshold=options.get("dedup_threshold"),
+        wait_for_images=True,
+        recrawl=options.get("recrawl", False)
+    )
+    result.pop("content_text", None)
+    return result
+
+
+def get_job_queue() -> CrawlJobQueue:
+    """获取爬取任务队列（单例模式），首次获取时恢复未完成的任务并启动工作线程"""
+    global job_queue
+    if job_queue is None:
+        os.makedirs(ARTICLES_DIR, exist_ok=True)
+        job_queue = CrawlJobQueue(os.path.join(ARTICLES_DIR, "jobs.sqlite3"), run_crawl_job)
+        job_queue.start()
+    return job_queue
+
+
+def collect_account_links(entry_url: str) -> List[Dict[str, Any]]:
+    """使用浏览器收集公众号主页中的文章链接"""
+    with spider_lock:
+        return get_spider_instance().collect_article_links(entry_url)
+
+
+def get_account_syncer() -> AccountSyncer:
+    """获取公众号同步器（单例模式）"""
+    global account_syncer
+    if account_syncer is None:
+        account_syncer = AccountSyncer(
+            os.path.join(ARTICLES_DIR, "account_checkpoints.json"),
+            session_getter=lambda: get_spider_instance().session,
+            link_collector=collect_account_links,
+            job_status=lambda job_id: (get_job_queue().get(job_id) or {}).get("status")
+        )
+    return account_syncer
+
+
+def submit_recrawl(article_id: str, url: str):
+    """将调度器选出的重新爬取提交到任务队列"""
+    get_job_queue().submit(url, {"download_images": True, "recrawl": True})
+
+
+def get_recrawl_scheduler() -> RecrawlScheduler:
+    """获取重新爬取调度器（单例模式）"""
+    global recrawl_scheduler
+    if recrawl_scheduler is None:
+        recrawl_scheduler = RecrawlScheduler(
+            os.path.join(ARTICLES_DIR, "recrawl_history.json"),
+            submit=submit_recrawl
+        )
+    return recrawl_scheduler
+
+
+def get_corpus_exporter() -> CorpusExporter:
+    """获取语料导出器（单例模式）"""
+    global corpus_exporter
+    if corpus_exporter is None:
+        corpus_exporter = CorpusExporter(get_article_store())
+    return corpus_exporter
+
+
+@app.tool()
+async def crawl_weixin_article(url: str, download_images: bool = True, custom_filename: str = None,
+                               dedup_threshold: float = None, wait_for_images: bool = False) -> str:
+    """
+    爬取微信公众号文章内容和图片
+    
+    文章正文提取完成后立即返回，图片默认在后台继续下载，
+    可通过 get_crawl_status 查询下载进度
+    
+    Args:
+        url: 微信公众号文章的URL链接
+        download_images: 是否下载文章中的图片
+        custom_filename: 自定义文件名（可选）
+        dedup_threshold: 去重相似度阈值（0~1，可选）。与已保存文章的相似度达到该值时，
+            跳过图片下载和保存，直接返回重复的文章
+        wait_for_images: 是否等待图片全部下载完成后再返回
+    
+    Returns:
+        爬取结果的JSON字符串
+    """
+    try:
+        # 浏览器操作和文件写入都在线程中进行，爬取期间服务器仍可响应其他请求
+        result = await asyncio.to_thread(
+            crawl_and_store, url, download_images, custom_filename, dedup_threshold, wait_for_images
+        )
+        return json.dumps(result, ensure_ascii=False, indent=2)
             
     except Exception as e:
         logger.error(f"爬取文章失败: {e}")
         error_result = {
             "status": "error",
+            "error_type": getattr(e, "reason", "crawl_failed"),
             "message": f"爬取失败: {str(e)}",
             "url": url
         }
@@ -169,61 +657,52 @@ def crawl_weixin_article(url: str, download_images: bool = True, custom_filename
 
 
 @app.tool()
-def analyze_article_content(article_data: dict, analysis_type: str = "full") -> str:
+def analyze_article_content(article_data: dict = None, analysis_type: str = "full", article_id: str = None) -> str:
     """
     分析已爬取的文章内容，提取关键信息
     
     Args:
-        article_data: 文章数据对象
+        article_data: 文章数据对象（提供 article_id 时可省略）
         analysis_type: 分析类型：summary(摘要), keywords(关键词), images(图片信息), full(完整分析)
+        article_id: 已保存文章的ID或URL，由服务器端读取文章数据
     
     Returns:
         分析结果的JSON字符串
     """
     try:
-        if not article_data or not isinstance(article_data, dict):
-            raise ValueError("article_data 必须是字典格式的文章数据")
+        article_data = resolve_article_data(article_data, article_id)
         
-        # 检查文章数据的基本字段
-        required_fields = ["title", "content"]
-        missing_fields = [field for field in required_fields if field not in article_data]
-        if missing_fields:
-            logger.warning(f"文章数据缺少字段: {missing_fields}")
+        # 检查文章数据的基本字段（爬虫保存的正文字段为 content_text）
+        if "title" not in article_data or not ("content_text" in article_data or "content" in article_data):
+            logger.warning("文章数据缺少标题或正文字段")
         
         logger.info(f"分析文章内容: analysis_type={analysis_type}, 文章标题={article_data.get('title', 'N/A')[:30]}...")
         
         result = {"analysis_type": analysis_type}
+        content = article_data.get("content_text") or article_data.get("content", "")
+        stats = get_statistics_record(article_data)
         
         if analysis_type in ["summary", "full"]:
-            content = article_data.get("content", "")
             result["summary"] = {
                 "title": article_data.get("title", ""),
                 "author": article_data.get("author", ""),
                 "publish_time": article_data.get("publish_time", ""),
                 "content_preview": content[:200] + "..." if len(content) > 200 else content,
-                "word_count": len(content),
-                "paragraph_count": len(content.split("\n\n")) if content else 0
+                "word_count": stats["content_statistics"]["total_characters"],
+                "paragraph_count": stats["content_statistics"]["paragraphs"]
             }
         
         if analysis_type in ["keywords", "full"]:
-            content = article_data.get("content", "")
-            # 简单的关键词提取
-            words = content.split()
-            word_freq = {}
-            for word in words:
-                if len(word) > 1:  # 过滤单字符
-                    word_freq[word] = word_freq.get(word, 0) + 1
-            
-            # 获取前10个高频词
-            top_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)[:10]
-            result["keywords"] = [word for word, freq in top_words]
+            # 基于语料库文档频率的TF-IDF关键词提取
+            result["keywords"] = get_keyword_index().extract(content, top_k=10)
         
         if analysis_type in ["images", "full"]:
             images = article_data.get("images", [])
+            image_stats = stats["image_statistics"]
             result["images_analysis"] = {
-                "total_count": len(images),
-                "downloaded_count": sum(1 for img in images if img.get("download_success", False)),
-                "failed_count": sum(1 for img in images if not img.get("download_success", False)),
+                "total_count": image_stats["total_images"],
+                "downloaded_count": image_stats["downloaded_successfully"],
+                "failed_count": image_stats["download_failed"],
                 "image_details": [
                     {
                         "filename": img.get("filename", ""),
@@ -246,58 +725,611 @@ def analyze_article_content(article_data: dict, analysis_type: str = "full") ->
 
 
 @app.tool()
-def get_article_statistics(article_data: dict) -> str:
+def get_article_statistics(article_data: dict = None, article_id: str = None) -> str:
     """
     获取文章统计信息（字数、图片数量等）
     
     Args:
-        article_data: 文章数据对象
+        article_data: 文章数据对象（提供 article_id 时可省略）
+        article_id: 已保存文章的ID或URL，由服务器端读取文章数据
     
     Returns:
         统计信息的JSON字符串
     """
     try:
-        if not article_data or not isinstance(article_data, dict):
-            raise ValueError("article_data 必须是字典格式的文章数据")
+        # 已保存的文章直接返回索引中预先计算的统计信息，无需读取文章文件
+        stats = get_article_store().get_statistics(article_id) if article_id else None
+        if stats is None:
+            article_data = resolve_article_data(article_data, article_id)
+            stats = get_statistics_record(article_data)
+        
+        return json.dumps(stats, ensure_ascii=False, indent=2)
+        
+    except Exception as e:
+        logger.error(f"获取统计信息失败: {e}")
+        error_result = {
+            "status": "error",
+            "message": f"统计失败: {str(e)}"
+        }
+        return json.dumps(error_result, ensure_ascii=False, indent=2)
+
+
+@app.tool()
+def submit_crawl_job(url: str, download_images: bool = True, custom_filename: str = None,
+                     dedup_threshold: float = None) -> str:
+    """
+    提交后台爬取任务，立即返回任务ID
+    
+    任务保存在磁盘上，服务器重启后未完成的任务会自动恢复执行
+    
+    Args:
+        url: 微信公众号文章的URL链接
+        download_images: 是否下载文章中的图片
+        custom_filename: 自定义文件名（可选）
+        dedup_threshold: 去重相似度阈值（0~1，可选）
+    
+    Returns:
+        任务信息的JSON字符串
+    """
+    try:
+        if not url or not isinstance(url, str) or not url.startswith("https://mp.weixin.qq.com/"):
+            raise ValueError("无效的微信文章URL，必须以 https://mp.weixin.qq.com/ 开头")
         
-        content = article_data.get("content", "")
-        images = article_data.get("images", [])
+        options = {"download_images": download_images}
+        if custom_filename:
+            options["custom_filename"] = custom_filename
+        if dedup_threshold is not None:
+            options["dedup_threshold"] = dedup_threshold
         
-        stats = {
-            "basic_info": {
-                "title": article_data.get("title", ""),
-                "author": article_data.get("author", ""),
-                "publish_time": article_data.get("publish_time", ""),
-                "crawl_time": article_data.get("crawl_time", "")
-            },
-            "content_statistics": {
-                "total_characters": len(content),
-                "total_words": len(content.split()),
-                "paragraphs": len(content.split("\n\n")) if content else 0,
-                "lines": len(content.split("\n")) if content else 0
-            },
-            "image_statistics": {
-                "total_images": len(images),
-                "downloaded_successfully": sum(1 for img in images if img.get("download_success", False)),
-                "download_failed": sum(1 for img in images if not img.get("download_success", False)),
-                "download_success_rate": f"{(sum(1 for img in images if img.get('download_success', False)) / len(images) * 100):.1f}%" if images else "0%"
+        job = get_job_queue().submit(url, options)
+        return json.dumps({"status": "success", "job": job}, ensure_ascii=False, indent=2)
+        
+    except Exception as e:
+        logger.error(f"提交爬取任务失败: {e}")
+        error_result = {
+            "status": "error",
+            "message": f"提交失败: {str(e)}",
+            "url": url
+        }
+        return json.dumps(error_result, ensure_ascii=False, indent=2)
+
+
+@app.tool()
+def get_job(job_id: str) -> str:
+    """
+    查询爬取任务状态和结果
+    
+    Args:
+        job_id: 任务ID
+    
+    Returns:
+        任务信息的JSON字符串
+    """
+    try:
+        job = get_job_queue().get(job_id)
+        if job is None:
+            raise ValueError(f"未找到任务: {job_id}")
+        return json.dumps({"status": "success", "job": job}, ensure_ascii=False, indent=2)
+        
+    except Exception as e:
+        logger.error(f"查询爬取任务失败: {e}")
+        error_result = {
+            "status": "error",
+            "message": f"查询失败: {str(e)}"
+        }
+        return json.dumps(error_result, ensure_ascii=False, indent=2)
+
+
+@app.tool()
+def list_jobs(status: str = None, limit: int = 20) -> str:
+    """
+    列出爬取任务
+    
+    Args:
+        status: 按状态过滤：queued(排队中), running(运行中), done(已完成), failed(已失败)，为空时列出全部
+        limit: 返回数量上限
+    
+    Returns:
+        任务列表的JSON字符串
+    """
+    try:
+        if status and status not in JOB_STATUSES:
+            raise ValueError(f"无效的任务状态: {status}，可选值: {', '.join(JOB_STATUSES)}")
+        
+        queue = get_job_queue()
+        jobs = queue.list(status=status, limit=limit)
+        result = {
+            "status": "success",
+            "counts": queue.counts(),
+            "jobs": [
+                {
+                    "id": job["id"],
+                    "url": job["url"],
+                    "status": job["status"],
+                    "attempts": job["attempts"],
+                    "article_id": (job["result"] or {}).get("article_id"),
+                    "error": job["error"],
+                    "created_at": job["created_at"],
+                    "updated_at": job["updated_at"]
+                }
+                for job in jobs
+            ]
+        }
+        return json.dumps(result, ensure_ascii=False, indent=2)
+        
+    except Exception as e:
+        logger.error(f"列出爬取任务失败: {e}")
+        error_result = {
+            "status": "error",
+            "message": f"查询失败: {str(e)}"
+        }
+        return json.dumps(error_result, ensure_ascii=False, indent=2)
+
+
+@app.tool()
+async def sync_account(entry_url: str, max_articles: int = 50, download_images: bool = True) -> str:
+    """
+    增量同步公众号合集或主页
+    
+    只提交上次同步之后发布的新文章为后台爬取任务，并推进该入口的检查点；
+    上次提交后爬取失败的文章会重新提交
+    
+    Args:
+        entry_url: 合集页URL（mp/appmsgalbum?__biz=...&album_id=...）或公众号主页URL（含 __biz）
+        max_articles: 本次最多提交的新文章数量，其余留待下次同步
+        download_images: 是否下载文章中的图片
+    
+    Returns:
+        同步结果的JSON字符串
+    """
+    try:
+        queue = get_job_queue()
+        # 合集接口请求和主页的浏览器操作都在线程中进行，不阻塞事件循环
+        sync_result = await asyncio.to_thread(
+            get_account_syncer().sync, entry_url, max_articles=max_articles,
+            submit=lambda url: queue.submit(url, {"download_images": download_images})["id"]
+        )
+        
+        jobs = [
+            {"job_id": article["job_id"], "url": article["url"], "title": article["title"]}
+            for article in sync_result["new_articles"]
+        ]
+        
+        result = {
+            "status": "success",
+            "account": sync_result["key"],
+            "kind": sync_result["kind"],
+            "new_articles": len(jobs),
+            "jobs": jobs,
+            "checkpoint": sync_result["checkpoint"]
+        }
+        return json.dumps(result, ensure_ascii=False, indent=2)
+        
+    except Exception as e:
+        logger.error(f"同步公众号失败: {e}")
+        error_result = {
+            "status": "error",
+            "message": f"同步失败: {str(e)}",
+            "entry_url": entry_url
+        }
+        return json.dumps(error_result, ensure_ascii=False, indent=2)
+
+
+@app.tool()
+def list_synced_accounts() -> str:
+    """
+    列出已同步的公众号入口及其检查点
+    
+    Returns:
+        检查点列表的JSON字符串
+    """
+    try:
+        result = {
+            "status": "success",
+            "accounts": get_account_syncer().list_checkpoints()
+        }
+        return json.dumps(result, ensure_ascii=False, indent=2)
+        
+    except Exception as e:
+        logger.error(f"列出同步入口失败: {e}")
+        error_result = {
+            "status": "error",
+            "message": f"查询失败: {str(e)}"
+        }
+        return json.dumps(error_result, ensure_ascii=False, indent=2)
+
+
+@app.tool()
+def get_recrawl_schedule(limit: int = 20) -> str:
+    """
+    查看文章重新爬取计划
+    
+    下次检查时间根据每篇文章观测到的变化率自动调整：经常修改的文章检查更频繁，
+    长期没有变化的文章检查间隔逐渐拉长
+    
+    Args:
+        limit: 返回数量上限
+    
+    Returns:
+        重新爬取计划的JSON字符串，按下次检查时间排序
+    """
+    try:
+        result = {
+            "status": "success",
+            "schedule": get_recrawl_scheduler().schedule(limit=limit)
+        }
+        return json.dumps(result, ensure_ascii=False, indent=2)
+        
+    except Exception as e:
+        logger.error(f"查询重新爬取计划失败: {e}")
+        error_result = {
+            "status": "error",
+            "message": f"查询失败: {str(e)}"
+        }
+        return json.dumps(error_result, ensure_ascii=False, indent=2)
+
+
+@app.tool()
+def run_due_recrawls(budget: int = 5) -> str:
+    """
+    立即提交已到期的重新爬取任务（不等待下一个调度周期）
+    
+    Args:
+        budget: 本次最多提交的文章数量
+    
+    Returns:
+        已提交文章列表的JSON字符串
+    """
+    try:
+        submitted = get_recrawl_scheduler().run_due(budget=budget)
+        result = {
+            "status": "success",
+            "submitted": len(submitted),
+            "articles": submitted
+        }
+        return json.dumps(result, ensure_ascii=False, indent=2)
+        
+    except Exception as e:
+        logger.error(f"提交重新爬取失败: {e}")
+        error_result = {
+            "status": "error",
+            "message": f"提交失败: {str(e)}"
+        }
+        return json.dumps(error_result, ensure_ascii=False, indent=2)
+
+
+@app.tool()
+def export_corpus(full: bool = False) -> str:
+    """
+    将已保存的文章和图片信息增量导出为按抓取日期分区的列式文件（Parquet，无Parquet引擎时为CSV.gz）
+    
+    只导出上次导出后新增或重新保存的文章，供批量分析直接加载
+    
+    Args:
+        full: 是否忽略导出状态，重新导出全部文章
+    
+    Returns:
+        导出结果的JSON字符串
+    """
+    try:
+        result = {
+            "status": "success",
+            **get_corpus_exporter().export(full=full)
+        }
+        return json.dumps(result, ensure_ascii=False, indent=2)
+        
+    except Exception as e:
+        logger.error(f"导出语料失败: {e}")
+        error_result = {
+            "status": "error",
+            "message": f"导出失败: {str(e)}"
+        }
+        return json.dumps(error_result, ensure_ascii=False, indent=2)
+
+
+@app.tool()
+def get_corpus_summary(since: str = None, until: str = None, top: int = 10) -> str:
+    """
+    查询已导出语料的概况（文章数量、按抓取日期和作者的分布）
+    
+    Args:
+        since: 起始抓取日期（YYYY-MM-DD，含）
+        until: 截止抓取日期（YYYY-MM-DD，含）
+        top: 返回的高产作者数量
+    
+    Returns:
+        语料概况的JSON字符串
+    """
+    try:
+        result = {
+            "status": "success",
+            **get_corpus_exporter().summary(since=since, until=until, top=top)
+        }
+        return json.dumps(result, ensure_ascii=False, indent=2)
+        
+    except Exception as e:
+        logger.error(f"查询语料概况失败: {e}")
+        error_result = {
+            "status": "error",
+            "message": f"查询失败: {str(e)}"
+        }
+        return json.dumps(error_result, ensure_ascii=False, indent=2)
+
+
+@app.tool()
+def get_server_metrics() -> str:
+    """
+    查看服务器运行指标
+    
+    包括并发爬取请求的合并情况（请求数、实际爬取次数、被合并的重复请求数）、
+    各主机的自适应请求速率、后台任务数量和图片下载状态
+    
+    Returns:
+        运行指标的JSON字符串
+    """
+    try:
+        with crawl_status_lock:
+            image_states: Dict[str, int] = {}
+            for status in crawl_status.values():
+                state = status.get("state", "unknown")
+                image_states[state] = image_states.get(state, 0) + 1
+        
+        result = {
+            "status": "success",
+            "uptime_seconds": round(time.time() - server_started_at, 1),
+            "crawl_coalescing": crawl_coalescer.get_stats(),
+            "rate_limits": rate_limiter.get_rates() if rate_limiter else {},
+            "jobs": job_queue.counts() if job_queue else {},
+            "crawl_states": image_states
+        }
+        return json.dumps(result, ensure_ascii=False, indent=2)
+        
+    except Exception as e:
+        logger.error(f"获取服务器指标失败: {e}")
+        error_result = {
+            "status": "error",
+            "message": f"查询失败: {str(e)}"
+        }
+        return json.dumps(error_result, ensure_ascii=False, indent=2)
+
+
+@app.tool()
+def get_crawl_status(article_id: str) -> str:
+    """
+    查询文章爬取状态（包括后台图片下载进度）
+    
+    Args:
+        article_id: 文章ID或文章URL
+    
+    Returns:
+        爬取状态的JSON字符串
+    """
+    try:
+        entry = get_article_store().resolve(article_id)
+        resolved_id = entry["article_id"] if entry else article_id
+        with crawl_status_lock:
+            status = dict(crawl_status.get(resolved_id, {}))
+        
+        if not status:
+            if entry is None:
+                raise ValueError(f"未找到文章: {article_id}")
+            # 之前运行中保存的文章，没有进行中的任务
+            status = {"article_id": resolved_id, "state": "completed"}
+        
+        if entry and entry.get("statistics"):
+            status["image_statistics"] = entry["statistics"]["image_statistics"]
+        
+        return json.dumps({"status": "success", "crawl_status": status}, ensure_ascii=False, indent=2)
+        
+    except Exception as e:
+        logger.error(f"查询爬取状态失败: {e}")
+        error_result = {
+            "status": "error",
+            "message": f"查询失败: {str(e)}"
+        }
+        return json.dumps(error_result, ensure_ascii=False, indent=2)
+
+
+@app.tool()
+def resume_article_images(article_id: str) -> str:
+    """
+    继续下载已保存文章中尚未下载成功的图片（例如因超过图片下载时限而跳过的图片）
+    
+    下载在后台进行，进度通过 get_crawl_status 查询
+    
+    Args:
+        article_id: 文章ID或文章URL
+    
+    Returns:
+        提交结果的JSON字符串
+    """
+    try:
+        entry = get_article_store().resolve(article_id)
+        if entry is None:
+            raise ValueError(f"未找到文章: {article_id}")
+        # 先取版本标识再读取，读取后文章被重新保存时后台下载不会覆盖新文件
+        signature = file_signature(entry["files"]["json"])
+        article_data = get_article_store().load_article(entry["article_id"])
+        article_data["article_id"] = entry["article_id"]
+        article_data["files"] = entry["files"]
+        
+        missing = [img for img in article_data.get("images", []) if not img.get("download_success")]
+        if not missing:
+            result = {"status": "success", "message": "文章图片均已下载", "article_id": entry["article_id"]}
+            return json.dumps(result, ensure_ascii=False, indent=2)
+        
+        if not start_image_completion(article_data, signature):
+            result = {
+                "status": "already_downloading",
+                "message": "文章图片已在后台下载，请通过 get_crawl_status 查询进度",
+                "article_id": entry["article_id"],
+                "status_tool": "get_crawl_status"
+            }
+            return json.dumps(result, ensure_ascii=False, indent=2)
+        
+        result = {
+            "status": "success",
+            "message": f"已开始下载 {len(missing)} 张图片",
+            "article_id": entry["article_id"],
+            "images_status": {
+                "state": "downloading_images",
+                "images_total": len(missing),
+                "status_tool": "get_crawl_status"
             }
         }
+        return json.dumps(result, ensure_ascii=False, indent=2)
         
-        return json.dumps(stats, ensure_ascii=False, indent=2)
+    except Exception as e:
+        logger.error(f"继续下载图片失败: {e}")
+        error_result = {
+            "status": "error",
+            "message": f"继续下载失败: {str(e)}",
+            "article_id": article_id
+        }
+        return json.dumps(error_result, ensure_ascii=False, indent=2)
+
+
+@app.tool()
+def find_similar_articles(article_id: str = None, text: str = None, threshold: float = 0.9, limit: int = 10) -> str:
+    """
+    查找与指定文章或文本内容相似的已保存文章
+    
+    Args:
+        article_id: 已保存文章的ID或URL
+        text: 待比较的文本（未提供 article_id 时使用）
+        threshold: 相似度阈值（0~1），默认0.9
+        limit: 返回数量上限
+    
+    Returns:
+        相似文章列表的JSON字符串
+    """
+    try:
+        exclude = None
+        if article_id:
+            entry = get_article_store().resolve(article_id)
+            if entry is None:
+                raise ValueError(f"未找到已保存的文章: {article_id}")
+            exclude = entry["article_id"]
+            fingerprint = get_similarity_index().get(exclude)
+            if fingerprint is None:
+                article_data = get_article_store().load_article(exclude)
+                fingerprint = simhash(article_data.get("content_text", ""))
+        elif text:
+            fingerprint = simhash(text)
+        else:
+            raise ValueError("必须提供 article_id 或 text")
+        
+        matches = get_similarity_index().query(fingerprint, threshold=threshold, limit=limit, exclude=exclude)
+        for match in matches:
+            entry = get_article_store().resolve(match["article_id"]) or {}
+            match["title"] = entry.get("title", "")
+            match["url"] = entry.get("url", "")
+        
+        result = {
+            "status": "success",
+            "threshold": threshold,
+            "count": len(matches),
+            "similar_articles": matches
+        }
+        return json.dumps(result, ensure_ascii=False, indent=2)
         
     except Exception as e:
-        logger.error(f"获取统计信息失败: {e}")
+        logger.error(f"查找相似文章失败: {e}")
         error_result = {
             "status": "error",
-            "message": f"统计失败: {str(e)}"
+            "message": f"查找失败: {str(e)}"
         }
         return json.dumps(error_result, ensure_ascii=False, indent=2)
 
 
+@app.resource("weixin://articles", mime_type="application/json")
+def list_articles_resource() -> str:
+    """最近保存的文章列表"""
+    articles = [
+        {
+            "article_id": entry["article_id"],
+            "title": entry.get("title", ""),
+            "author": entry.get("author", ""),
+            "url": entry.get("url", ""),
+            "crawl_time": entry.get("crawl_time", ""),
+            "meta": f"weixin://article/{entry['article_id']}/meta"
+        }
+        for entry in get_article_store().list_articles(limit=50)
+    ]
+    return json.dumps({"articles": articles}, ensure_ascii=False)
+
+
+@app.resource("weixin://article/{article_id}/meta", mime_type="application/json")
+def article_meta_resource(article_id: str) -> str:
+    """文章元数据、统计信息和正文分页信息"""
+    store = get_article_store()
+    entry = store.resolve(article_id)
+    if entry is None:
+        raise ValueError(f"未找到已保存的文章: {article_id}")
+    
+    pages = {}
+    for field, name in (("content_text", "text"), ("content_html", "html")):
+        total_bytes = store.get_field_size(article_id, field)
+        pages[name] = {
+            "total_bytes": total_bytes,
+            "total_pages": max(1, (total_bytes + PAGE_SIZE - 1) // PAGE_SIZE),
+            "uri_template": f"weixin://article/{entry['article_id']}/{name}/{{page}}"
+        }
+    
+    meta = {
+        "article_id": entry["article_id"],
+        "title": entry.get("title", ""),
+        "author": entry.get("author", ""),
+        "publish_time": entry.get("publish_time", ""),
+        "crawl_time": entry.get("crawl_time", ""),
+        "url": entry.get("url", ""),
+        "page_size": PAGE_SIZE,
+        "pages": pages,
+        "statistics": entry.get("statistics")
+    }
+    return json.dumps(meta, ensure_ascii=False)
+
+
+@app.resource("weixin://article/{article_id}/text/{page}", mime_type="text/plain")
+def article_text_resource(article_id: str, page: str) -> str:
+    """按页读取文章纯文本"""
+    return get_article_store().read_page(article_id, "content_text", int(page))["text"]
+
+
+@app.resource("weixin://article/{article_id}/html/{page}", mime_type="text/html")
+def article_html_resource(article_id: str, page: str) -> str:
+    """按页读取文章HTML"""
+    return get_article_store().read_page(article_id, "content_html", int(page))["text"]
+
+
 def cleanup():
     """清理资源"""
-    global spider_instance
+    global spider_instance, image_executor, job_queue, recrawl_scheduler
+    if recrawl_scheduler:
+        recrawl_scheduler.stop()
+        recrawl_scheduler = None
+    
+    if job_queue:
+        # 正在执行的任务在当前文章结束后停止，未完成的任务下次启动时恢复
+        job_queue.stop(timeout=60)
+        job_queue = None
+    
+    if image_executor:
+        # 等待进行中的图片下载完成，避免文章文件停留在未完成状态
+        image_executor.shutdown(wait=True)
+        image_executor = None
+    
+    # 关键词和相似文章索引延迟写盘，退出前写回剩余修改
+    for index in (keyword_index, similarity_index):
+        if index is not None:
+            index.flush()
+    
+    with article_locks_lock:
+        image_spider_list = list(all_image_spiders)
+        all_image_spiders.clear()
+    for image_spider in image_spider_list:
+        image_spider.close()
+    
     if spider_instance:
         try:
             spider_instance.close()
@@ -317,6 +1349,11 @@ def main():
             return
         
         logger.info("爬虫模块导入成功")
+        
+        # 恢复上次未完成的爬取任务，并启动重新爬取调度
+        get_job_queue()
+        get_recrawl_scheduler().start()
+        
         logger.info("MCP微信爬虫服务器启动")
         
         # 运行FastMCP应用
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+相似文章检测
+
+使用64位SimHash为文章正文生成指纹，并按8个8位分段建立LSH倒排表：
+两篇文章指纹的汉明距离不超过7时，至少有一个分段完全相同，
+因此查询只需比较同一分段桶中的候选文章。
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from keywords import tokenize
+from persist import DeferredWriter
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_BITS = 64
+BAND_BITS = 8
+BAND_COUNT = FINGERPRINT_BITS // BAND_BITS
+# 分段LSH能保证召回的最大汉明距离
+MAX_BANDED_DISTANCE = BAND_COUNT - 1
+
+_BIT_SHIFTS = np.arange(FINGERPRINT_BITS, dtype=np.uint64)
+
+
+def _hash64(token: str) -> int:
+    """计算词的64位稳定哈希（不受PYTHONHASHSEED影响）"""
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(text: str) -> int:
+    """
+    计算文本的SimHash指纹
+
+    Args:
+        text: 文章纯文本
+
+    Returns:
+        64位整数指纹，空文本返回0
+    """
+    tokens = tokenize(text)
+    if not tokens:
+        return 0
+
+    terms, counts = np.unique(np.array(tokens), return_counts=True)
+    hashes = np.fromiter((_hash64(str(term)) for term in terms), dtype=np.uint64, count=len(terms))
+
+    # 每个词的64个比特位，置位记+权重，未置位记-权重
+    bits = ((hashes[:, None] >> _BIT_SHIFTS) & np.uint64(1)).astype(np.float64)
+    vector = (bits * 2.0 - 1.0).T @ counts.astype(np.float64)
+
+    fingerprint = 0
+    for i in np.nonzero(vector > 0)[0]:
+        fingerprint |= 1 << int(i)
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """计算两个指纹的汉明距离"""
+    return bin(a ^ b).count("1")
+
+
+def similarity_to_distance(threshold: float) -> int:
+    """将相似度阈值（0~1）换算为最大汉明距离"""
+    threshold = min(max(threshold, 0.0), 1.0)
+    return int((1.0 - threshold) * FINGERPRINT_BITS)
+
+
+def _bands(fingerprint: int) -> List[Tuple[int, int]]:
+    """将指纹拆分为 (分段序号, 分段值) 列表"""
+    mask = (1 << BAND_BITS) - 1
+    return [(band, (fingerprint >> (band * BAND_BITS)) & mask) for band in range(BAND_COUNT)]
+
+
+class SimHashIndex:
+    """
+    文章指纹索引
+
+    指纹以十六进制字符串保存在JSON文件中，分段倒排表在加载时重建。
+    登记的指纹最多 flush_interval 秒后合并写盘，进程退出前应调用 flush。
+    """
+
+    def __init__(self, index_path: str, flush_interval: float = 5.0):
+        """
+        初始化指纹索引
+
+        Args:
+            index_path: 指纹文件路径
+            flush_interval: 登记后延迟写盘的秒数，0 表示每次登记立即写盘
+        """
+        self.index_path = index_path
+        self._fingerprints: Dict[str, int] = {}
+        self._buckets: Dict[Tuple[int, int], Set[str]] = {}
+        self._lock = threading.Lock()
+        self._writer = DeferredWriter(self._save, self._lock, flush_interval, "相似文章索引")
+        self._load()
+
+    def _load(self):
+        """从磁盘加载指纹"""
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for article_id, value in data.get("fingerprints", {}).items():
+                self._insert(article_id, int(value, 16))
+            logger.info(f"相似文章索引已加载: {len(self._fingerprints)} 篇")
+        except Exception as e:
+            logger.error(f"加载相似文章索引失败: {e}")
+
+    def _save(self):
+        """将指纹写回磁盘（先写临时文件再替换）"""
+        os.makedirs(os.path.dirname(self.index_path) or ".", exist_ok=True)
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "fingerprints": {
+                    article_id: f"{value:016x}" for article_id, value in self._fingerprints.items()
+                }
+            }, f)
+        os.replace(temp_path, self.index_path)
+
+    def _insert(self, article_id: str, fingerprint: int):
+        """将指纹加入内存索引"""
+        self._remove(article_id)
+        self._fingerprints[article_id] = fingerprint
+        for key in _bands(fingerprint):
+            self._buckets.setdefault(key, set()).add(article_id)
+
+    def _remove(self, article_id: str):
+        """从内存索引中移除指纹"""
+        old = self._fingerprints.pop(article_id, None)
+        if old is None:
+            return
+        for key in _bands(old):
+            bucket = self._buckets.get(key)
+            if bucket:
+                bucket.discard(article_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def add(self, article_id: str, fingerprint: int):
+        """
+        登记文章指纹
+
+        Args:
+            article_id: 文章ID
+            fingerprint: SimHash指纹
+        """
+        if not article_id or not fingerprint:
+            return
+        with self._lock:
+            if self._fingerprints.get(article_id) == fingerprint:
+                return
+            self._insert(article_id, fingerprint)
+            self._writer.mark_dirty()
+
+    def flush(self) -> bool:
+        """
+        立即写回未保存的指纹
+
+        Returns:
+            磁盘上的指纹文件是否已是最新
+        """
+        return self._writer.flush()
+
+    def get(self, article_id: str) -> Optional[int]:
+        """获取已登记文章的指纹"""
+        with self._lock:
+            return self._fingerprints.get(article_id)
+
+    def query(self, fingerprint: int, threshold: float = 0.9, limit: int = 10,
+              exclude: Optional[str] = None) -> List[Dict[str, float]]:
+        """
+        查找相似文章
+
+        Args:
+            fingerprint: 待查询的SimHash指纹
+            threshold: 相似度阈值（0~1），相似度 = 1 - 汉明距离/64
+            limit: 返回数量上限
+            exclude: 排除的文章ID（通常是文章自身）
+
+        Returns:
+            [{"article_id", "distance", "similarity"}] 列表，按相似度降序
+        """
+        if not fingerprint:
+            return []
+
+        max_distance = similarity_to_distance(threshold)
+        with self._lock:
+            if max_distance <= MAX_BANDED_DISTANCE:
+                candidates = set()
+                for key in _bands(fingerprint):
+                    candidates.update(self._buckets.get(key, ()))
+            else:
+                # 阈值过低时分段无法保证召回，退化为全量比较
+                candidates = set(self._fingerprints)
+            scored = []
+            for article_id in candidates:
+                if article_id == exclude:
+                    continue
+                distance = hamming_distance(fingerprint, self._fingerprints[article_id])
+                if distance <= max_distance:
+                    scored.append((distance, article_id))
+
+        scored.sort()
+        return [
+            {
+                "article_id": article_id,
+                "distance": distance,
+                "similarity": round(1.0 - distance / FINGERPRINT_BITS, 4),
+            }
+            for distance, article_id in scored[:limit]
+        ]
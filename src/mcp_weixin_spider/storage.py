@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+已保存文章的索引与读取
+
+爬虫把每篇文章保存在 articles/<文件名>/ 目录下，本模块维护一个
+articles/index.json 索引，将文章ID（规范化URL的哈希）映射到保存位置，
+使MCP工具只需传入文章ID或URL即可在服务器端读取文章数据。
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# 微信文章URL中用于唯一标识文章的查询参数
+_ARTICLE_QUERY_KEYS = ("__biz", "mid", "idx", "sn")
+
+# 可分页读取的正文字段
+CONTENT_FIELDS = ("content_text", "content_html")
+
+# 分页大小（字节）
+PAGE_SIZE = 32 * 1024
+
+# 不可访问文章的缓存时长（秒），按原因区分；验证页面与访问环境有关，只短暂缓存
+UNAVAILABLE_TTL = {
+    "deleted": 30 * 24 * 3600,
+    "blocked": 7 * 24 * 3600,
+    "not_found": 24 * 3600,
+    "captcha": 10 * 60,
+}
+
+
+def _read_compressed(path: str) -> bytes:
+    """按扩展名解压爬虫单独保存的字段文件（.gz 或 .zst）"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(f"读取 {os.path.basename(path)} 需要安装zstandard")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def load_article_file(json_path: str, fields: Optional[tuple] = None) -> Dict[str, Any]:
+    """
+    读取爬虫保存的文章JSON，还原压缩后单独保存的字段
+
+    爬虫把 content_html 等大字段压缩保存在文章目录下，JSON中以 <字段>_file 记录文件名。
+
+    Args:
+        json_path: 文章JSON路径
+        fields: 需要还原的字段，默认全部；未还原的字段不出现在结果中
+
+    Returns:
+        文章数据
+    """
+    with open(json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    for field in CONTENT_FIELDS:
+        filename = data.pop(f"{field}_file", None)
+        if filename and field not in data and (fields is None or field in fields):
+            path = os.path.join(os.path.dirname(json_path), filename)
+            data[field] = _read_compressed(path).decode("utf-8")
+    return data
+
+
+def file_signature(path: str) -> str:
+    """
+    文件的版本标识（mtime、大小和inode）
+
+    文章文件都是先写临时文件再替换，每次保存都会得到新的inode，
+    标识不同即说明文件已被重新保存。
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        版本标识字符串
+    """
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns} {stat.st_size} {stat.st_ino}"
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    规范化微信文章URL
+
+    短链接 /s/<id> 只保留路径；长链接 /s?__biz=...&mid=...&idx=...&sn=...
+    只保留标识文章的参数，去掉 chksm、scene 等随分享渠道变化的参数。
+
+    Args:
+        url: 原始文章URL
+
+    Returns:
+        规范化后的URL
+    """
+    if not url:
+        return ""
+    parsed = urlparse(url.strip())
+    host = (parsed.hostname or "").lower()
+    path = parsed.path.rstrip("/") or "/"
+
+    query = dict(parse_qsl(parsed.query, keep_blank_values=False))
+    kept = [(key, query[key]) for key in _ARTICLE_QUERY_KEYS if key in query]
+    if kept:
+        return f"https://{host}{path}?{urlencode(kept)}"
+    return f"https://{host}{path}"
+
+
+def make_article_id(url: str) -> str:
+    """
+    根据URL生成文章ID
+
+    Args:
+        url: 文章URL（原始或规范化均可）
+
+    Returns:
+        16位十六进制文章ID
+    """
+    return hashlib.sha1(canonicalize_url(url).encode("utf-8")).hexdigest()[:16]
+
+
+class ArticleStore:
+    """
+    文章存储索引
+
+    索引常驻内存，每次登记文章后整体写回磁盘（先写临时文件再替换）。
+    """
+
+    def __init__(self, articles_dir: str):
+        """
+        初始化文章存储
+
+        Args:
+            articles_dir: 文章保存目录
+        """
+        self.articles_dir = articles_dir
+        self.index_path = os.path.join(articles_dir, "index.json")
+        self._index: Dict[str, Dict[str, Any]] = {}
+        self._unavailable: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._load_index()
+
+    def _load_index(self):
+        """从磁盘加载索引"""
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._index = data.get("articles", {})
+            self._unavailable = data.get("unavailable", {})
+            logger.info(f"文章索引已加载: {len(self._index)} 篇")
+        except Exception as e:
+            logger.error(f"加载文章索引失败: {e}")
+
+    def _save_index(self):
+        """将索引写回磁盘"""
+        os.makedirs(self.articles_dir, exist_ok=True)
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"articles": self._index, "unavailable": self._unavailable}, f, ensure_ascii=False)
+        os.replace(temp_path, self.index_path)
+
+    def register(self, article_data: Dict[str, Any]) -> Optional[str]:
+        """
+        登记一篇已保存的文章
+
+        Args:
+            article_data: 已由 save_article_to_file 保存的文章数据
+
+        Returns:
+            文章ID，文章未保存时返回None
+        """
+        files = article_data.get("files") or {}
+        if not files.get("json"):
+            logger.warning("文章尚未保存到文件，无法登记")
+            return None
+
+        url = article_data.get("url", "")
+        article_id = article_data.get("article_id") or make_article_id(url)
+        entry = {
+            "article_id": article_id,
+            "url": canonicalize_url(url),
+            "title": article_data.get("title", ""),
+            "author": article_data.get("author", ""),
+            "publish_time": article_data.get("publish_time", ""),
+            "crawl_time": article_data.get("crawl_time", ""),
+            "files": files,
+            "statistics": article_data.get("statistics"),
+        }
+
+        with self._lock:
+            self._index[article_id] = entry
+            try:
+                self._save_index()
+            except Exception as e:
+                logger.error(f"保存文章索引失败: {e}")
+        return article_id
+
+    def record_unavailable(self, url: str, reason: str, message: str = ""):
+        """
+        记录不可访问的文章，缓存期内再次爬取直接失败
+
+        Args:
+            url: 文章URL
+            reason: 不可访问原因（deleted、blocked、captcha、not_found）
+            message: 错误信息
+        """
+        ttl = UNAVAILABLE_TTL.get(reason)
+        if not ttl:
+            return
+        now = time.time()
+        with self._lock:
+            self._unavailable[make_article_id(url)] = {
+                "url": canonicalize_url(url),
+                "reason": reason,
+                "message": message,
+                "recorded_at": now,
+                "expires_at": now + ttl,
+            }
+            try:
+                self._save_index()
+            except Exception as e:
+                logger.error(f"保存文章索引失败: {e}")
+
+    def get_unavailable(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        查询缓存中的不可访问记录
+
+        Args:
+            url: 文章URL
+
+        Returns:
+            未过期的记录，没有记录时返回None
+        """
+        article_id = make_article_id(url)
+        with self._lock:
+            record = self._unavailable.get(article_id)
+            if record and record["expires_at"] <= time.time():
+                del self._unavailable[article_id]
+                record = None
+        return record
+
+    def resolve(self, article_ref: str) -> Optional[Dict[str, Any]]:
+        """
+        解析文章引用
+
+        Args:
+            article_ref: 文章ID或文章URL
+
+        Returns:
+            索引条目，未找到时返回None
+        """
+        if not article_ref:
+            return None
+        article_ref = article_ref.strip()
+        with self._lock:
+            entry = self._index.get(article_ref)
+            if entry is None and article_ref.startswith(("http://", "https://")):
+                entry = self._index.get(make_article_id(article_ref))
+        return entry
+
+    def load_article(self, article_ref: str) -> Dict[str, Any]:
+        """
+        读取已保存的文章数据
+
+        Args:
+            article_ref: 文章ID或文章URL
+
+        Returns:
+            文章数据
+
+        Raises:
+            KeyError: 文章不存在
+        """
+        entry = self.resolve(article_ref)
+        if entry is None:
+            raise KeyError(f"未找到文章: {article_ref}")
+
+        return load_article_file(entry["files"]["json"])
+
+    def get_statistics(self, article_ref: str) -> Optional[Dict[str, Any]]:
+        """
+        读取保存时预先计算的统计信息
+
+        Args:
+            article_ref: 文章ID或文章URL
+
+        Returns:
+            统计信息，文章不存在或未记录统计信息时返回None
+        """
+        entry = self.resolve(article_ref)
+        if entry is None:
+            return None
+        return entry.get("statistics")
+
+    def _ensure_field_file(self, entry: Dict[str, Any], field: str) -> str:
+        """
+        确保正文字段已单独落盘
+
+        首次访问时从文章JSON中取出字段写入 <文章目录>/.pages/<字段>.txt，
+        之后的分页读取只需定位到对应字节范围，不再解析整个JSON。
+        同名的 .src 文件记录生成时文章JSON的版本标识（见 file_signature）；文章重新
+        保存到同一目录后（重新爬取、补充下载图片、复用自定义文件名）标识变化，重新生成。
+        """
+        path = os.path.join(entry["files"]["dir"], ".pages", f"{field}.txt")
+        source = file_signature(entry["files"]["json"])
+        try:
+            with open(path + ".src", "r", encoding="utf-8") as f:
+                if f.read() == source and os.path.exists(path):
+                    return path
+        except FileNotFoundError:
+            pass
+
+        value = load_article_file(entry["files"]["json"], fields=(field,)).get(field) or ""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(value.encode("utf-8"))
+        os.replace(temp_path, path)
+        # 页面文件写好后再记录来源，中途失败时下次仍会重新生成
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(source)
+        os.replace(temp_path, path + ".src")
+        return path
+
+    def get_field_size(self, article_ref: str, field: str) -> int:
+        """
+        获取正文字段的UTF-8字节数
+
+        Args:
+            article_ref: 文章ID或文章URL
+            field: 字段名，content_text 或 content_html
+
+        Returns:
+            字节数
+        """
+        if field not in CONTENT_FIELDS:
+            raise ValueError(f"不支持分页读取的字段: {field}")
+        entry = self.resolve(article_ref)
+        if entry is None:
+            raise KeyError(f"未找到文章: {article_ref}")
+        return os.path.getsize(self._ensure_field_file(entry, field))
+
+    def read_page(self, article_ref: str, field: str, page: int, page_size: int = PAGE_SIZE) -> Dict[str, Any]:
+        """
+        按字节范围分页读取正文字段
+
+        每页覆盖 [page*page_size, (page+1)*page_size) 字节，起止位置向后对齐到
+        UTF-8字符边界，保证各页可以独立解码且拼接后与原文一致。
+
+        Args:
+            article_ref: 文章ID或文章URL
+            field: 字段名，content_text 或 content_html
+            page: 页码，从0开始
+            page_size: 每页字节数
+
+        Returns:
+            包含 text、page、total_pages、total_bytes 的字典
+        """
+        if field not in CONTENT_FIELDS:
+            raise ValueError(f"不支持分页读取的字段: {field}")
+        entry = self.resolve(article_ref)
+        if entry is None:
+            raise KeyError(f"未找到文章: {article_ref}")
+
+        path = self._ensure_field_file(entry, field)
+        total_bytes = os.path.getsize(path)
+        total_pages = max(1, (total_bytes + page_size - 1) // page_size)
+        if page < 0 or page >= total_pages:
+            raise ValueError(f"页码超出范围: {page}（共 {total_pages} 页）")
+
+        with open(path, "rb") as f:
+            f.seek(page * page_size)
+            # 多读3字节，用于把页尾对齐到字符边界
+            data = f.read(page_size + 3)
+
+        start = 0
+        if page > 0:
+            while start < len(data) and (data[start] & 0xC0) == 0x80:
+                start += 1
+        end = min(page_size, len(data))
+        while end < len(data) and (data[end] & 0xC0) == 0x80:
+            end += 1
+
+        return {
+            "article_id": entry["article_id"],
+            "field": field,
+            "page": page,
+            "total_pages": total_pages,
+            "total_bytes": total_bytes,
+            "text": data[start:end].decode("utf-8"),
+        }
+
+    def list_articles(self, limit: Optional[int] = 20) -> List[Dict[str, Any]]:
+        """
+        列出最近登记的文章
+
+        Args:
+            limit: 返回数量上限，None 表示全部
+
+        Returns:
+            索引条目列表，按抓取时间倒序
+        """
+        with self._lock:
+            entries = list(self._index.values())
+        entries.sort(key=lambda entry: entry.get("crawl_time", ""), reverse=True)
+        return entries[:limit]
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+单浏览器多标签页并发爬取
+
+一个Chrome进程同时打开多个标签页，通过CDP驱动：
+1. 每个标签页通过 Target.createBrowserContext 创建独立的浏览器上下文，Cookie互不共享
+2. 通过 Page.navigate 发起导航后立即返回（页面加载策略为none），各标签页的网络请求和渲染并行进行
+3. 单个线程轮询各标签页的页面状态，哪个标签页就绪就先提取哪个
+4. 标签页崩溃、失去响应或导航失败时关闭并重建该标签页，分配给它的URL最多重新排队 MAX_REQUEUE 次
+5. 每个标签页按 stage_timeouts 计时：导航后 page_load + wait 秒内未就绪时重建该标签页；
+   轮询和提取的WebDriver调用由看门狗监视，浏览器卡住时结束并重建浏览器，其他标签页的URL重新排队
+
+相比每个爬虫实例一个 webdriver.Chrome，同样内存下可以并发更多文章。
+"""
+
+import logging
+import os
+import sys
+import time
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from selenium.common.exceptions import WebDriverException
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from weixin_spider_simple import ArticleUnavailableError, StageTimeoutError, WeixinSpiderWithImages, rate_limiter
+
+logger = logging.getLogger(__name__)
+
+# 轮询间隔（秒）
+POLL_INTERVAL = 0.2
+
+# 标签页崩溃或导航失败时每个URL最多重新排队的次数
+MAX_REQUEUE = 1
+
+# 页面就绪检测：文档开始解析后再判断是否为文章页
+_READY_SCRIPT = "return document.readyState;"
+
+
+class _Tab:
+    """一个标签页及其浏览器上下文"""
+
+    def __init__(self, handle: str, context_id: Optional[str]):
+        self.handle = handle
+        self.context_id = context_id
+        self.url: Optional[str] = None
+        self.started = 0.0
+        self.deadline: Optional[float] = None
+        self.attempts = 0
+
+
+class TabPoolCrawler:
+    """
+    多标签页爬取器
+
+    所有WebDriver命令都在调用 crawl 的线程中串行发出，标签页之间的并发来自浏览器本身。
+    """
+
+    def __init__(self, tabs: int = 4, headless: bool = True, wait_time: int = 10,
+                 download_images: bool = True, compression: Optional[str] = None,
+                 spider: Optional[WeixinSpiderWithImages] = None):
+        """
+        初始化多标签页爬取器
+
+        Args:
+            tabs: 并发标签页数量
+            headless: 是否使用无头浏览器
+            wait_time: 单篇文章的页面等待时间（秒），未设置 wait 阶段时限时作为其时限
+            download_images: 是否提取图片信息（图片由调用方保存文章时下载）
+            compression: 正文HTML单独压缩保存的方式，见 WeixinSpiderWithImages
+            spider: 已创建的爬虫实例，必须使用 page_load_strategy='none' 且 single_process=False
+        """
+        self.tabs_count = max(1, tabs)
+        self.wait_time = wait_time
+        self.spider = spider or WeixinSpiderWithImages(
+            headless=headless,
+            wait_time=wait_time,
+            download_images=download_images,
+            compression=compression,
+            page_load_strategy="none",
+            single_process=False
+        )
+        self.driver = self.spider.driver
+        timeouts = self.spider.stage_timeouts
+        # 导航后等待页面就绪的时限：页面加载与等待两个阶段之和，均未设置时不限制
+        self.ready_timeout = (timeouts["page_load"] or 0) + (timeouts["wait"] or wait_time or 0)
+        self._tabs: List[_Tab] = []
+        # 浏览器启动时自带的窗口，关闭标签页后切回这里
+        self._home_handle = self.driver.current_window_handle
+
+    def _open_tab(self) -> _Tab:
+        """创建独立浏览器上下文中的新标签页"""
+        context_id = None
+        try:
+            context_id = self.driver.execute_cdp_cmd("Target.createBrowserContext", {})["browserContextId"]
+        except WebDriverException as e:
+            logger.warning(f"创建独立浏览器上下文失败，标签页将共享Cookie: {e}")
+
+        params = {"url": "about:blank"}
+        if context_id:
+            params["browserContextId"] = context_id
+        target_id = self.driver.execute_cdp_cmd("Target.createTarget", params)["targetId"]
+        # ChromeDriver 的窗口句柄即CDP的targetId
+        return _Tab(target_id, context_id)
+
+    def _close_tab(self, tab: _Tab):
+        """关闭标签页并销毁其浏览器上下文"""
+        try:
+            self.driver.switch_to.window(self._home_handle)
+            self.driver.execute_cdp_cmd("Target.closeTarget", {"targetId": tab.handle})
+            if tab.context_id:
+                self.driver.execute_cdp_cmd("Target.disposeBrowserContext", {"browserContextId": tab.context_id})
+        except WebDriverException as e:
+            logger.warning(f"关闭标签页失败 {tab.handle}: {e}")
+
+    def _replace_tab(self, tab: _Tab) -> Optional[_Tab]:
+        """
+        关闭崩溃的标签页并创建新标签页
+
+        Returns:
+            新标签页；无法创建时从池中移除该标签页并返回None
+        """
+        self._close_tab(tab)
+        index = self._tabs.index(tab)
+        try:
+            new_tab = self._open_tab()
+        except WebDriverException as e:
+            del self._tabs[index]
+            logger.error(f"重建标签页失败，剩余 {len(self._tabs)} 个标签页: {e}")
+            return None
+        self._tabs[index] = new_tab
+        logger.info(f"标签页已重建: {tab.handle} -> {new_tab.handle}")
+        return new_tab
+
+    def _restart_browser(self):
+        """看门狗结束浏览器后重建浏览器和全部标签页"""
+        self._tabs = []
+        self.spider._restart_driver()
+        self.driver = self.spider.driver
+        if self.driver is None:
+            logger.error("重建浏览器失败，没有可用的标签页")
+            return
+        try:
+            self._home_handle = self.driver.current_window_handle
+            while len(self._tabs) < self.tabs_count:
+                self._tabs.append(self._open_tab())
+        except WebDriverException as e:
+            logger.error(f"重建标签页失败，可用 {len(self._tabs)} 个标签页: {e}")
+
+    def _navigate(self, tab: _Tab, url: str, attempts: int):
+        """在标签页中发起导航，不等待页面加载"""
+        rate_limiter.acquire(urlparse(url).hostname or "")
+        self.driver.switch_to.window(tab.handle)
+        self.driver.execute_cdp_cmd("Page.navigate", {"url": url})
+        tab.url = url
+        tab.started = time.monotonic()
+        tab.deadline = tab.started + self.ready_timeout if self.ready_timeout else None
+        tab.attempts = attempts
+
+    def _poll(self, tab: _Tab) -> Optional[Dict[str, Any]]:
+        """
+        检查标签页是否就绪，就绪时提取文章
+
+        Returns:
+            文章数据，页面仍在加载时返回None
+
+        Raises:
+            ArticleUnavailableError: 文章不可访问
+            StageTimeoutError: stage 为 wait 时该标签页超过就绪时限；
+                其他阶段表示看门狗已结束整个浏览器
+            WebDriverException: 标签页崩溃或失去响应
+        """
+        timeouts = self.spider.stage_timeouts
+        with self.spider.watchdog.stage("script", timeouts["script"]):
+            self.driver.switch_to.window(tab.handle)
+            state = None
+            if self.driver.execute_script(_READY_SCRIPT) != "loading":
+                state = self.spider._page_state(self.driver)
+
+        if state is None:
+            if tab.deadline is not None and time.monotonic() > tab.deadline:
+                raise StageTimeoutError("wait", self.ready_timeout)
+            return None
+        if state == "rate_limited":
+            rate_limiter.report(urlparse(tab.url).hostname or "", throttled=True)
+            raise RuntimeError("触发微信访问频率限制")
+        if state != "article":
+            raise ArticleUnavailableError(state, tab.url)
+
+        rate_limiter.report(urlparse(tab.url).hostname or "")
+        # 图片地址在 data-src 中，无需滚动触发懒加载即可提取
+        with self.spider.watchdog.stage("extract", timeouts["extract"]):
+            article_data = self.spider._extract_article_content()
+        if not article_data or not article_data.get("title"):
+            raise RuntimeError("无法获取文章内容")
+        return article_data
+
+    def crawl(self, urls: List[str]) -> Iterator[Tuple[str, Optional[Dict[str, Any]], Optional[Exception]]]:
+        """
+        并发爬取URL，按完成顺序逐个返回结果
+
+        Args:
+            urls: URL列表
+
+        Yields:
+            (url, 文章数据, 异常)，成功时异常为None，失败时文章数据为None
+        """
+        while len(self._tabs) < self.tabs_count:
+            self._tabs.append(self._open_tab())
+
+        pending = deque((url, 0) for url in urls)
+        while pending or any(tab.url for tab in self._tabs):
+            if not self._tabs:
+                # 浏览器已无法创建标签页，剩余URL全部失败
+                error = RuntimeError("没有可用的浏览器标签页")
+                while pending:
+                    yield pending.popleft()[0], None, error
+                return
+
+            progressed = False
+            for tab in list(self._tabs):
+                if tab not in self._tabs:
+                    # 本轮中浏览器已重建，旧标签页不再有效
+                    continue
+                if tab.url is None:
+                    if not pending:
+                        continue
+                    url, attempts = pending.popleft()
+                    progressed = True
+                    try:
+                        self._navigate(tab, url, attempts)
+                    except WebDriverException as e:
+                        tab.url = None
+                        self._replace_tab(tab)
+                        if attempts < MAX_REQUEUE:
+                            logger.warning(f"标签页导航失败，重建标签页后重试: {e}")
+                            pending.appendleft((url, attempts + 1))
+                            continue
+                        logger.error(f"标签页导航失败 {url}: {e}")
+                        yield url, None, e
+                    continue
+
+                url = tab.url
+                try:
+                    article_data = self._poll(tab)
+                    if article_data is None:
+                        continue
+                    result = (url, article_data, None)
+                except StageTimeoutError as e:
+                    tab.url = None
+                    progressed = True
+                    if e.stage == "wait":
+                        # 只有该标签页超时：关闭并重建，释放卡住的渲染进程
+                        logger.warning(f"标签页 {tab.handle} 超过就绪时限: {url}")
+                        self._replace_tab(tab)
+                    else:
+                        # 看门狗已结束浏览器：其他标签页的URL不计失败次数，重新排队
+                        logger.error(f"标签页 {tab.handle} 卡住，浏览器已被结束: {e}")
+                        for other in self._tabs:
+                            if other.url:
+                                pending.appendleft((other.url, other.attempts))
+                        self._restart_browser()
+                    yield url, None, e
+                    continue
+                except WebDriverException as e:
+                    # 标签页崩溃：重建标签页，URL最多重新排队 MAX_REQUEUE 次
+                    logger.warning(f"标签页 {tab.handle} 失去响应: {e}")
+                    tab.url = None
+                    self._replace_tab(tab)
+                    progressed = True
+                    if tab.attempts < MAX_REQUEUE:
+                        pending.append((url, tab.attempts + 1))
+                        continue
+                    yield url, None, e
+                    continue
+                except Exception as e:
+                    result = (url, None, e)
+
+                tab.url = None
+                progressed = True
+                yield result
+
+            if not progressed:
+                time.sleep(POLL_INTERVAL)
+
+    def close(self):
+        """关闭所有标签页和浏览器"""
+        for tab in self._tabs:
+            self._close_tab(tab)
+        self._tabs = []
+        self.spider.close()
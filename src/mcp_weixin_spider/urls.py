@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+URL列表文件读取
+
+批量爬取命令行（batch）和客户端的批量爬取命令共用，只依赖标准库和 storage 中的URL规范化。
+"""
+
+import sys
+from typing import List
+
+from storage import canonicalize_url
+
+
+def load_urls(path: str) -> List[str]:
+    """
+    读取URL列表文件
+
+    每行一个URL，忽略空行和以 # 开头的注释行；指向同一篇文章的URL只保留第一个。
+
+    Args:
+        path: 文件路径，"-" 表示标准输入
+
+    Returns:
+        URL列表
+    """
+    stream = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+    try:
+        lines = [line.strip() for line in stream]
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    urls = []
+    seen = set()
+    for line in lines:
+        if not line or line.startswith("#"):
+            continue
+        key = canonicalize_url(line)
+        if key in seen:
+            continue
+        seen.add(key)
+        urls.append(line)
+    return urls
@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+"""测试公共设置：与 main.py 相同，把项目根目录和包目录加入导入路径"""
+
+import os
+import sys
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TESTS_DIR)
+PACKAGE_DIR = os.path.join(PROJECT_ROOT, "src", "mcp_weixin_spider")
+
+for path in (PROJECT_ROOT, PACKAGE_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""公众号合集增量同步测试（合集接口用内存中的文章列表代替）"""
+
+import asyncio
+import json
+import threading
+
+import pytest
+
+import accounts
+import server
+from accounts import AccountSyncer
+
+ENTRY = "https://mp.weixin.qq.com/mp/appmsgalbum?__biz=MzA&album_id=42"
+
+
+class FakeAlbum:
+    """按倒序或正序返回文章，记录读取的页数"""
+
+    def __init__(self, count, order="desc"):
+        self.order = order
+        self.articles = []
+        self.pages = 0
+        for _ in range(count):
+            self.publish()
+
+    def publish(self):
+        n = len(self.articles) + 1
+        self.articles.append({"url": f"https://mp.weixin.qq.com/s/a{n}", "title": f"文章{n}",
+                              "create_time": 1000 + n, "cursor": [str(n), "1"]})
+
+    def listing(self):
+        return list(reversed(self.articles)) if self.order == "desc" else list(self.articles)
+
+    def fetch(self, biz, album_id, cursor):
+        self.pages += 1
+        listing = self.listing()
+        start = 0
+        if cursor:
+            start = next(i for i, a in enumerate(listing) if tuple(a["cursor"]) == tuple(cursor)) + 1
+        page = [dict(a) for a in listing[start:start + accounts.ALBUM_PAGE_SIZE]]
+        return page, start + accounts.ALBUM_PAGE_SIZE < len(listing)
+
+
+def make_syncer(tmp_path, album, job_status=None):
+    syncer = AccountSyncer(str(tmp_path / "checkpoints.json"), session_getter=lambda: None, job_status=job_status)
+    syncer._fetch_album_page = album.fetch
+    return syncer
+
+
+def titles(result):
+    return [article["title"] for article in result["new_articles"]]
+
+
+@pytest.mark.parametrize("order", ["desc", "asc"])
+def test_album_sync_covers_every_article_once(tmp_path, order):
+    album = FakeAlbum(35, order)
+    syncer = make_syncer(tmp_path, album)
+
+    synced = []
+    for _ in range(4):
+        synced += titles(syncer.sync(ENTRY, max_articles=10))
+    album.publish()
+    album.publish()
+    synced += titles(syncer.sync(ENTRY, max_articles=10))
+
+    assert sorted(synced) == sorted(f"文章{n}" for n in range(1, 38))
+    assert len(synced) == len(set(synced))
+
+
+def test_desc_album_reads_only_needed_pages(tmp_path):
+    album = FakeAlbum(200)
+    syncer = make_syncer(tmp_path, album)
+    for _ in range(20):
+        syncer.sync(ENTRY, max_articles=10)
+    assert syncer.sync(ENTRY, max_articles=10)["new_articles"] == []
+
+    album.pages = 0
+    album.publish()
+    result = syncer.sync(ENTRY, max_articles=10)
+    assert titles(result) == ["文章201"]
+    assert album.pages == 1
+
+
+@pytest.mark.parametrize("order", ["desc", "asc"])
+def test_first_page_is_fetched_once(tmp_path, order):
+    album = FakeAlbum(5, order)
+    syncer = make_syncer(tmp_path, album)
+    assert len(syncer.sync(ENTRY, max_articles=10)["new_articles"]) == 5
+    # 判断合集顺序时读取的第一页被复用
+    assert album.pages == 1
+
+
+def test_failed_jobs_are_resubmitted(tmp_path):
+    album = FakeAlbum(3)
+    statuses = {}
+    syncer = make_syncer(tmp_path, album, job_status=statuses.get)
+    submitted = []
+
+    def submit(url):
+        submitted.append(url)
+        return f"job{len(submitted)}"
+
+    first = syncer.sync(ENTRY, max_articles=10, submit=submit)
+    assert len(first["new_articles"]) == 3
+    assert first["checkpoint"]["pending"] == 3
+
+    statuses.update({"job1": "done", "job2": "failed", "job3": "running"})
+    second = syncer.sync(ENTRY, max_articles=10, submit=submit)
+    assert [a["url"] for a in second["new_articles"]] == [submitted[1]]
+    assert second["checkpoint"]["pending"] == 2
+    assert second["checkpoint"]["synced_count"] == 1
+
+
+class FakeQueue:
+    """以文章URL末尾作为任务ID"""
+
+    def submit(self, url, options):
+        return {"id": url[-2:]}
+
+
+def test_sync_account_runs_in_thread(tmp_path, monkeypatch):
+    syncer = make_syncer(tmp_path, FakeAlbum(3))
+    threads = []
+    sync = syncer.sync
+
+    def record_thread(*args, **kwargs):
+        threads.append(threading.current_thread())
+        return sync(*args, **kwargs)
+
+    syncer.sync = record_thread
+    monkeypatch.setattr(server, "get_account_syncer", lambda: syncer)
+    monkeypatch.setattr(server, "get_job_queue", lambda: FakeQueue())
+
+    result = json.loads(asyncio.run(server.sync_account(ENTRY, max_articles=10)))
+    assert result["new_articles"] == 3
+    assert [job["job_id"] for job in result["jobs"]] == ["a1", "a2", "a3"]
+    assert threads and threads[0] is not threading.main_thread()
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""文章文件写入：原子替换与正文HTML压缩保存"""
+
+import json
+import os
+
+import pytest
+
+from storage import load_article_file
+from weixin_spider_simple import WeixinSpiderWithImages, atomic_write, normalize_image_options
+
+HTML = "<p>正文</p>" * 200
+
+
+def test_atomic_write_replaces_target(tmp_path):
+    path = str(tmp_path / "a.json")
+    with atomic_write(path) as f:
+        f.write("旧内容")
+    with atomic_write(path) as f:
+        f.write("新内容")
+    assert open(path, encoding="utf-8").read() == "新内容"
+    assert os.listdir(tmp_path) == ["a.json"]
+
+
+def test_atomic_write_failure_keeps_old_file(tmp_path):
+    path = str(tmp_path / "a.json")
+    with atomic_write(path) as f:
+        f.write("旧内容")
+
+    with pytest.raises(RuntimeError):
+        with atomic_write(path) as f:
+            f.write("写了一半")
+            raise RuntimeError("中途失败")
+
+    assert open(path, encoding="utf-8").read() == "旧内容"
+    assert os.listdir(tmp_path) == ["a.json"]
+
+
+def test_atomic_write_failure_leaves_no_file(tmp_path):
+    path = str(tmp_path / "a.bin")
+    with pytest.raises(RuntimeError):
+        with atomic_write(path, "wb") as f:
+            f.write(b"partial")
+            raise RuntimeError("中途失败")
+    assert os.listdir(tmp_path) == []
+
+
+def make_spider(compression):
+    """不启动浏览器，只设置写文章文件所需的属性"""
+    spider = WeixinSpiderWithImages.__new__(WeixinSpiderWithImages)
+    spider.image_options = normalize_image_options()
+    spider.compact_json = True
+    spider.compression = compression
+    return spider
+
+
+def write_article(tmp_path, compression):
+    article_dir = str(tmp_path)
+    article_data = {
+        "title": "标题", "url": "https://mp.weixin.qq.com/s/x", "content_text": "正文", "content_html": HTML,
+        "images": [],
+        "files": {name: os.path.join(article_dir, f"a.{name}") for name in ("json", "txt", "md")},
+    }
+    article_data["files"]["dir"] = article_dir
+    make_spider(compression)._write_article_files(article_data)
+    return article_data["files"]["json"]
+
+
+def test_default_keeps_html_in_json():
+    spider = WeixinSpiderWithImages(browser=False)
+    try:
+        assert spider.compression is None
+    finally:
+        spider.close()
+
+
+def test_uncompressed_round_trip(tmp_path):
+    json_path = write_article(tmp_path, None)
+    with open(json_path, encoding="utf-8") as f:
+        assert json.load(f)["content_html"] == HTML
+    assert load_article_file(json_path)["content_html"] == HTML
+
+
+@pytest.mark.parametrize("compression, extension", [("gzip", ".gz"), ("zstd", ".zst")])
+def test_compressed_round_trip(tmp_path, compression, extension):
+    if compression == "zstd":
+        pytest.importorskip("zstandard")
+    json_path = write_article(tmp_path, compression)
+
+    with open(json_path, encoding="utf-8") as f:
+        stored = json.load(f)
+    assert "content_html" not in stored
+    assert stored["content_html_file"] == "a.content_html" + extension
+    assert os.path.getsize(tmp_path / stored["content_html_file"]) < len(HTML.encode("utf-8"))
+
+    article = load_article_file(json_path)
+    assert article["content_html"] == HTML
+    assert "content_html_file" not in article
+    # 只读取需要的字段时不解压
+    assert "content_html" not in load_article_file(json_path, fields=("content_text",))
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""MCP客户端工具调用测试"""
+
+import asyncio
+from types import SimpleNamespace
+
+from client import MCPWeixinClient
+
+
+class FakeSession:
+    def __init__(self):
+        self.calls = []
+
+    async def call_tool(self, name, arguments):
+        self.calls.append(name)
+        return SimpleNamespace(isError=False, content=["ok"])
+
+
+def test_call_tool_reconnects_when_session_was_closed():
+    client = MCPWeixinClient("server.py")
+    session = FakeSession()
+    reconnects = []
+
+    async def connect_to_server():
+        # 连接检查通过后，会话被其他任务关闭
+        client.session = None
+        return True
+
+    async def reconnect(generation):
+        reconnects.append(generation)
+        client.session = session
+        return True
+
+    client.connect_to_server = connect_to_server
+    client._reconnect = reconnect
+
+    result = asyncio.run(client.call_tool("crawl_weixin_article", {}))
+
+    assert result == {"status": "success", "result": ["ok"]}
+    assert reconnects == [0]
+    assert session.calls == ["crawl_weixin_article"]
+
+
+def test_call_tool_reports_error_when_reconnect_fails():
+    client = MCPWeixinClient("server.py")
+
+    async def connect_to_server():
+        return True
+
+    async def reconnect(generation):
+        return False
+
+    client.connect_to_server = connect_to_server
+    client._reconnect = reconnect
+
+    result = asyncio.run(client.call_tool("crawl_weixin_article", {}))
+
+    assert result["status"] == "error"
+    assert "MCP会话已关闭" in result["message"]
+
+
+def test_crawl_many_waits_for_cancelled_requests():
+    client = MCPWeixinClient("server.py")
+    finished = []
+
+    async def crawl_one(url, download_images):
+        try:
+            if url != "fast":
+                await asyncio.sleep(10)
+            return {"url": url}
+        finally:
+            finished.append(url)
+
+    client._crawl_one = crawl_one
+
+    async def main():
+        results = client.crawl_many(["fast", "slow1", "slow2"], concurrency=3)
+        async for record in results:
+            assert record == {"url": "fast"}
+            break
+        await results.aclose()
+        # 提前停止后，被取消的请求在 aclose 返回前已经结束
+        return list(finished)
+
+    assert sorted(asyncio.run(main())) == ["fast", "slow1", "slow2"]
+
+
+def test_load_urls_skips_comments_and_duplicates(tmp_path):
+    from urls import load_urls
+
+    path = tmp_path / "urls.txt"
+    path.write_text(
+        "# 注释\n\nhttps://mp.weixin.qq.com/s/a?scene=1\nhttps://mp.weixin.qq.com/s/a?scene=2\n"
+        "https://mp.weixin.qq.com/s/b\n",
+        encoding="utf-8",
+    )
+    assert load_urls(str(path)) == ["https://mp.weixin.qq.com/s/a?scene=1", "https://mp.weixin.qq.com/s/b"]
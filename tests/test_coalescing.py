@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""并发请求合并测试"""
+
+import threading
+
+import pytest
+
+from coalescing import RequestCoalescer
+from weixin_spider_simple import ArticleUnavailableError
+
+
+def run_concurrently(coalescer, keys, func):
+    """每个键一个线程同时调用 run，返回 [(结果, 是否合并) 或 异常]"""
+    outcomes = [None] * len(keys)
+    start = threading.Barrier(len(keys))
+
+    def call(i, key):
+        start.wait()
+        try:
+            outcomes[i] = coalescer.run(key, func, key)
+        except BaseException as e:
+            outcomes[i] = e
+
+    threads = [threading.Thread(target=call, args=(i, key)) for i, key in enumerate(keys)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    return outcomes
+
+
+def blocking(release, calls):
+    """阻塞到 release 置位的执行函数，记录每次实际执行"""
+    lock = threading.Lock()
+
+    def func(key):
+        with lock:
+            calls.append(key)
+        assert release.wait(10)
+        return {"key": key}
+    return func
+
+
+def test_concurrent_requests_for_same_key_execute_once():
+    coalescer = RequestCoalescer()
+    release, calls = threading.Event(), []
+    func = blocking(release, calls)
+    threading.Timer(0.3, release.set).start()
+
+    outcomes = run_concurrently(coalescer, ["a"] * 8, func)
+
+    assert calls == ["a"]
+    assert all(result == {"key": "a"} for result, _ in outcomes)
+    assert sorted(coalesced for _, coalesced in outcomes) == [False] + [True] * 7
+    stats = coalescer.get_stats()
+    assert (stats["requests"], stats["executed"], stats["coalesced"]) == (8, 1, 7)
+    assert stats["in_flight"] == []
+
+
+def test_different_keys_are_not_coalesced():
+    coalescer = RequestCoalescer()
+    release, calls = threading.Event(), []
+    func = blocking(release, calls)
+    threading.Timer(0.3, release.set).start()
+
+    keys = [("u", True), ("u", False), ("v", True)]
+    outcomes = run_concurrently(coalescer, keys, func)
+
+    assert sorted(calls) == sorted(keys)
+    assert [coalesced for _, coalesced in outcomes] == [False] * 3
+
+
+def test_each_waiter_raises_its_own_copy_of_the_error():
+    coalescer = RequestCoalescer()
+    release = threading.Event()
+    original = []
+
+    def func(key):
+        assert release.wait(10)
+        error = ArticleUnavailableError("deleted", "https://mp.weixin.qq.com/s/x")
+        original.append(error)
+        raise error
+    threading.Timer(0.3, release.set).start()
+
+    outcomes = run_concurrently(coalescer, ["a"] * 6, func)
+
+    assert len(original) == 1
+    assert all(isinstance(e, ArticleUnavailableError) for e in outcomes)
+    assert len({id(e) for e in outcomes}) == 6
+    leader = [e for e in outcomes if e is original[0]]
+    assert len(leader) == 1
+    for error in outcomes:
+        assert error.reason == "deleted"
+        assert error.retriable is False
+        assert str(error) == str(original[0])
+        if error is not original[0]:
+            assert error.__cause__ is original[0]
+    assert coalescer.get_stats()["failed"] == 1
+
+
+def test_uncopyable_error_is_wrapped():
+    class Odd(Exception):
+        __slots__ = ()
+
+        def __new__(cls, *args):
+            if args:
+                raise TypeError("no args")
+            return super().__new__(cls)
+
+    coalescer = RequestCoalescer()
+    release = threading.Event()
+
+    def func(key):
+        assert release.wait(10)
+        error = Odd()
+        error.args = ("boom",)
+        raise error
+    threading.Timer(0.3, release.set).start()
+
+    outcomes = run_concurrently(coalescer, ["a"] * 3, func)
+
+    waiters = [e for e in outcomes if not isinstance(e, Odd)]
+    assert len(waiters) == 2
+    assert all(isinstance(e, RuntimeError) and "boom" in str(e) for e in waiters)
+
+
+def test_finished_flight_is_removed_and_rerun():
+    coalescer = RequestCoalescer()
+    calls = []
+    assert coalescer.run("a", lambda: calls.append(1) or len(calls)) == (1, False)
+    assert coalescer.run("a", lambda: calls.append(1) or len(calls)) == (2, False)
+    with pytest.raises(ValueError):
+        coalescer.run("a", int, "x")
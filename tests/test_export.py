@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""语料列式导出测试"""
+
+import json
+import os
+import time
+
+import pandas as pd
+import pytest
+
+import export
+from export import CorpusExporter
+from storage import ArticleStore
+
+
+@pytest.fixture(params=["parquet", "csv.gz"])
+def export_format(request, monkeypatch):
+    if request.param == "parquet":
+        if export.PARQUET_ENGINE is None:
+            pytest.skip("未安装pyarrow或fastparquet")
+    else:
+        monkeypatch.setattr(export, "PARQUET_ENGINE", None)
+    monkeypatch.setattr(export, "EXPORT_FORMAT", request.param)
+    return request.param
+
+
+def save_article(store, name, crawl_time, images):
+    """写出文章JSON并登记到文章存储"""
+    article_dir = os.path.join(store.articles_dir, name)
+    os.makedirs(article_dir, exist_ok=True)
+    article_data = {
+        "url": f"https://mp.weixin.qq.com/s/{name}",
+        "title": f"标题 {name}",
+        "author": "作者",
+        "crawl_time": crawl_time,
+        "content_text": f"正文 {name}",
+        "images": [{"index": i, "url": f"https://mmbiz.qpic.cn/{name}/{i}", "download_success": True}
+                   for i in range(1, images + 1)],
+        "files": {"json": os.path.join(article_dir, f"{name}.json")},
+    }
+    with open(article_data["files"]["json"], "w", encoding="utf-8") as f:
+        json.dump(article_data, f, ensure_ascii=False)
+    return store.register(article_data)
+
+
+def test_round_trip_with_recrawl(tmp_path, export_format):
+    store = ArticleStore(str(tmp_path / "articles"))
+    first = save_article(store, "a1", "2024-01-01 10:00:00", images=2)
+    second = save_article(store, "a2", "2024-01-02 10:00:00", images=1)
+    exporter = CorpusExporter(store)
+    assert exporter.export()["articles_exported"] == 2
+    assert exporter.export()["articles_exported"] == 0
+
+    # 重新爬取后文章已没有图片，且落入新的抓取日期分区
+    time.sleep(0.01)
+    save_article(store, "a1", "2024-01-03 10:00:00", images=0)
+    os.utime(store.resolve(first)["files"]["json"], (time.time() + 5, time.time() + 5))
+    assert exporter.export()["articles_exported"] == 1
+
+    articles = exporter.load_corpus("articles")
+    assert sorted(articles["article_id"]) == sorted([first, second])
+    assert articles.set_index("article_id").loc[first, "crawl_date"] == "2024-01-03"
+    assert articles.set_index("article_id").loc[first, "images_count"] == 0
+
+    images = exporter.load_corpus("images")
+    assert list(images["article_id"]) == [second]
+
+    summary = exporter.summary()
+    assert summary["articles"] == 2
+    assert summary["by_date"] == {"2024-01-02": 1, "2024-01-03": 1}
+
+
+def test_date_filter_applies_after_dedup(tmp_path, export_format):
+    store = ArticleStore(str(tmp_path / "articles"))
+    first = save_article(store, "a1", "2024-01-01 10:00:00", images=2)
+    second = save_article(store, "a2", "2024-01-02 10:00:00", images=1)
+    exporter = CorpusExporter(store)
+    exporter.export()
+
+    time.sleep(0.01)
+    save_article(store, "a1", "2024-01-03 10:00:00", images=1)
+    os.utime(store.resolve(first)["files"]["json"], (time.time() + 5, time.time() + 5))
+    exporter.export()
+
+    # a1 最后一次导出在 2024-01-03，范围内的旧版本不再返回
+    articles = exporter.load_corpus("articles", until="2024-01-02")
+    assert list(articles["article_id"]) == [second]
+    images = exporter.load_corpus("images", until="2024-01-02")
+    assert list(images["article_id"]) == [second]
+    assert exporter.summary(until="2024-01-02")["articles"] == 1
+
+    articles = exporter.load_corpus("articles", since="2024-01-03", columns=["title"])
+    assert list(articles["article_id"]) == [first]
+    assert list(exporter.load_corpus("images", since="2024-01-03")["article_id"]) == [first]
+    assert exporter.load_corpus("articles", since="2024-01-04").empty
+
+
+def test_partition_directory_loads_with_read_parquet(tmp_path, export_format):
+    if export_format != "parquet":
+        pytest.skip("只有Parquet支持按目录加载")
+    store = ArticleStore(str(tmp_path / "articles"))
+    save_article(store, "a1", "2024-01-01 10:00:00", images=1)
+    save_article(store, "a2", "2024-01-02 10:00:00", images=2)
+    exporter = CorpusExporter(store)
+    exporter.export()
+
+    articles = pd.read_parquet(os.path.join(exporter.export_dir, "articles"))
+    images = pd.read_parquet(os.path.join(exporter.export_dir, "images"))
+    assert len(articles) == 2
+    assert len(images) == 3
+    assert sorted(articles["crawl_date"].astype(str)) == ["2024-01-01", "2024-01-02"]
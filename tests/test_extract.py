@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""页面内提取结果测试"""
+
+import json
+
+from weixin_spider_simple import WeixinSpiderWithImages
+
+
+class FakeDriver:
+    """按 _EXTRACT_ARTICLE_SCRIPT 的格式返回固定结果"""
+
+    current_url = "https://mp.weixin.qq.com/s/abc"
+
+    def __init__(self, result):
+        self.result = result
+
+    def execute_script(self, script, *args):
+        return self.result
+
+
+def make_spider(result, download_images=True):
+    spider = WeixinSpiderWithImages.__new__(WeixinSpiderWithImages)
+    spider.driver = FakeDriver(result)
+    spider.download_images = download_images
+    spider.extract_mode = "js"
+    return spider
+
+
+RESULT = {
+    "found": True,
+    "title": " 标题 ",
+    "author": "作者",
+    "publish_time": "2024-01-01",
+    "content_html": "<p>正文</p><img data-src='//x/1.png'>",
+    "content_text": "正文",
+    "images": [
+        {"index": 1, "src": "//x/1.png", "alt": "", "title": ""},
+        {"index": 2, "src": "", "alt": "", "title": ""},
+    ],
+    "url": "https://mp.weixin.qq.com/s/abc",
+}
+
+
+def test_extracted_article_is_plain_json_serializable_dict():
+    article_data = make_spider(RESULT)._extract_article_content()
+
+    assert type(article_data) is dict
+    assert list(article_data) == [
+        "title", "author", "publish_time", "content_html", "content_text", "images", "url", "crawl_time"
+    ]
+    assert article_data["title"] == "标题"
+    assert article_data["images"] == [{
+        "index": 1, "url": "https://x/1.png", "alt": "图片_1", "title": "",
+        "filename": None, "local_path": None, "download_success": False,
+    }]
+    assert json.loads(json.dumps(article_data, ensure_ascii=False)) == article_data
+
+
+def test_images_key_absent_when_images_not_extracted():
+    article_data = make_spider(RESULT, download_images=False)._extract_article_content()
+    assert "images" not in article_data
+
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""lxml 正文文本提取与 BeautifulSoup 结果一致性测试"""
+
+import pytest
+
+import weixin_spider_simple as spider
+from weixin_spider_simple import _html_to_text_bs4, html_to_text
+
+pytestmark = pytest.mark.skipif(spider.lxml_html is None, reason="未安装lxml")
+
+CASES = [
+    # 常规正文
+    "<section><h2>小标题</h2><p>第一段 <strong>重点</strong> 与&nbsp;说明</p>"
+    "<script>var x = 1;</script><style>p{}</style><ul><li>要点一</li><li>要点二</li></ul></section>",
+    "<section><mpvoice>语音</mpvoice><p>未知标签</p></section>",
+    "<p>a<br>b<img src='x'>c</p>",
+    "a<!-- 注释 -->b<?php x ?>c",
+    "<p>a &amp b &lt c &#x4e2d; &#0;</p>",
+    # 超过 libxml2 嵌套深度限制（256层）时 lxml 会静默截断
+    "<div>" * 300 + "deep" + "</div>" * 300 + "<p>after</p>",
+    # 标签不匹配
+    "<p>unclosed <div>nested</p> more",
+    "<b><i>x</b>y</i>z",
+    "<p>a</span>b</p>",
+    "<p>x</p></div>y",
+    # lxml 按原始文本解析的元素
+    "<xmp><b>x</b></xmp>y",
+    "<iframe><p>a</p></iframe>b",
+    "<plaintext><p>a</p>",
+    "<textarea><b>t</b></textarea>u",
+    "<noembed><b>n</b></noembed>m",
+    "<p>a</p><template><b>t</b></template>",
+    "a<![CDATA[c]]>b",
+    "a<!-- c --!>b",
+    "x\r\ny",
+]
+
+
+@pytest.mark.parametrize("html", CASES)
+def test_lxml_matches_bs4(html):
+    assert html_to_text(html, backend="lxml") == _html_to_text_bs4(html)
+
+
+def test_deep_nesting_keeps_text():
+    html = "<div>" * 300 + "deep" + "</div>" * 300 + "<p>after</p>"
+    assert html_to_text(html) == "deep\nafter"
+
+
+def test_empty_html():
+    assert html_to_text("") == ""
+    assert html_to_text("   ") == ""
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        html_to_text("<p>x</p>", backend="unknown")
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""后台补充下载图片：状态变化、重写文章文件、同一文章不重复下载"""
+
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import server
+from keywords import CorpusKeywordIndex
+from scheduler import RecrawlScheduler
+from similarity import SimHashIndex
+from storage import ArticleStore
+from weixin_spider_simple import compute_article_statistics
+
+URL = "https://mp.weixin.qq.com/s/images"
+
+
+def write_json(article_data):
+    path = article_data["files"]["json"]
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(article_data, f, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+
+
+class CrawlSpider:
+    """爬取用的实例：返回带两张图片的文章，保存时不下载图片"""
+
+    def __init__(self, articles_dir):
+        self.articles_dir = articles_dir
+        self.download_images = True
+        self.text = "正文"
+
+    def crawl_article_by_url(self, url):
+        return {
+            "title": "标题", "content_text": self.text, "url": url, "crawl_time": "2024-01-01 00:00:00",
+            "images": [{"index": i, "url": f"https://x/{i}.png", "download_success": False} for i in (1, 2)],
+        }
+
+    def save_article_to_file(self, article_data, custom_filename=None, download_images=None):
+        article_dir = os.path.join(self.articles_dir, "a")
+        os.makedirs(article_dir, exist_ok=True)
+        article_data["files"] = {"dir": article_dir, "json": os.path.join(article_dir, "a.json")}
+        article_data["images_pending"] = not download_images
+        article_data["statistics"] = compute_article_statistics(article_data)
+        write_json(article_data)
+        return True
+
+
+class ImageSpider:
+    """图片下载实例：release 置位前阻塞，记录每次下载"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.downloads = []
+
+    def download_missing_images(self, article_data, progress_callback=None):
+        self.downloads.append(article_data["article_id"])
+        self.started.set()
+        assert self.release.wait(10)
+        missing = [img for img in article_data["images"] if not img["download_success"]]
+        for done, img in enumerate(missing, 1):
+            img["download_success"] = True
+            progress_callback(done, len(missing))
+        article_data["images_pending"] = False
+        return True
+
+    def rewrite_article_files(self, article_data):
+        article_data["statistics"] = compute_article_statistics(article_data)
+        write_json(article_data)
+        return True
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    crawl_spider = CrawlSpider(str(tmp_path))
+    image_spider = ImageSpider()
+    executor = ThreadPoolExecutor(max_workers=2)
+    store = ArticleStore(str(tmp_path))
+    monkeypatch.setattr(server, "get_spider_instance", lambda: crawl_spider)
+    monkeypatch.setattr(server, "get_image_spider", lambda: image_spider)
+    monkeypatch.setattr(server, "get_image_executor", lambda: executor)
+    monkeypatch.setattr(server, "get_article_store", lambda: store)
+    monkeypatch.setattr(server, "get_recrawl_scheduler",
+                        lambda: RecrawlScheduler(str(tmp_path / "recrawl.json"), submit=lambda *a: None))
+    monkeypatch.setattr(server, "get_similarity_index", lambda: SimHashIndex(str(tmp_path / "simhash.json")))
+    monkeypatch.setattr(server, "get_keyword_index", lambda: CorpusKeywordIndex(str(tmp_path / "df.json")))
+    monkeypatch.setattr(server, "crawl_status", {})
+    monkeypatch.setattr(server, "images_in_flight", set())
+    yield crawl_spider, image_spider, executor, store
+    image_spider.release.set()
+    executor.shutdown(wait=True)
+
+
+def crawl():
+    return server._crawl_and_store(URL, True, None, None, False, False)
+
+
+def test_background_completion_updates_status_and_files(env):
+    _, image_spider, executor, store = env
+    result = crawl()
+    article_id = result["article_id"]
+
+    assert result["images_status"]["state"] == "downloading_images"
+    assert server.crawl_status[article_id]["state"] == "downloading_images"
+
+    image_spider.release.set()
+    executor.shutdown(wait=True)
+
+    state = server.crawl_status[article_id]
+    assert state["state"] == "completed"
+    assert state["images_downloaded"] == "2/2"
+    assert (state["images_done"], state["images_total"]) == (2, 2)
+    saved = store.load_article(article_id)
+    assert all(img["download_success"] for img in saved["images"])
+    assert store.get_statistics(article_id)["image_statistics"]["downloaded_successfully"] == 2
+    assert article_id not in server.images_in_flight
+
+
+def test_resume_while_downloading_is_rejected(env):
+    _, image_spider, executor, _ = env
+    article_id = crawl()["article_id"]
+    assert image_spider.started.wait(5)
+
+    result = json.loads(server.resume_article_images(article_id))
+    assert result["status"] == "already_downloading"
+
+    image_spider.release.set()
+    executor.shutdown(wait=True)
+    assert image_spider.downloads == [article_id]
+
+
+def test_resume_after_pending_downloads_missing_images(env):
+    _, image_spider, executor, store = env
+    image_spider.release.set()
+    article_id = crawl()["article_id"]
+    executor.shutdown(wait=True)
+
+    # 再次继续下载时图片均已下载
+    result = json.loads(server.resume_article_images(article_id))
+    assert result["message"] == "文章图片均已下载"
+    assert image_spider.downloads == [article_id]
+
+
+def test_recrawl_during_download_is_not_overwritten(env):
+    crawl_spider, image_spider, executor, store = env
+    article_id = crawl()["article_id"]
+    assert image_spider.started.wait(5)
+
+    # 下载期间重新爬取：不再提交第二个下载，新保存的图片留待继续下载
+    crawl_spider.text = "新正文"
+    result = crawl()
+    assert result["images_status"]["state"] == "images_pending"
+
+    image_spider.release.set()
+    executor.shutdown(wait=True)
+
+    saved = store.load_article(article_id)
+    assert saved["content_text"] == "新正文"
+    assert not any(img["download_success"] for img in saved["images"])
+    assert server.crawl_status[article_id]["state"] == "images_pending"
+    assert image_spider.downloads == [article_id]
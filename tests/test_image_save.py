@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""下载图片的缩放与格式转换测试"""
+
+import io
+
+import pytest
+from PIL import Image
+
+from weixin_spider_simple import WeixinSpiderWithImages, normalize_image_options
+
+
+def make_spider(**image_options):
+    """不启动浏览器，只设置保存图片所需的属性"""
+    spider = WeixinSpiderWithImages.__new__(WeixinSpiderWithImages)
+    spider.image_options = normalize_image_options(image_options)
+    return spider
+
+
+def encode(img, image_format):
+    buffer = io.BytesIO()
+    img.save(buffer, image_format)
+    return buffer.getvalue()
+
+
+def palette_gif(size):
+    return encode(Image.new("RGB", size, (200, 30, 30)).convert("P"), "GIF")
+
+
+def palette_png_with_transparency(size):
+    img = Image.new("P", size, 0)
+    img.putpalette([255, 0, 0, 0, 255, 0] + [0] * 762)
+    img.info["transparency"] = 0
+    return encode(img, "PNG")
+
+
+def bilevel_png(size):
+    return encode(Image.new("1", size, 1), "PNG")
+
+
+def gray16_png(size):
+    return encode(Image.new("I;16", size, 1000), "PNG")
+
+
+@pytest.mark.parametrize("factory", [palette_gif, palette_png_with_transparency, bilevel_png, gray16_png])
+@pytest.mark.parametrize("image_format", ["jpeg", "png", "webp"])
+def test_resize_non_reducible_modes(tmp_path, factory, image_format):
+    spider = make_spider(max_width=1000, format=image_format)
+    filename, filepath = spider._save_image_bytes(factory((2000, 1500)), str(tmp_path), "img_001")
+
+    with Image.open(filepath) as saved:
+        assert saved.format == image_format.upper()
+        assert saved.size == (1000, 750)
+    assert filename == "img_001." + ("jpg" if image_format == "jpeg" else image_format)
+
+
+def test_target_size_is_rounded(tmp_path):
+    spider = make_spider(max_width=1000)
+    _, filepath = spider._save_image_bytes(encode(Image.new("RGB", (3000, 2000)), "PNG"), str(tmp_path), "img")
+
+    with Image.open(filepath) as saved:
+        assert saved.size == (1000, 667)
+
+
+def test_default_options_keep_size_and_png(tmp_path):
+    spider = make_spider()
+    _, filepath = spider._save_image_bytes(palette_gif((300, 200)), str(tmp_path), "img")
+
+    with Image.open(filepath) as saved:
+        assert saved.format == "PNG"
+        assert saved.size == (300, 200)
+        assert saved.mode == "RGBA"
+
+
+def test_thumbnail_from_palette_image(tmp_path):
+    spider = make_spider(max_width=800, thumbnail_size=128)
+    spider._save_image_bytes(palette_gif((1600, 1200)), str(tmp_path), "img_002")
+
+    with Image.open(tmp_path / "thumbs" / "img_002.jpg") as thumbnail:
+        assert max(thumbnail.size) == 128
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""持久化爬取任务队列测试"""
+
+import time
+
+import pytest
+
+from jobs import CrawlJobQueue
+from weixin_spider_simple import ArticleUnavailableError
+
+
+def wait_for(predicate, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "jobs.sqlite3")
+
+
+def test_running_job_is_requeued_after_restart(db_path):
+    queue = CrawlJobQueue(db_path, handler=None)
+    job = queue.submit("https://mp.weixin.qq.com/s/a", {"download_images": False})
+    assert queue._claim_next()["status"] == "running"
+
+    # 模拟进程在任务执行中退出后重新启动
+    calls = []
+    restarted = CrawlJobQueue(db_path, handler=lambda url, options: calls.append((url, options)) or {"ok": True})
+    restarted.start()
+    try:
+        assert wait_for(lambda: restarted.get(job["id"])["status"] == "done")
+    finally:
+        restarted.stop(timeout=5)
+    done = restarted.get(job["id"])
+    assert done["result"] == {"ok": True}
+    assert done["attempts"] == 2
+    assert calls == [("https://mp.weixin.qq.com/s/a", {"download_images": False})]
+
+
+def test_retriable_failure_backs_off_then_fails(db_path):
+    started = []
+
+    def handler(url, options):
+        started.append(time.monotonic())
+        raise RuntimeError("timeout")
+
+    queue = CrawlJobQueue(db_path, handler, max_attempts=3, retry_base=0.2)
+    job = queue.submit("https://mp.weixin.qq.com/s/a")
+    queue.start()
+    try:
+        assert wait_for(lambda: queue.get(job["id"])["status"] == "failed")
+    finally:
+        queue.stop(timeout=5)
+
+    failed = queue.get(job["id"])
+    assert failed["attempts"] == 3
+    assert failed["error"] == "timeout"
+    assert len(started) == 3
+    # 第 n 次失败后至少等待 0.5 · 0.2 · 2^(n-1) 秒
+    assert started[1] - started[0] >= 0.1
+    assert started[2] - started[1] >= 0.2
+
+
+def test_non_retriable_failure_fails_immediately(db_path):
+    calls = []
+
+    def handler(url, options):
+        calls.append(url)
+        raise ArticleUnavailableError("deleted", url)
+
+    queue = CrawlJobQueue(db_path, handler, max_attempts=3, retry_base=0.01)
+    job = queue.submit("https://mp.weixin.qq.com/s/a")
+    queue.start()
+    try:
+        assert wait_for(lambda: queue.get(job["id"])["status"] == "failed")
+    finally:
+        queue.stop(timeout=5)
+    assert queue.get(job["id"])["attempts"] == 1
+    assert len(calls) == 1
+
+
+def test_backed_off_job_does_not_block_later_jobs(db_path):
+    queue = CrawlJobQueue(db_path, handler=None, retry_base=60)
+    first = queue.submit("https://mp.weixin.qq.com/s/first")
+    second = queue.submit("https://mp.weixin.qq.com/s/second")
+
+    claimed = queue._claim_next()
+    assert claimed["id"] == first["id"]
+    queue._fail(claimed, RuntimeError("rate limited"))
+    assert queue.get(first["id"])["status"] == "queued"
+    assert queue.get(first["id"])["not_before"] > queue.get(first["id"])["updated_at"]
+
+    # 先提交的任务在退避中，后提交的任务先执行
+    assert queue._claim_next()["id"] == second["id"]
+    assert queue._claim_next() is None
+    assert 0 < queue._next_wait(120) <= 60
+
+
+def test_retry_delay_grows_exponentially_with_cap(db_path):
+    queue = CrawlJobQueue(db_path, handler=None, retry_base=10, retry_max=100)
+    for attempts, full in [(1, 10), (2, 20), (3, 40), (4, 80), (5, 100), (9, 100)]:
+        delays = [queue.retry_delay(attempts) for _ in range(50)]
+        assert all(full * 0.5 <= delay <= full for delay in delays)
+    assert len({queue.retry_delay(3) for _ in range(10)}) > 1
+
+
+def test_existing_database_gets_not_before_column(db_path):
+    import sqlite3
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE jobs (id TEXT PRIMARY KEY, url TEXT NOT NULL, options TEXT NOT NULL, status TEXT NOT NULL,"
+        " attempts INTEGER NOT NULL DEFAULT 0, result TEXT, error TEXT, created_at TEXT NOT NULL,"
+        " updated_at TEXT NOT NULL)"
+    )
+    conn.execute("INSERT INTO jobs VALUES ('old', 'https://mp.weixin.qq.com/s/a', '{}', 'queued', 0, NULL, NULL,"
+                 " '2024-01-01 00:00:00.000', '2024-01-01 00:00:00.000')")
+    conn.commit()
+    conn.close()
+
+    queue = CrawlJobQueue(db_path, handler=None)
+    assert queue._claim_next()["id"] == "old"
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""关键词分词、DF索引和TF-IDF得分测试"""
+
+import json
+import time
+
+import pytest
+
+import keywords
+from keywords import CorpusKeywordIndex, tokenize
+
+
+@pytest.fixture
+def bigram(monkeypatch):
+    """强制使用二元组回退切分"""
+    monkeypatch.setattr(keywords, "jieba", None)
+
+
+class FakeJieba:
+    """按空格切分的jieba替身"""
+
+    @staticmethod
+    def lcut(text):
+        return text.split(" ")
+
+
+def test_bigram_fallback(bigram):
+    assert tokenize("数据库索引") == ["数据", "据库", "库索", "索引"]
+    assert tokenize("") == []
+
+
+def test_bigram_skips_stop_chars_and_stopwords(bigram):
+    # 含虚词的二元组（我的、的数）被跳过
+    assert tokenize("我的数据") == ["数据"]
+    # 二元组本身是停用词
+    assert tokenize("点击，关注") == []
+
+
+def test_latin_tokens_filtered(bigram):
+    assert tokenize("The Python and python 2024 3.14 x") == ["python", "python"]
+
+
+def test_jieba_tokens_filtered(monkeypatch):
+    monkeypatch.setattr(keywords, "jieba", FakeJieba)
+    assert tokenize("我们 机器 学习 的 Python 2024  ") == ["机器", "学习", "python"]
+
+
+def test_real_jieba(monkeypatch):
+    jieba = pytest.importorskip("jieba")
+    monkeypatch.setattr(keywords, "jieba", jieba)
+    tokens = tokenize("我们今天学习机器学习")
+    assert "学习" in tokens
+    assert "我们" not in tokens and "今天" not in tokens
+
+
+def test_document_frequency_counts_each_document_once(tmp_path, bigram):
+    index = CorpusKeywordIndex(str(tmp_path / "df.json"))
+    assert index.add_document("a", "python python data")
+    assert index.add_document("b", "java data")
+    assert index.doc_count == 2
+    assert index.doc_freq == {"python": 1, "data": 2, "java": 1}
+
+
+def test_readd_is_ignored(tmp_path, bigram):
+    index = CorpusKeywordIndex(str(tmp_path / "df.json"))
+    assert index.add_document("a", "python data")
+    assert not index.add_document("a", "python data rust")
+    assert not index.add_document("", "python")
+    assert not index.add_document("b", "")
+    assert index.doc_count == 1
+    assert index.doc_freq == {"python": 1, "data": 1}
+
+
+def test_tfidf_ranks_rare_terms_first(tmp_path, bigram):
+    index = CorpusKeywordIndex(str(tmp_path / "df.json"))
+    for doc_id, text in [("a", "python data"), ("b", "java data"), ("c", "rust data")]:
+        index.add_document(doc_id, text)
+
+    # 未出现过的词 > 出现在一篇中的词 > 出现在所有文档中的词
+    ranked = index.score("golang python data")
+    assert [term for term, _ in ranked] == ["golang", "python", "data"]
+    assert ranked[0][1] > ranked[1][1] > ranked[2][1]
+    assert index.extract("golang python data", top_k=1) == ["golang"]
+    assert index.score("的") == []
+
+
+def test_writes_are_deferred_until_flush(tmp_path, bigram):
+    path = tmp_path / "df.json"
+    index = CorpusKeywordIndex(str(path), flush_interval=60)
+    index.add_document("a", "python data")
+    index.add_document("b", "java data")
+    assert not path.exists()
+
+    assert index.flush()
+    assert json.loads(path.read_text(encoding="utf-8"))["doc_ids"] == ["a", "b"]
+
+    reloaded = CorpusKeywordIndex(str(path))
+    assert reloaded.doc_count == 2
+    assert reloaded.doc_freq == index.doc_freq
+    assert not reloaded.add_document("a", "python data")
+
+
+def test_timer_writes_back(tmp_path, bigram):
+    path = tmp_path / "df.json"
+    index = CorpusKeywordIndex(str(path), flush_interval=0.05)
+    index.add_document("a", "python data")
+    deadline = time.time() + 5
+    while not path.exists() and time.time() < deadline:
+        time.sleep(0.01)
+    assert CorpusKeywordIndex(str(path)).doc_count == 1
+
+
+def test_zero_interval_writes_immediately(tmp_path, bigram):
+    path = tmp_path / "df.json"
+    index = CorpusKeywordIndex(str(path), flush_interval=0)
+    index.add_document("a", "python data")
+    assert CorpusKeywordIndex(str(path)).doc_count == 1
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""正文HTML转Markdown测试"""
+
+import io
+
+import pytest
+
+from weixin_spider_simple import MarkdownWriter
+
+
+def to_markdown(html, images=None):
+    out = io.StringIO()
+    MarkdownWriter(out, images).write_html(html)
+    return out.getvalue()
+
+
+@pytest.mark.parametrize("html, expected", [
+    # 列表项内的后续段落按标记宽度缩进，仍属于该列表项
+    ("<ol><li><p>p in li</p><p>second</p></li><li>two</li></ol>",
+     "1. p in li\n\n   second\n\n2. two"),
+    # 嵌套列表缩进到外层列表项内容的起始列
+    ("<ul><li>a<ul><li>b<p>b2</p></li></ul></li><li>c</li></ul>",
+     "- a\n  - b\n\n    b2\n\n- c"),
+    ("<ol>" + "<li>x</li>" * 9 + "<li>ten<ul><li>nested</li></ul></li></ol>",
+     "\n".join(f"{n}. x" for n in range(1, 10)) + "\n10. ten\n    - nested"),
+    ("<blockquote><ul><li><p>a</p><p>b</p></li></ul></blockquote>",
+     "> - a\n>\n>   b"),
+])
+def test_nested_lists(html, expected):
+    assert to_markdown(html) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("1. 不是列表", "1\\. 不是列表"),
+    ("2024) 年度", "2024\\) 年度"),
+    ("# 不是标题", "\\# 不是标题"),
+    ("- 不是列表", "\\- 不是列表"),
+    ("+ 不是列表", "\\+ 不是列表"),
+    ("&gt; 不是引用", "\\> 不是引用"),
+    ("===", "\\==="),
+    ("普通文字 1. 中间", "普通文字 1. 中间"),
+])
+def test_line_start_is_escaped(text, expected):
+    assert to_markdown(f"<p>{text}</p>") == expected
+
+
+def test_inline_markup_and_images():
+    html = "<h2>标题</h2><p>a <strong>重点</strong> <a href='https://example.com'>链接</a><img data-src='https://x/1.png'></p>"
+    images = [{"index": 1, "url": "https://x/1.png", "alt": "图一", "download_success": False}]
+    assert to_markdown(html, images) == (
+        "## 标题\n\na **重点** [链接](<https://example.com>)![图一](<https://x/1.png>)"
+    )
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""页面状态判断测试（用返回固定脚本结果的驱动代替浏览器）"""
+
+import pytest
+
+from weixin_spider_simple import WeixinSpiderWithImages
+
+
+class FakeDriver:
+    def __init__(self, result):
+        self.result = result
+
+    def execute_script(self, script):
+        return self.result
+
+
+@pytest.mark.parametrize("result, expected", [
+    ("__article__", "article"),
+    ("", None),
+    ("   \n", None),
+    (None, None),
+    ("该内容已被发布者删除", "deleted"),
+    ("访问过于频繁，请稍后再试", "rate_limited"),
+    ("正在加载", None),
+])
+def test_page_state(result, expected):
+    spider = WeixinSpiderWithImages.__new__(WeixinSpiderWithImages)
+    assert spider._page_state(FakeDriver(result)) == expected
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""自适应限速器与限速会话测试（使用假时钟，不真正等待；会话挂载返回固定状态码的适配器）"""
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+import weixin_spider_simple
+from weixin_spider_simple import AdaptiveRateLimiter, RateLimitedSession, WeixinSpiderWithImages
+
+HOST = "mp.weixin.qq.com"
+URL = f"https://{HOST}/s/limited"
+
+
+class FakeClock:
+    """代替限速器模块中的 time：sleep 只推进时钟"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class FakeAdapter(BaseAdapter):
+    """依次返回给定状态码的响应"""
+
+    def __init__(self, statuses, headers=None):
+        super().__init__()
+        self.statuses = list(statuses)
+        self.headers = headers or {}
+        self.sent = 0
+
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.status_code = self.statuses[min(self.sent, len(self.statuses) - 1)]
+        response.headers.update(self.headers)
+        response.url = request.url
+        response.request = request
+        self.sent += 1
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(weixin_spider_simple, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def limiter(clock):
+    limiter = AdaptiveRateLimiter(initial_rate=1.0, min_rate=0.1, max_rate=1.25, burst=3,
+                                  increase=0.1, base_backoff=1.0, max_backoff=8.0)
+    # 去掉抖动，退避时间取上限
+    limiter.backoff_delay = lambda attempt: min(limiter.max_backoff, limiter.base_backoff * 2 ** attempt)
+    return limiter
+
+
+def make_session(limiter, statuses, headers=None, max_retries=3):
+    session = RateLimitedSession(limiter=limiter, max_retries=max_retries)
+    adapter = FakeAdapter(statuses, headers)
+    session.mount("https://", adapter)
+    return session, adapter
+
+
+def test_token_bucket_allows_burst_then_queues(limiter, clock):
+    assert [limiter.reserve(HOST) for _ in range(3)] == [0.0, 0.0, 0.0]
+    # 透支的令牌按速率折算为等待时间，并发请求依次排队
+    assert limiter.reserve(HOST) == pytest.approx(1.0)
+    assert limiter.reserve(HOST) == pytest.approx(2.0)
+    clock.now += 10
+    assert limiter.reserve(HOST) == 0.0
+
+
+def test_acquire_sleeps_for_reserved_wait(limiter, clock):
+    for _ in range(3):
+        limiter.acquire(HOST)
+    assert clock.slept == []
+    assert limiter.acquire(HOST) == pytest.approx(1.0)
+    assert clock.slept == [pytest.approx(1.0)]
+
+
+def test_success_increases_rate_additively_up_to_max(limiter):
+    limiter.report(HOST)
+    limiter.report(HOST)
+    assert limiter.get_rates() == {HOST: 1.2}
+    limiter.report(HOST)
+    limiter.report(HOST)
+    assert limiter.get_rates() == {HOST: 1.25}
+
+
+def test_throttle_halves_rate_down_to_min(limiter):
+    limiter.report(HOST, throttled=True)
+    assert limiter.get_rates() == {HOST: 0.5}
+    for _ in range(5):
+        limiter.report(HOST, throttled=True)
+    assert limiter.get_rates() == {HOST: 0.1}
+
+
+def test_throttle_blocks_host_until_backoff_ends(limiter, clock):
+    assert limiter.report(HOST, throttled=True, retry_after=10) == 10
+    clock.now += 4
+    # 暂停期间令牌按减半后的速率恢复，但仍需等到 blocked_until
+    assert limiter.reserve(HOST) == pytest.approx(6.0)
+    assert limiter.reserve("other.example.com") == 0.0
+
+
+def test_consecutive_throttles_back_off_exponentially(limiter):
+    delays = [limiter.report(HOST, throttled=True) for _ in range(5)]
+    assert delays == [1.0, 2.0, 4.0, 8.0, 8.0]
+    # 成功请求重置退避次数
+    limiter.report(HOST)
+    assert limiter.report(HOST, throttled=True) == 1.0
+
+
+def test_backoff_delay_full_jitter():
+    limiter = AdaptiveRateLimiter(base_backoff=1.0, max_backoff=8.0)
+    for attempt in range(6):
+        delay = limiter.backoff_delay(attempt)
+        assert 0 <= delay <= min(8.0, 2 ** attempt)
+
+
+def test_session_retries_5xx_then_succeeds(limiter, clock):
+    session, adapter = make_session(limiter, [503, 502, 200])
+    response = session.get(URL)
+    assert response.status_code == 200
+    assert adapter.sent == 3
+    # 两次退避 1 + 2 秒，在之后的 acquire 中等待
+    assert sum(clock.slept) >= 3.0
+    assert limiter.get_rates()[HOST] == pytest.approx(1.0 * 0.5 * 0.5 + 0.1)
+
+
+def test_session_honours_retry_after(limiter, clock):
+    session, adapter = make_session(limiter, [429, 200], headers={"Retry-After": "30"})
+    assert session.get(URL).status_code == 200
+    assert max(clock.slept) == pytest.approx(30.0)
+
+
+def test_session_retry_count_is_bounded(limiter, clock):
+    session, adapter = make_session(limiter, [500], max_retries=2)
+    assert session.get(URL).status_code == 500
+    assert adapter.sent == 3
+
+
+def test_session_does_not_retry_client_errors(limiter, clock):
+    session, adapter = make_session(limiter, [404])
+    assert session.get(URL).status_code == 404
+    assert adapter.sent == 1
+    assert limiter.get_rates()[HOST] == pytest.approx(1.1)
+
+
+class FrequencyLimitedDriver:
+    """每次打开页面都显示微信频率限制页面"""
+
+    def __init__(self):
+        self.loads = 0
+
+    def get(self, url):
+        self.loads += 1
+
+    def execute_script(self, script):
+        return "访问过于频繁，请稍后再试"
+
+
+def test_frequency_limit_page_throttles_host(limiter, clock, monkeypatch):
+    monkeypatch.setattr(weixin_spider_simple, "rate_limiter", limiter)
+    spider = WeixinSpiderWithImages.__new__(WeixinSpiderWithImages)
+    spider.driver = FrequencyLimitedDriver()
+    spider.stage_timeouts = dict.fromkeys(weixin_spider_simple.DEFAULT_STAGE_TIMEOUTS, None)
+    spider.stage_timeouts["wait"] = 10
+    spider.watchdog = weixin_spider_simple.Watchdog(lambda stage: None)
+
+    with pytest.raises(RuntimeError, match="频率限制"):
+        spider.crawl_article_by_url(URL, retry_times=3)
+
+    assert spider.driver.loads == 3
+    # 前两次失败各减半一次速率，第二次尝试前等待了第一次的退避时间
+    assert limiter.get_rates()[HOST] == pytest.approx(0.25)
+    assert sum(clock.slept) >= 1.0
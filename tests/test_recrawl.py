@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""重新爬取历史只在文章保存成功后更新"""
+
+import json
+import os
+
+import pytest
+
+import server
+from keywords import CorpusKeywordIndex
+from scheduler import RecrawlScheduler, content_hash
+from similarity import SimHashIndex
+from storage import ArticleStore, make_article_id
+
+URL = "https://mp.weixin.qq.com/s/recrawl"
+
+
+class FakeSpider:
+    """返回固定正文的爬虫，save_ok 为False时保存失败"""
+
+    def __init__(self, articles_dir):
+        self.articles_dir = articles_dir
+        self.download_images = False
+        self.text = "第一版"
+        self.save_ok = True
+
+    def crawl_article_by_url(self, url):
+        return {"title": "标题", "content_text": self.text, "url": url, "crawl_time": "2024-01-01 00:00:00"}
+
+    def save_article_to_file(self, article_data, custom_filename=None, download_images=None):
+        if not self.save_ok:
+            return False
+        article_dir = os.path.join(self.articles_dir, "a")
+        os.makedirs(article_dir, exist_ok=True)
+        article_data["files"] = {"dir": article_dir, "json": os.path.join(article_dir, "a.json")}
+        with open(article_data["files"]["json"], "w", encoding="utf-8") as f:
+            json.dump(article_data, f, ensure_ascii=False)
+        return True
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    spider = FakeSpider(str(tmp_path))
+    store = ArticleStore(str(tmp_path))
+    scheduler = RecrawlScheduler(str(tmp_path / "recrawl.json"), submit=lambda article_id, url: None)
+    similarity = SimHashIndex(str(tmp_path / "simhash.json"))
+    keywords = CorpusKeywordIndex(str(tmp_path / "df.json"))
+    monkeypatch.setattr(server, "get_spider_instance", lambda: spider)
+    monkeypatch.setattr(server, "get_article_store", lambda: store)
+    monkeypatch.setattr(server, "get_recrawl_scheduler", lambda: scheduler)
+    monkeypatch.setattr(server, "get_similarity_index", lambda: similarity)
+    monkeypatch.setattr(server, "get_keyword_index", lambda: keywords)
+    return spider, scheduler
+
+
+def crawl(recrawl=False):
+    return server._crawl_and_store(URL, False, None, None, False, recrawl)
+
+
+def history(scheduler):
+    return scheduler._history.get(make_article_id(URL))
+
+
+def test_failed_save_is_not_recorded(env):
+    spider, scheduler = env
+    spider.save_ok = False
+    with pytest.raises(RuntimeError):
+        crawl()
+    assert history(scheduler) is None
+
+    spider.save_ok = True
+    assert crawl()["status"] == "success"
+    assert history(scheduler)["content_hash"] == content_hash("第一版")
+
+
+def test_changed_content_is_saved_after_failed_recrawl(env):
+    spider, scheduler = env
+    crawl()
+
+    spider.text, spider.save_ok = "第二版", False
+    with pytest.raises(RuntimeError):
+        crawl(recrawl=True)
+    assert history(scheduler)["content_hash"] == content_hash("第一版")
+    assert history(scheduler)["checks"] == 0
+
+    # 保存失败的新正文没有记入历史，下次重新爬取仍视为有变化并保存
+    spider.save_ok = True
+    assert crawl(recrawl=True)["status"] == "success"
+    assert history(scheduler)["content_hash"] == content_hash("第二版")
+    assert history(scheduler)["changes"] == 1
+
+
+def test_unchanged_recrawl_is_recorded_without_saving(env):
+    spider, scheduler = env
+    crawl()
+    spider.save_ok = False
+
+    result = crawl(recrawl=True)
+    assert result["status"] == "unchanged"
+    assert history(scheduler)["checks"] == 1
+    assert history(scheduler)["changes"] == 0
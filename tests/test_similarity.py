@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""SimHash指纹与分段索引测试"""
+
+import os
+import random
+import subprocess
+import sys
+
+import pytest
+
+import keywords
+import similarity
+from similarity import SimHashIndex, hamming_distance, simhash, similarity_to_distance
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(similarity.__file__))
+
+TEXT = "分布式系统中的一致性协议保证多个副本在故障时仍然对外表现为单一副本，常见的有Paxos和Raft。"
+
+
+@pytest.fixture(autouse=True)
+def bigram(monkeypatch):
+    """统一使用二元组切分，指纹不受是否安装jieba影响"""
+    monkeypatch.setattr(keywords, "jieba", None)
+
+
+def flip(fingerprint, bands):
+    """在指定分段中各翻转一位"""
+    for band in bands:
+        fingerprint ^= 1 << (band * similarity.BAND_BITS + band % similarity.BAND_BITS)
+    return fingerprint
+
+
+@pytest.fixture
+def base():
+    return random.Random(7).getrandbits(64) | 1
+
+
+def test_simhash_is_stable_across_processes():
+    code = (f"import sys; sys.path.insert(0, {PACKAGE_DIR!r}); import keywords; keywords.jieba = None; "
+            f"from similarity import simhash; print(simhash({TEXT!r}))")
+    outputs = {
+        subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                       env=dict(os.environ, PYTHONHASHSEED=seed)).stdout.strip()
+        for seed in ("1", "2")
+    }
+    assert outputs == {str(simhash(TEXT))}
+
+
+def test_simhash_near_duplicate_text():
+    edited = TEXT.replace("常见的有", "典型的如")
+    unrelated = "今天天气很好，适合出门散步。"
+    assert simhash("") == 0
+    assert hamming_distance(simhash(TEXT), simhash(edited)) < hamming_distance(simhash(TEXT), simhash(unrelated))
+
+
+def test_banded_query_finds_near_duplicates(tmp_path, base, monkeypatch):
+    index = SimHashIndex(str(tmp_path / "simhash.json"))
+    rng = random.Random(1)
+    for i in range(200):
+        index.add(f"noise{i}", rng.getrandbits(64) | 1)
+    index.add("d1", flip(base, [0]))
+    index.add("d7", flip(base, range(7)))
+    index.add("d8", flip(base, range(8)))
+
+    compared = []
+    distance = hamming_distance
+    monkeypatch.setattr(similarity, "hamming_distance", lambda a, b: compared.append(b) or distance(a, b))
+
+    assert similarity_to_distance(0.89) == similarity.MAX_BANDED_DISTANCE
+    results = index.query(base, threshold=0.89)
+    assert [(r["article_id"], r["distance"]) for r in results] == [("d1", 1), ("d7", 7)]
+    # 只比较了分段桶中的候选文章
+    assert len(compared) < 50
+
+
+def test_low_threshold_falls_back_to_full_scan(tmp_path, base):
+    index = SimHashIndex(str(tmp_path / "simhash.json"))
+    index.add("d8", flip(base, range(8)))
+    # 每个分段都不同，分段桶中没有候选
+    assert index.query(base, threshold=0.89) == []
+    results = index.query(base, threshold=0.8)
+    assert [(r["article_id"], r["distance"]) for r in results] == [("d8", 8)]
+
+
+def test_query_excludes_self_and_limits(tmp_path, base):
+    index = SimHashIndex(str(tmp_path / "simhash.json"))
+    index.add("self", base)
+    for i in range(5):
+        index.add(f"d{i}", flip(base, [i]))
+    results = index.query(base, threshold=0.9, limit=3, exclude="self")
+    assert len(results) == 3
+    assert all(r["article_id"] != "self" and r["similarity"] == round(1 - 1 / 64, 4) for r in results)
+
+
+def test_readd_replaces_buckets(tmp_path, base):
+    index = SimHashIndex(str(tmp_path / "simhash.json"))
+    index.add("a", base)
+    index.add("a", ~base & ((1 << 64) - 1))
+    assert index.query(base, threshold=0.89) == []
+    assert index.get("a") == ~base & ((1 << 64) - 1)
+
+
+def test_writes_are_deferred_and_reload(tmp_path, base):
+    path = tmp_path / "simhash.json"
+    index = SimHashIndex(str(path), flush_interval=60)
+    index.add("a", base)
+    index.add("b", flip(base, [3]))
+    assert not path.exists()
+
+    assert index.flush()
+    reloaded = SimHashIndex(str(path))
+    assert reloaded.get("a") == base
+    assert [r["article_id"] for r in reloaded.query(base, threshold=0.95, exclude="a")] == ["b"]
+
+    # 重复登记相同指纹不产生写盘
+    index.add("a", base)
+    assert not index._writer.dirty
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""阶段时限、看门狗与图片下载时限测试"""
+
+import os
+import subprocess
+import threading
+import time
+
+import pytest
+
+import weixin_spider_simple as spider_module
+from weixin_spider_simple import (DEFAULT_STAGE_TIMEOUTS, StageTimeoutError, Watchdog,
+                                  WeixinSpiderWithImages, kill_process_tree, normalize_image_options)
+
+
+@pytest.fixture(autouse=True)
+def short_grace(monkeypatch):
+    monkeypatch.setattr(spider_module, "WATCHDOG_GRACE", 0.05)
+
+
+def test_watchdog_fires_on_hung_stage():
+    released = threading.Event()
+    fired = []
+
+    def on_timeout(stage):
+        fired.append(stage)
+        released.set()
+
+    watchdog = Watchdog(on_timeout)
+    timings = {}
+    with pytest.raises(StageTimeoutError) as excinfo:
+        with watchdog.stage("page_load", 0.1, timings):
+            # 模拟阻塞在WebDriver调用上，浏览器被结束后因连接断开抛出异常
+            assert released.wait(5)
+            raise ConnectionError("driver gone")
+
+    assert fired == ["page_load"]
+    assert excinfo.value.stage == "page_load"
+    assert excinfo.value.retriable
+    assert 0.1 <= timings["page_load"] < 5
+
+
+def test_watchdog_does_not_fire_for_fast_stage():
+    fired = []
+    watchdog = Watchdog(fired.append)
+    with watchdog.stage("extract", 0.2):
+        pass
+    with pytest.raises(ValueError):
+        with watchdog.stage("wait", 0.2):
+            raise ValueError("普通错误原样抛出")
+    time.sleep(0.4)
+    assert fired == []
+
+
+@pytest.mark.skipif(os.name == "nt", reason="使用 sh 构造进程树")
+def test_kill_process_tree():
+    root = subprocess.Popen(["sh", "-c", "sleep 60 & sleep 60 & wait"])
+    time.sleep(0.3)
+    children = subprocess.run(["pgrep", "-P", str(root.pid)], capture_output=True, text=True).stdout.split()
+    assert len(children) == 2
+
+    kill_process_tree(root.pid)
+    root.wait(timeout=5)
+    time.sleep(0.1)
+    for pid in children:
+        assert not os.path.exists(f"/proc/{pid}") or "Z" in open(f"/proc/{pid}/stat").read().split()[2]
+
+
+def make_spider(tmp_path, images_timeout):
+    """不启动浏览器的爬虫，单张图片下载耗时0.1秒"""
+    spider = WeixinSpiderWithImages.__new__(WeixinSpiderWithImages)
+    spider.async_http = False
+    spider.download_images = True
+    spider.image_options = normalize_image_options()
+    spider.stage_timeouts = dict(DEFAULT_STAGE_TIMEOUTS, images=images_timeout)
+    spider.compact_json = True
+    spider.compression = None
+
+    def download_image(img_url, save_dir, filename_prefix="img"):
+        time.sleep(0.1)
+        path = os.path.join(save_dir, filename_prefix + ".png")
+        with open(path, "wb") as f:
+            f.write(b"png")
+        return filename_prefix + ".png", path
+
+    spider._download_image = download_image
+    return spider
+
+
+def test_images_deadline_keeps_article_pending_and_resumes(tmp_path):
+    spider = make_spider(tmp_path, images_timeout=0.25)
+    article_dir = str(tmp_path)
+    article_data = {
+        "title": "标题", "url": "https://mp.weixin.qq.com/s/x", "content_text": "正文", "content_html": "<p>正文</p>",
+        "images": [{"index": i, "url": f"https://mmbiz.qpic.cn/{i}", "alt": "", "download_success": False}
+                   for i in range(1, 7)],
+        "files": {name: os.path.join(article_dir, f"a.{name}") for name in ("json", "txt", "md")},
+    }
+    article_data["files"]["dir"] = article_dir
+
+    assert spider._download_all_images(article_data["images"], article_dir) > 0
+    article_data["images_pending"] = True
+
+    # 继续下载只处理尚未下载的图片，直到全部完成
+    for _ in range(5):
+        if not article_data["images_pending"]:
+            break
+        assert spider.complete_article_images(article_data)
+    assert not article_data["images_pending"]
+    assert all(img["download_success"] for img in article_data["images"])
+    assert "images" in article_data["timings"]["stages"]
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""文章统计信息测试"""
+
+import pytest
+
+from weixin_spider_simple import compute_article_statistics
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("", (0, 0, 0, 0)),
+    ("一段 正文", (5, 2, 1, 1)),
+    ("第一段\n第二行\n\n第二段", (12, 3, 2, 4)),
+    ("a\n\n\nb", (5, 2, 2, 4)),
+])
+def test_content_statistics(text, expected):
+    stats = compute_article_statistics({"content_text": text})["content_statistics"]
+    assert (stats["total_characters"], stats["total_words"], stats["paragraphs"], stats["lines"]) == expected
+
+
+def test_image_statistics_and_content_fallback():
+    stats = compute_article_statistics({
+        "content": "旧字段",
+        "images": [{"download_success": True}, {"download_success": False}, {}],
+    })
+    assert stats["content_statistics"]["total_characters"] == 3
+    assert stats["image_statistics"] == {
+        "total_images": 3,
+        "downloaded_successfully": 1,
+        "download_failed": 2,
+        "download_success_rate": "33.3%",
+    }
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""文章存储：登记、分页读取"""
+
+import json
+import os
+
+import pytest
+
+from storage import ArticleStore
+
+URL = "https://mp.weixin.qq.com/s/paging"
+
+
+def save(tmp_path, text, html="<p>正文</p>"):
+    """按爬虫保存的格式写入文章JSON（先写临时文件再替换）并返回文章数据"""
+    article_dir = tmp_path / "article"
+    article_dir.mkdir(exist_ok=True)
+    json_path = str(article_dir / "article.json")
+    article_data = {
+        "title": "标题", "url": URL, "content_text": text, "content_html": html,
+        "files": {"dir": str(article_dir), "json": json_path},
+    }
+    with open(json_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(article_data, f, ensure_ascii=False)
+    os.replace(json_path + ".tmp", json_path)
+    return article_data
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ArticleStore(str(tmp_path / "articles"))
+
+
+def read_all(store, article_id, field="content_text", page_size=1024):
+    first = store.read_page(article_id, field, 0, page_size)
+    pages = [first["text"]] + [
+        store.read_page(article_id, field, page, page_size)["text"] for page in range(1, first["total_pages"])
+    ]
+    return "".join(pages), first["total_pages"]
+
+
+def test_pages_follow_resaved_article(tmp_path, store):
+    article_id = store.register(save(tmp_path, "第一版正文"))
+    assert read_all(store, article_id)[0] == "第一版正文"
+    assert store.get_field_size(article_id, "content_text") == len("第一版正文".encode("utf-8"))
+
+    # 重新保存到同一目录，正文长度相同
+    store.register(save(tmp_path, "第二版正文", html="<p>新</p>"))
+    assert read_all(store, article_id)[0] == "第二版正文"
+    assert read_all(store, article_id, "content_html")[0] == "<p>新</p>"
+
+
+def test_missing_page_file_is_rebuilt(tmp_path, store):
+    article_id = store.register(save(tmp_path, "正文"))
+    read_all(store, article_id)
+    os.remove(tmp_path / "article" / ".pages" / "content_text.txt")
+    assert read_all(store, article_id)[0] == "正文"
+
+
+@pytest.mark.parametrize("page_size", [1, 2, 4, 5, 7, 64])
+def test_pages_align_to_utf8_boundaries(tmp_path, store, page_size):
+    text = "a中文😀b\n微信é" * 5
+    article_id = store.register(save(tmp_path, text))
+
+    joined, total_pages = read_all(store, article_id, page_size=page_size)
+    assert joined == text
+    assert total_pages == -(-len(text.encode("utf-8")) // page_size)
+
+
+def test_page_out_of_range_and_unknown_field(tmp_path, store):
+    article_id = store.register(save(tmp_path, "正文"))
+    with pytest.raises(ValueError):
+        store.read_page(article_id, "content_text", 1)
+    with pytest.raises(ValueError):
+        store.read_page(article_id, "title", 0)
+    with pytest.raises(KeyError):
+        store.read_page("missing", "content_text", 0)
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""多标签页爬取：标签页复用、导航失败、崩溃隔离和超时"""
+
+import threading
+from itertools import count
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+import weixin_spider_simple
+from tab_pool import MAX_REQUEUE, TabPoolCrawler, _READY_SCRIPT
+from weixin_spider_simple import DEFAULT_STAGE_TIMEOUTS, StageTimeoutError, Watchdog
+
+_hosts = count()
+
+
+def url(name):
+    """每个URL使用不同主机，避免共享的限速器让测试等待"""
+    return f"https://t{next(_hosts)}.example/{name}"
+
+
+class FakeDriver:
+    """按 pages 中的设置模拟各标签页的CDP命令和脚本执行"""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.current_window_handle = "home"
+        self.switch_to = self
+        self.tabs = {}
+        self.created = 0
+        self.navigations = []
+        self.killed = threading.Event()
+        self.dead = False
+        self._ids = count()
+
+    def window(self, handle):
+        self.current_window_handle = handle
+
+    def _spec(self):
+        return self.pages.get(self.tabs.get(self.current_window_handle), {})
+
+    def execute_cdp_cmd(self, cmd, params):
+        if self.dead or self.killed.is_set():
+            raise WebDriverException("chrome not reachable")
+        if cmd == "Target.createBrowserContext":
+            return {"browserContextId": f"ctx{next(self._ids)}"}
+        if cmd == "Target.createTarget":
+            self.created += 1
+            handle = f"tab{next(self._ids)}"
+            self.tabs[handle] = None
+            return {"targetId": handle}
+        if cmd == "Target.closeTarget":
+            self.tabs.pop(params["targetId"], None)
+            return {}
+        if cmd == "Page.navigate":
+            self.navigations.append(params["url"])
+            spec = self.pages.get(params["url"], {})
+            if spec.get("kill_browser_on_navigate"):
+                self.dead = True
+            if spec.get("nav_fail") or self.dead:
+                raise WebDriverException("navigation failed")
+            self.tabs[self.current_window_handle] = params["url"]
+            return {}
+        return {}
+
+    def execute_script(self, script):
+        assert script == _READY_SCRIPT
+        spec = self._spec()
+        if spec.get("hang"):
+            # 渲染进程卡住：直到浏览器被结束才返回
+            assert self.killed.wait(10)
+            raise WebDriverException("disconnected")
+        if spec.get("crash", 0) > 0:
+            spec["crash"] -= 1
+            raise WebDriverException("tab crashed")
+        if spec.get("polls", 0) > 0:
+            spec["polls"] -= 1
+            return "loading"
+        return "complete"
+
+
+class FakeSpider:
+    """提供 TabPoolCrawler 使用的爬虫接口"""
+
+    def __init__(self, pages, **timeouts):
+        self.pages = pages
+        self.stage_timeouts = {**DEFAULT_STAGE_TIMEOUTS, "wait": 5, **timeouts}
+        self.drivers = [FakeDriver(pages)]
+        self.driver = self.drivers[0]
+        self.watchdog = Watchdog(lambda stage: self.driver.killed.set())
+
+    def _restart_driver(self):
+        self.driver = FakeDriver(self.pages)
+        self.drivers.append(self.driver)
+
+    def _page_state(self, driver):
+        return driver._spec().get("state", "article")
+
+    def _extract_article_content(self):
+        return {"title": self.driver.tabs[self.driver.current_window_handle]}
+
+    def close(self):
+        pass
+
+
+def run(pages, urls, tabs=2, **timeouts):
+    spider = FakeSpider(pages, **timeouts)
+    crawler = TabPoolCrawler(tabs=tabs, spider=spider)
+    results = {u: (data, error) for u, data, error in crawler.crawl(urls)}
+    assert sorted(results) == sorted(urls)
+    return results, spider, crawler
+
+
+@pytest.fixture(autouse=True)
+def fast(monkeypatch):
+    monkeypatch.setattr("tab_pool.POLL_INTERVAL", 0.01)
+    monkeypatch.setattr(weixin_spider_simple, "WATCHDOG_GRACE", 0)
+
+
+def test_tabs_are_recycled():
+    urls = [url(f"a{i}") for i in range(5)]
+    pages = {u: {"polls": i % 3} for i, u in enumerate(urls)}
+    results, spider, crawler = run(pages, urls)
+
+    assert all(results[u] == ({"title": u}, None) for u in urls)
+    assert spider.driver.created == 2
+    assert len(crawler._tabs) == 2
+
+
+def test_navigate_failure_is_retried_then_reported():
+    bad, good = url("bad"), url("good")
+    results, spider, _ = run({bad: {"nav_fail": True}}, [bad, good])
+
+    data, error = results[bad]
+    assert data is None and isinstance(error, WebDriverException)
+    assert spider.driver.navigations.count(bad) == MAX_REQUEUE + 1
+    assert results[good] == ({"title": good}, None)
+
+
+def test_crashed_tab_is_isolated():
+    flaky, broken, fine = url("flaky"), url("broken"), url("fine")
+    pages = {flaky: {"crash": 1}, broken: {"crash": 99}, fine: {"polls": 3}}
+    results, spider, crawler = run(pages, [flaky, broken, fine])
+
+    assert results[flaky] == ({"title": flaky}, None)
+    assert results[fine] == ({"title": fine}, None)
+    assert isinstance(results[broken][1], WebDriverException)
+    assert spider.driver.navigations.count(broken) == MAX_REQUEUE + 1
+    assert len(crawler._tabs) == 2
+    assert len(spider.drivers) == 1
+
+
+def test_tab_that_never_becomes_ready_times_out():
+    slow, fine = url("slow"), url("fine")
+    results, spider, crawler = run({slow: {"state": None}, fine: {}}, [slow, fine],
+                                   page_load=None, wait=0.3)
+
+    error = results[slow][1]
+    assert isinstance(error, StageTimeoutError) and error.stage == "wait"
+    assert results[fine] == ({"title": fine}, None)
+    # 超时的标签页已重建
+    assert spider.driver.created == 3
+    assert len(crawler._tabs) == 2
+
+
+def test_hung_tab_restarts_browser_and_requeues_others():
+    hung, slow = url("hung"), url("slow")
+    pages = {hung: {"hang": True}, slow: {"polls": 1000}}
+    spider = FakeSpider(pages, script=0.2)
+    crawler = TabPoolCrawler(tabs=2, spider=spider)
+
+    results = {}
+    for u, data, error in crawler.crawl([slow, hung]):
+        results[u] = (data, error)
+        # 重建后的浏览器中页面很快就绪
+        pages[slow]["polls"] = 0
+
+    error = results[hung][1]
+    assert isinstance(error, StageTimeoutError) and error.stage == "script"
+    assert len(spider.drivers) == 2
+    assert results[slow] == ({"title": slow}, None)
+    assert slow in spider.drivers[1].navigations
+
+
+def test_dead_browser_fails_remaining_urls():
+    urls = [url("first")] + [url(f"rest{i}") for i in range(4)]
+    pages = {urls[0]: {"kill_browser_on_navigate": True}}
+    results, _, crawler = run(pages, urls)
+
+    assert all(data is None and error is not None for data, error in results.values())
+    assert crawler._tabs == []
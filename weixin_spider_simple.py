@@ -6,11 +6,16 @@
 """
 
 import time
+import random
+import threading
+import asyncio
+import io
 import requests
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
@@ -27,8 +32,48 @@ import sys
 import shutil
 import subprocess
 import base64
+import gzip
+import signal
+from contextlib import contextmanager
+from html.parser import HTMLParser
 from urllib.parse import unquote
 
+# 图片处理（Pillow 未安装时图片按原始数据保存）
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# 可选：lxml 正文文本提取（未安装时使用BeautifulSoup）
+try:
+    from lxml import html as lxml_html
+except ImportError:
+    lxml_html = None
+
+# 可选：psutil 结束浏览器进程树（未安装时使用 pgrep/taskkill）
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# 可选：zstd 压缩（未安装时只能使用gzip）
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# 可选：httpx 异步客户端（安装 h2 后启用HTTP/2）
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -36,20 +81,1113 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+def compute_article_statistics(article_data):
+    """
+    计算文章统计信息
+    正文扫描三次：词数由正则逐个匹配计数（不生成 split 列表），段落数和行数各用一次 str.count；
+    两次 count 在C中执行，比在Python中逐个匹配同时统计三项的单次遍历更快。图片列表只遍历一次
+    :param article_data: 文章数据
+    :return: 统计信息字典
+    """
+    content = article_data.get('content_text') or article_data.get('content', '')
+    images = article_data.get('images') or []
+    
+    downloaded = 0
+    for img in images:
+        if img.get('download_success', False):
+            downloaded += 1
+    total_images = len(images)
+    
+    return {
+        'basic_info': {
+            'title': article_data.get('title', ''),
+            'author': article_data.get('author', ''),
+            'publish_time': article_data.get('publish_time', ''),
+            'crawl_time': article_data.get('crawl_time', '')
+        },
+        'content_statistics': {
+            'total_characters': len(content),
+            'total_words': sum(1 for _ in re.finditer(r'\S+', content)),
+            'paragraphs': content.count('\n\n') + 1 if content else 0,
+            'lines': content.count('\n') + 1 if content else 0
+        },
+        'image_statistics': {
+            'total_images': total_images,
+            'downloaded_successfully': downloaded,
+            'download_failed': total_images - downloaded,
+            'download_success_rate': f"{downloaded / total_images * 100:.1f}%" if total_images else "0%"
+        }
+    }
+
+
+# 微信频率限制页面的提示文字
+FREQUENCY_LIMIT_MARKERS = ('访问过于频繁', '操作频繁', '请求过于频繁', '请稍后再试')
+
+# 文章不可访问页面的提示文字，按原因分类（顺序即匹配优先级）
+UNAVAILABLE_MARKERS = (
+    ('deleted', ('该内容已被发布者删除', '此内容已被发布者删除', '内容已删除')),
+    ('blocked', ('此内容因违规无法查看', '涉嫌违反相关法律法规和政策', '此内容被投诉且经审核', '帐号已被屏蔽', '账号已被屏蔽')),
+    ('captcha', ('环境异常', '完成验证后即可继续访问', '请在微信客户端打开链接')),
+    ('not_found', ('参数错误', '页面不存在', '链接已过期')),
+)
+
+# 页面状态检测脚本：正文标题出现时返回 _PAGE_STATE_ARTICLE，否则返回页面可见文字（用于匹配提示文字）
+_PAGE_STATE_SCRIPT = """
+    if (document.querySelector('#activity-name, .rich_media_title, #js_title, h1')) { return '__article__'; }
+    return document.body ? document.body.innerText.slice(0, 2000) : null;
+"""
+
+# _PAGE_STATE_SCRIPT 找到文章标题时的返回值（与页面文字区分，空白页面不会被当作文章）
+_PAGE_STATE_ARTICLE = '__article__'
+
+
+# 页面内一次性提取文章的脚本：选择器与 _extract_article_content 的旧实现一致，
+# 正文文本通过遍历文本节点得到（跳过script/style，每段去除首尾空白后以换行连接），
+# 与 BeautifulSoup 的 get_text(separator='\n', strip=True) 结果一致，避免在Python中重新解析HTML
+_EXTRACT_ARTICLE_SCRIPT = """
+    function firstText(selectors, fallback) {
+        for (var i = 0; i < selectors.length; i++) {
+            var el = document.querySelector(selectors[i]);
+            var text = el ? (el.innerText || '').trim() : '';
+            if (text) { return text; }
+        }
+        return fallback;
+    }
+    function firstElement(selectors) {
+        for (var i = 0; i < selectors.length; i++) {
+            var el = document.querySelector(selectors[i]);
+            if (el) { return el; }
+        }
+        return null;
+    }
+
+    var result = {
+        title: firstText(['#activity-name', '.rich_media_title', '#js_title', 'h1', "[class*='title']"], '未知标题'),
+        author: firstText(['#js_name', '.rich_media_meta_text', "[class*='author']", "[id*='author']"], '未知作者'),
+        publish_time: firstText(['#publish_time', '.rich_media_meta_text', "[class*='time']", "[id*='time']"], '未知时间'),
+        url: location.href,
+        found: false
+    };
+
+    var content = firstElement(['#js_content', '.rich_media_content', "[class*='content']", 'article']);
+    if (!content) { return result; }
+    result.found = true;
+    result.content_html = content.innerHTML;
+
+    var parts = [];
+    var walker = document.createTreeWalker(content, NodeFilter.SHOW_TEXT, {
+        acceptNode: function (node) {
+            for (var p = node.parentNode; p && p !== content; p = p.parentNode) {
+                if (p.nodeName === 'SCRIPT' || p.nodeName === 'STYLE') { return NodeFilter.FILTER_REJECT; }
+            }
+            return NodeFilter.FILTER_ACCEPT;
+        }
+    });
+    while (walker.nextNode()) {
+        var text = walker.currentNode.nodeValue.trim();
+        if (text) { parts.push(text); }
+    }
+    result.content_text = parts.join('\n');
+
+    if (arguments[0]) {
+        var images = [];
+        var imgs = content.getElementsByTagName('img');
+        for (var i = 0; i < imgs.length; i++) {
+            images.push({
+                index: i + 1,
+                src: imgs[i].getAttribute('data-src') || imgs[i].getAttribute('src') || '',
+                alt: imgs[i].getAttribute('alt') || '',
+                title: imgs[i].getAttribute('title') || ''
+            });
+        }
+        result.images = images;
+    }
+    return result;
+"""
+
+# 正文提取方式：js（页面内一次性提取）或 legacy（innerHTML + html_to_text）
+EXTRACT_MODES = ('js', 'legacy')
+
+
+class ArticleUnavailableError(Exception):
+    """文章不可访问（已删除、违规屏蔽、需要验证或不存在），重试不会成功"""
+    
+    # 任务队列据此跳过重试
+    retriable = False
+    
+    def __init__(self, reason, url='', message=None):
+        """
+        :param reason: 原因：deleted、blocked、captcha、not_found
+        :param url: 文章URL
+        :param message: 页面提示文字
+        """
+        self.reason = reason
+        self.url = url
+        super().__init__(message or f"文章不可访问（{reason}）: {url}")
+
+
+class StageTimeoutError(Exception):
+    """爬取阶段超过时限，浏览器已被看门狗结束并需要重建"""
+    
+    reason = 'timeout'
+    retriable = True
+    
+    def __init__(self, stage, timeout):
+        """
+        :param stage: 阶段名称（见 DEFAULT_STAGE_TIMEOUTS）
+        :param timeout: 该阶段的时限（秒）
+        """
+        self.stage = stage
+        self.timeout = timeout
+        super().__init__(f"{stage} 阶段超过时限（{timeout}秒）")
+
+
+# 各阶段的时限（秒）。page_load、script 同时设置为WebDriver自身的超时，
+# 看门狗在时限后再宽限 WATCHDOG_GRACE 秒，仍未返回时结束浏览器进程树
+DEFAULT_STAGE_TIMEOUTS = {
+    'page_load': 30,   # driver.get
+    'script': 15,      # 单个脚本执行
+    'wait': None,      # 等待页面就绪，默认为 wait_time
+    'scroll': 20,      # 滚动加载懒加载内容的总时长
+    'extract': 30,     # 正文提取
+    'image': 20,       # 单张图片下载（含重试）
+    'images': 180,     # 一篇文章的全部图片
+}
+
+# 看门狗在阶段时限之后的宽限时间（秒），让WebDriver自身的超时先生效
+WATCHDOG_GRACE = 5
+
+# 滚动加载的最大次数，页面内容持续增长时也会停止
+MAX_SCROLL_STEPS = 15
+
+
+def kill_process_tree(pid):
+    """
+    结束进程及其全部子进程（chromedriver -> Chrome -> 渲染进程）
+    :param pid: 根进程ID
+    """
+    if psutil is not None:
+        try:
+            root = psutil.Process(pid)
+            processes = root.children(recursive=True) + [root]
+        except psutil.NoSuchProcess:
+            return
+        for process in processes:
+            try:
+                process.kill()
+            except psutil.NoSuchProcess:
+                pass
+        psutil.wait_procs(processes, timeout=5)
+        return
+    
+    if os.name == 'nt':
+        subprocess.run(['taskkill', '/F', '/T', '/PID', str(pid)], capture_output=True)
+        return
+    
+    # 先收集整棵进程树再结束，避免子进程被重新挂到init下后找不到
+    pids = [pid]
+    for parent in pids:
+        result = subprocess.run(['pgrep', '-P', str(parent)], capture_output=True, text=True)
+        pids.extend(int(child) for child in result.stdout.split())
+    for child in reversed(pids):
+        try:
+            os.kill(child, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+
+class Watchdog:
+    """
+    阶段时限看门狗
+    
+    爬取线程进入阶段时登记截止时间，后台线程在截止时间到达时调用 on_timeout
+    （结束浏览器进程树），阻塞在WebDriver调用上的爬取线程随即因连接断开返回，
+    离开阶段时抛出 StageTimeoutError。同一时间只监视一个阶段。
+    """
+    
+    def __init__(self, on_timeout):
+        """
+        :param on_timeout: 超时回调 on_timeout(阶段名称)，在看门狗线程中调用
+        """
+        self.on_timeout = on_timeout
+        self._condition = threading.Condition()
+        self._stage = None
+        self._deadline = None
+        self._fired = False
+        self._thread = None
+        self._idle = threading.Event()  # 超时回调执行期间清除
+        self._idle.set()
+    
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._deadline is None or self._deadline > time.monotonic():
+                    if self._deadline is None:
+                        self._condition.wait()
+                    else:
+                        self._condition.wait(self._deadline - time.monotonic())
+                stage, self._deadline, self._fired = self._stage, None, True
+                self._idle.clear()
+            # 在锁外结束进程，不阻塞阶段的进入和离开
+            logger.error(f"看门狗: {stage} 阶段超时，结束浏览器进程")
+            try:
+                self.on_timeout(stage)
+            except Exception as e:
+                logger.error(f"看门狗结束浏览器进程失败: {e}")
+            finally:
+                self._idle.set()
+    
+    @contextmanager
+    def stage(self, name, timeout, timings=None):
+        """
+        监视一个阶段
+        :param name: 阶段名称
+        :param timeout: 时限（秒），None 表示不监视
+        :param timings: 阶段耗时写入的字典
+        """
+        started = time.monotonic()
+        with self._condition:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="spider-watchdog", daemon=True)
+                self._thread.start()
+            self._stage = name
+            self._fired = False
+            self._deadline = started + timeout + WATCHDOG_GRACE if timeout else None
+            self._condition.notify()
+        try:
+            yield
+        except Exception:
+            if not self._fired:
+                raise
+        finally:
+            with self._condition:
+                fired = self._fired
+                self._stage = self._deadline = None
+                self._fired = False
+            if timings is not None:
+                timings[name] = round(time.monotonic() - started, 3)
+        # 被看门狗中断时，阶段内因连接断开抛出的异常统一转换为超时；
+        # 等待进程结束完成，避免下一阶段（重建浏览器）与之交错
+        if fired:
+            self._idle.wait()
+            raise StageTimeoutError(name, timeout)
+
+
+def classify_page_text(text):
+    """
+    根据页面文字判断文章不可访问的原因
+    :param text: 页面可见文字或HTML
+    :return: deleted、blocked、captcha、not_found 之一，未匹配时返回None
+    """
+    if not text:
+        return None
+    for reason, markers in UNAVAILABLE_MARKERS:
+        if any(marker in text for marker in markers):
+            return reason
+    return None
+
+
+class AdaptiveRateLimiter:
+    """
+    进程内共享的自适应限速器
+    
+    每个主机一个令牌桶，速率按AIMD调整：请求成功时速率加性增加，
+    遇到429、5xx或频率限制页面时速率减半并暂停该主机一段退避时间（指数退避加全抖动）。
+    浏览器访问和requests会话共用同一个限速器，因此不会因为多个驱动或会话并发而超出站点允许的速率。
+    """
+    
+    def __init__(self, initial_rate=1.0, min_rate=0.1, max_rate=5.0, burst=3,
+                 increase=0.1, decrease=0.5, base_backoff=1.0, max_backoff=60.0):
+        """
+        :param initial_rate: 每个主机的初始速率（请求/秒）
+        :param min_rate: 最低速率
+        :param max_rate: 最高速率
+        :param burst: 令牌桶容量（允许的突发请求数）
+        :param increase: 每次成功后增加的速率
+        :param decrease: 被限流后速率乘以的系数
+        :param base_backoff: 退避基准时间（秒）
+        :param max_backoff: 退避时间上限（秒）
+        """
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._hosts = {}
+        self._lock = threading.Lock()
+    
+    def _state(self, host):
+        """获取主机的限速状态（调用方持有锁）"""
+        state = self._hosts.get(host)
+        if state is None:
+            state = {
+                'rate': self.initial_rate,
+                'tokens': float(self.burst),
+                'updated': time.monotonic(),
+                'blocked_until': 0.0,
+                'throttles': 0
+            }
+            self._hosts[host] = state
+        return state
+    
+    def backoff_delay(self, attempt):
+        """
+        计算第 attempt 次重试前的退避时间（全抖动）
+        :param attempt: 重试序号，从0开始
+        """
+        return random.uniform(0, min(self.max_backoff, self.base_backoff * (2 ** attempt)))
+    
+    def acquire(self, host):
+        """
+        请求前获取令牌，必要时阻塞等待
+        :param host: 主机名
+        :return: 实际等待的秒数
+        """
+        wait = self.reserve(host)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+    
+    async def acquire_async(self, host):
+        """acquire 的协程版本，等待期间不阻塞事件循环"""
+        wait = self.reserve(host)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+    
+    def reserve(self, host):
+        """
+        预订一个令牌但不等待
+        :param host: 主机名
+        :return: 调用方发出请求前需要等待的秒数
+        """
+        with self._lock:
+            state = self._state(host)
+            now = time.monotonic()
+            state['tokens'] = min(self.burst, state['tokens'] + (now - state['updated']) * state['rate'])
+            state['updated'] = now
+            # 令牌可以透支，透支部分按当前速率折算为等待时间，保证并发请求依次排队
+            state['tokens'] -= 1
+            return max(state['blocked_until'] - now, -state['tokens'] / state['rate'], 0.0)
+    
+    def report(self, host, throttled=False, retry_after=None):
+        """
+        回报请求结果，调整主机速率
+        :param host: 主机名
+        :param throttled: 是否被限流（429、5xx或频率限制页面）
+        :param retry_after: 服务器要求的等待秒数（Retry-After）
+        :return: 被限流时该主机的暂停秒数，否则为0
+        """
+        with self._lock:
+            state = self._state(host)
+            if not throttled:
+                state['rate'] = min(self.max_rate, state['rate'] + self.increase)
+                state['throttles'] = 0
+                return 0.0
+            
+            state['rate'] = max(self.min_rate, state['rate'] * self.decrease)
+            state['tokens'] = min(state['tokens'], 0.0)
+            delay = self.backoff_delay(state['throttles'])
+            if retry_after:
+                delay = max(delay, retry_after)
+            state['throttles'] += 1
+            state['blocked_until'] = max(state['blocked_until'], time.monotonic() + delay)
+            rate = state['rate']
+        logger.warning(f"{host} 触发限流，速率降至 {rate:.2f} 次/秒，暂停 {delay:.1f} 秒")
+        return delay
+    
+    def get_rates(self):
+        """获取各主机当前速率（请求/秒）"""
+        with self._lock:
+            return {host: round(state['rate'], 3) for host, state in self._hosts.items()}
+
+
+# 进程内所有爬虫实例共用的限速器
+rate_limiter = AdaptiveRateLimiter()
+
+
+def _parse_retry_after(value):
+    """解析 Retry-After 头（只支持秒数格式）"""
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+class RateLimitedSession(requests.Session):
+    """经过共享限速器的requests会话，429和5xx响应按退避时间自动重试"""
+    
+    def __init__(self, limiter=None, max_retries=3):
+        """
+        :param limiter: 限速器，默认使用进程共享的 rate_limiter
+        :param max_retries: 被限流时的最大重试次数
+        """
+        super().__init__()
+        self.limiter = limiter or rate_limiter
+        self.max_retries = max_retries
+    
+    def request(self, method, url, *args, **kwargs):
+        host = urlparse(url).hostname or ''
+        attempt = 0
+        while True:
+            self.limiter.acquire(host)
+            response = super().request(method, url, *args, **kwargs)
+            throttled = response.status_code == 429 or response.status_code >= 500
+            self.limiter.report(
+                host, throttled=throttled,
+                retry_after=_parse_retry_after(response.headers.get('Retry-After')) if throttled else None
+            )
+            if not throttled or attempt >= self.max_retries:
+                return response
+            # 退避等待在下一次 acquire 中完成
+            response.close()
+            attempt += 1
+            logger.info(f"请求被限流（HTTP {response.status_code}），第 {attempt} 次重试: {url}")
+
+
+# 图片保存默认设置：
+# max_width/max_height 最大宽高（像素，None表示不限制），format 保存格式（png/jpeg/webp），
+# quality JPEG/WebP质量，thumbnail_size 缩略图最长边（像素，None表示不生成）
+DEFAULT_IMAGE_OPTIONS = {
+    'max_width': None,
+    'max_height': None,
+    'format': 'png',
+    'quality': 85,
+    'thumbnail_size': None
+}
+
+# 保存格式对应的文件扩展名
+IMAGE_EXTENSIONS = {'PNG': 'png', 'JPEG': 'jpg', 'WEBP': 'webp'}
+
+
+def normalize_image_options(image_options=None):
+    """
+    合并并校验图片保存设置
+    :param image_options: 部分设置，未提供的键使用默认值
+    :return: 完整设置字典
+    """
+    options = dict(DEFAULT_IMAGE_OPTIONS)
+    for key, value in (image_options or {}).items():
+        if key not in options:
+            raise ValueError(f"未知的图片设置: {key}")
+        options[key] = value
+    
+    image_format = str(options['format']).upper()
+    if image_format == 'JPG':
+        image_format = 'JPEG'
+    if image_format not in IMAGE_EXTENSIONS:
+        raise ValueError(f"不支持的图片格式: {options['format']}，可选: png、jpeg、webp")
+    options['format'] = image_format.lower()
+    return options
+
+
+# Image.reduce() 支持的模式；调色板（GIF、调色板PNG）、二值和16位灰度图片需先转换
+_REDUCIBLE_MODES = frozenset(('L', 'LA', 'RGB', 'RGBA', 'RGBX', 'RGBa', 'La', 'CMYK', 'YCbCr', 'I', 'F'))
+
+
+def _decode_image_reduced(img, max_width=None, max_height=None):
+    """
+    按最大宽高解码图片，尽量避免全尺寸解码
+    
+    JPEG使用 draft() 让解码器直接按1/2、1/4、1/8比例解码；
+    其他格式先用 reduce() 做整数倍缩小，最后统一用 thumbnail() 缩放到目标尺寸以内。
+    :param img: 刚打开（尚未解码）的PIL图片
+    :param max_width: 最大宽度，None表示不限制
+    :param max_height: 最大高度，None表示不限制
+    :return: 缩放后的图片
+    """
+    width, height = img.size
+    scale = min(
+        max_width / width if max_width else 1.0,
+        max_height / height if max_height else 1.0
+    )
+    if scale >= 1.0:
+        return img
+    
+    target = (max(1, round(width * scale)), max(1, round(height * scale)))
+    if img.format == 'JPEG':
+        # draft 选择不小于目标尺寸的最小缩放比例，解码时即完成缩小
+        img.draft(img.mode, target)
+    else:
+        if img.mode not in _REDUCIBLE_MODES:
+            # 与保存时的转换一致：调色板图片保留透明度，其他转换为RGB
+            img = img.convert('RGBA' if img.mode in ('P', 'PA') else 'RGB')
+        factor = min(width // target[0], height // target[1])
+        if factor >= 2:
+            img = img.reduce(factor)
+    
+    img.thumbnail(target, Image.LANCZOS)
+    return img
+
+
+def _flatten_to_rgb(img):
+    """将图片转换为RGB，透明部分填充白色背景"""
+    if img.mode in ('RGBA', 'LA', 'P'):
+        img = img.convert('RGBA')
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel('A'))
+        return background
+    return img.convert('RGB')
+
+
+# 提取正文文本时跳过的标签
+_SKIPPED_TEXT_TAGS = frozenset(('script', 'style'))
+
+# lxml 与 html.parser 解析结果不同的内容，遇到时交给BeautifulSoup以保证输出一致：
+# CDATA、以 --!> 结束的注释、回车符（lxml会规范化换行），以及lxml按原始文本解析、
+# html.parser按普通标签解析的元素（textarea、xmp、iframe、plaintext等）和template
+_LXML_UNSAFE_RE = re.compile(
+    r'<!\[CDATA\[|--!>|\r|<(?:textarea|xmp|iframe|plaintext|noembed|noframes|template)\b',
+    re.IGNORECASE
+)
+
+
+def _html_to_text_bs4(html):
+    """BeautifulSoup 提取正文文本（原实现）"""
+    soup = BeautifulSoup(html, 'html.parser')
+    
+    # 移除脚本和样式标签
+    for script in soup(["script", "style"]):
+        script.decompose()
+    
+    return soup.get_text(separator='\n', strip=True)
+
+
+def _html_to_text_lxml(html):
+    """
+    lxml 提取正文文本，输出与 _html_to_text_bs4 相同
+    按文档顺序收集元素文本和尾随文本，跳过script/style的内容以及注释、处理指令本身的文字。
+    解析时有任何错误（标签不匹配、嵌套超过深度限制等）都改用BeautifulSoup：
+    libxml2 会按自己的规则修正甚至截断文档树，且不抛出异常，结果与 html.parser 不同
+    """
+    if _LXML_UNSAFE_RE.search(html):
+        return _html_to_text_bs4(html)
+    
+    # 解析器记录本次解析的错误，每次调用单独创建，不在线程间共享
+    parser = lxml_html.HTMLParser()
+    root = lxml_html.fragment_fromstring(html, create_parent='div', parser=parser)
+    if len(parser.error_log):
+        return _html_to_text_bs4(html)
+    parts = []
+    
+    def collect(element):
+        # 超过256层嵌套时解析器会报错并已改用BeautifulSoup，递归不会超出Python的递归限制
+        if element.text:
+            text = element.text.strip()
+            if text:
+                parts.append(text)
+        for child in element:
+            if isinstance(child.tag, str) and child.tag not in _SKIPPED_TEXT_TAGS:
+                collect(child)
+            if child.tail:
+                text = child.tail.strip()
+                if text:
+                    parts.append(text)
+    
+    collect(root)
+    return '\n'.join(parts)
+
+
+# 可用的正文文本提取器，html_to_text 默认使用第一个
+TEXT_EXTRACTORS = {}
+if lxml_html is not None:
+    TEXT_EXTRACTORS['lxml'] = _html_to_text_lxml
+TEXT_EXTRACTORS['bs4'] = _html_to_text_bs4
+
+
+def html_to_text(html, backend=None):
+    """
+    将正文HTML转换为纯文本，结果与 BeautifulSoup 的 get_text(separator='\n', strip=True) 一致
+    :param html: 正文HTML
+    :param backend: 提取器名称（见 TEXT_EXTRACTORS），默认优先使用lxml
+    :return: 纯文本
+    """
+    if not html or not html.strip():
+        return ''
+    
+    name = backend or next(iter(TEXT_EXTRACTORS))
+    if name not in TEXT_EXTRACTORS:
+        raise ValueError(f"不可用的文本提取器: {name}，可选: {', '.join(TEXT_EXTRACTORS)}")
+    
+    try:
+        return TEXT_EXTRACTORS[name](html)
+    except Exception as e:
+        if name == 'bs4':
+            raise
+        logger.warning(f"{name} 提取正文文本失败，改用BeautifulSoup: {e}")
+        return _html_to_text_bs4(html)
+
+
+# 保存时可压缩到单独文件的大字段；JSON中改为记录 <字段>_file（相对文章目录的文件名）
+COMPRESSIBLE_FIELDS = ('content_html',)
+
+# 压缩方式及对应的文件扩展名
+COMPRESSION_EXTENSIONS = {'gzip': '.gz', 'zstd': '.zst'}
+
+
+@contextmanager
+def atomic_write(path, mode='w'):
+    """
+    先写同目录下的临时文件，完成后原子替换目标文件，中途失败不会留下截断的文件
+    :param path: 目标文件路径
+    :param mode: 写入模式，'w'（UTF-8文本）或 'wb'
+    """
+    # 临时文件名带线程ID，后台图片线程与爬取线程同时重写同一篇文章时互不干扰
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    f = open(temp_path, mode, encoding=None if 'b' in mode else 'utf-8')
+    try:
+        yield f
+        f.close()
+        os.replace(temp_path, path)
+    except BaseException:
+        f.close()
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def compress_bytes(data, codec):
+    """
+    按指定方式压缩数据
+    :param data: 原始字节
+    :param codec: gzip 或 zstd
+    """
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+# Markdown 导出时每次送入解析器的HTML长度
+MARKDOWN_FEED_CHUNK = 64 * 1024
+
+# Markdown 文本中需要转义的字符
+_MARKDOWN_ESCAPE_RE = re.compile(r'([\\`*_\[\]])')
+
+# 行首会被解析为块结构的文字：标题、引用、无序列表、有序列表（1. 或 1)）、分隔线/Setext标题下划线
+_MARKDOWN_LINE_START_RE = re.compile(r'^(?:([#>+=-])|(\d+)([.)]))')
+
+
+def _escape_markdown(text):
+    """转义Markdown特殊字符"""
+    return _MARKDOWN_ESCAPE_RE.sub(r'\\\1', text)
+
+
+def _escape_line_start(line):
+    """转义行首会被当作标题、引用、列表等块结构的文字"""
+    match = _MARKDOWN_LINE_START_RE.match(line)
+    if not match:
+        return line
+    if match.group(1):
+        return '\\' + line
+    return match.group(2) + '\\' + line[len(match.group(2)):]
+
+
+class MarkdownWriter(HTMLParser):
+    """
+    流式将正文HTML转换为Markdown
+    逐个标签处理，每个块（段落、标题、列表项等）结束时立即写出，内存占用只与当前块的大小有关。
+    保留标题、段落、列表、引用、代码块、粗体/斜体和链接；第N个 <img> 对应 images 中 index 为N的图片
+    （与提取图片信息时的顺序一致），已下载的图片引用本地文件。
+    """
+    
+    BLOCK_TAGS = frozenset((
+        'p', 'div', 'section', 'article', 'header', 'footer', 'figure', 'figcaption',
+        'center', 'table', 'tr', 'dl', 'dt', 'dd'
+    ))
+    HEADING_TAGS = {'h1': 1, 'h2': 2, 'h3': 3, 'h4': 4, 'h5': 5, 'h6': 6}
+    LIST_TAGS = frozenset(('ul', 'ol'))
+    EMPHASIS_TAGS = {'strong': '**', 'b': '**', 'em': '*', 'i': '*'}
+    
+    def __init__(self, out, images=None, base_dir=None):
+        """
+        :param out: 已打开的文本文件对象
+        :param images: 图片信息列表（见 _build_images_info）
+        :param base_dir: Markdown文件所在目录，本地图片路径相对于此目录
+        """
+        super().__init__(convert_charrefs=True)
+        self.out = out
+        self.base_dir = base_dir
+        self._images = {img['index']: img for img in images or []}
+        self._image_count = 0
+        self._inline = []       # 当前块的行内内容
+        self._open_marks = []   # 未闭合的行内标记 (标签, 结束标记, 开始位置)
+        self._lists = []        # 嵌套列表 [标签, 已有列表项数量, 当前列表项标记宽度]
+        self._item_marker = None  # 当前列表项尚未写出的标记
+        self._heading = 0
+        self._quote = 0
+        self._pre = 0
+        self._skip = 0
+        self._last_block = None  # 上一个写出的块类型，用于决定块之间的空行
+        self._last_quote = 0
+    
+    def write_html(self, html):
+        """分段送入HTML并写出全部内容"""
+        for start in range(0, len(html), MARKDOWN_FEED_CHUNK):
+            self.feed(html[start:start + MARKDOWN_FEED_CHUNK])
+        self.close()
+    
+    def close(self):
+        super().close()
+        self._flush()
+    
+    def _emit(self, text, kind):
+        """写出一个块，块之间空一行，同一列表中的列表项之间不空行"""
+        if self._last_block is not None:
+            if kind == 'item' and self._last_block == 'item':
+                self.out.write('\n')
+            elif self._quote and self._quote == self._last_quote:
+                # 同一引用中的空行也要带引用标记，否则引用会被拆开
+                self.out.write('\n' + ('> ' * self._quote).rstrip() + '\n')
+            else:
+                self.out.write('\n\n')
+        self.out.write(text)
+        self._last_block = kind
+        self._last_quote = self._quote
+    
+    def _flush(self):
+        """写出当前块"""
+        text = ''.join(self._inline)
+        self._inline = []
+        self._open_marks = []
+        lines = [re.sub(r' {2,}', ' ', line).strip() for line in text.split('\n')]
+        lines = [_escape_line_start(line) for line in lines if line]
+        if not lines:
+            return
+        
+        quote = '> ' * self._quote
+        if self._heading:
+            self._emit(f"{quote}{'#' * self._heading} {' '.join(lines)}", 'heading')
+            return
+        
+        if self._lists:
+            # 嵌套列表缩进到外层列表项内容的起始列；列表项内的后续段落同样按标记宽度缩进
+            indent = ''.join(' ' * outer[2] for outer in self._lists[:-1])
+            marker = self._item_marker or ''
+            self._item_marker = None
+            continuation = quote + indent + ' ' * self._lists[-1][2]
+            first = quote + indent + marker
+            # 列表项内的第二个段落需要与上一行空开
+            kind = 'item' if marker else 'item_paragraph'
+            self._emit(first + ('  \n' + continuation).join(lines) if marker
+                       else continuation + ('  \n' + continuation).join(lines), kind)
+            return
+        
+        self._emit(quote + ('  \n' + quote).join(lines), 'paragraph')
+    
+    def _add(self, text):
+        self._inline.append(text)
+    
+    def _image_markdown(self, attrs):
+        """生成第N张图片的Markdown，优先引用已下载的本地文件"""
+        self._image_count += 1
+        img_info = self._images.get(self._image_count)
+        alt = (img_info or {}).get('alt') or attrs.get('alt') or f"图片_{self._image_count}"
+        if img_info and img_info.get('download_success') and img_info.get('local_path'):
+            path = img_info['local_path']
+            if self.base_dir:
+                path = os.path.relpath(path, self.base_dir)
+            path = path.replace(os.sep, '/')
+        elif img_info:
+            path = img_info['url']
+        else:
+            path = attrs.get('data-src') or attrs.get('src') or ''
+        if not path:
+            return ''
+        return f"![{_escape_markdown(alt)}](<{path}>)"
+    
+    def handle_starttag(self, tag, attrs):
+        if tag in ('script', 'style'):
+            self._skip += 1
+            return
+        if self._skip:
+            return
+        attrs = dict((name, value or '') for name, value in attrs)
+        
+        if tag == 'img':
+            self._add(self._image_markdown(attrs))
+        elif self._pre:
+            return
+        elif tag == 'br':
+            self._add('\n')
+        elif tag in self.BLOCK_TAGS:
+            self._flush()
+        elif tag in self.HEADING_TAGS:
+            self._flush()
+            self._heading = self.HEADING_TAGS[tag]
+        elif tag in self.LIST_TAGS:
+            self._flush()
+            self._lists.append([tag, 0, 0])
+        elif tag == 'li':
+            self._flush()
+            if not self._lists:
+                self._lists.append(['ul', 0, 0])
+            current = self._lists[-1]
+            current[1] += 1
+            self._item_marker = f"{current[1]}. " if current[0] == 'ol' else '- '
+            current[2] = len(self._item_marker)
+        elif tag == 'blockquote':
+            self._flush()
+            self._quote += 1
+        elif tag == 'pre':
+            self._flush()
+            self._pre += 1
+        elif tag == 'hr':
+            self._flush()
+            self._emit('---', 'rule')
+        elif tag in self.EMPHASIS_TAGS:
+            mark = self.EMPHASIS_TAGS[tag]
+            self._open_marks.append((tag, mark, len(self._inline)))
+            self._add(mark)
+        elif tag == 'a' and attrs.get('href', '').startswith(('http://', 'https://')):
+            self._open_marks.append((tag, f"](<{attrs['href']}>)", len(self._inline)))
+            self._add('[')
+        elif tag == 'code':
+            self._open_marks.append((tag, '`', len(self._inline)))
+            self._add('`')
+        elif tag in ('td', 'th'):
+            self._add(' ')
+    
+    def handle_startendtag(self, tag, attrs):
+        # <br/>、<img/> 等自闭合写法不产生结束标签
+        self.handle_starttag(tag, attrs)
+        if tag not in ('br', 'img', 'hr'):
+            self.handle_endtag(tag)
+    
+    def handle_endtag(self, tag):
+        if tag in ('script', 'style'):
+            self._skip = max(0, self._skip - 1)
+            return
+        if self._skip:
+            return
+        
+        if tag == 'pre' and self._pre:
+            self._pre -= 1
+            code = ''.join(self._inline).strip('\n')
+            self._inline = []
+            if code.strip():
+                quote = '> ' * self._quote
+                lines = ['```'] + code.split('\n') + ['```']
+                self._emit('\n'.join(quote + line for line in lines), 'code')
+        elif self._pre:
+            return
+        elif tag in self.BLOCK_TAGS or tag in ('li', 'dt', 'dd'):
+            self._flush()
+        elif tag in self.HEADING_TAGS:
+            self._flush()
+            self._heading = 0
+        elif tag in self.LIST_TAGS:
+            self._flush()
+            if self._lists:
+                self._lists.pop()
+        elif tag == 'blockquote':
+            self._flush()
+            self._quote = max(0, self._quote - 1)
+        else:
+            self._close_mark(tag)
+    
+    def _close_mark(self, tag):
+        """闭合行内标记，标记内没有文字时一并移除"""
+        for i in range(len(self._open_marks) - 1, -1, -1):
+            if self._open_marks[i][0] != tag:
+                continue
+            _, mark, start = self._open_marks.pop(i)
+            if start >= len(self._inline):
+                return
+            if ''.join(self._inline[start + 1:]).strip():
+                # 保持标记紧贴文字，标记内首尾的空白移到标记外
+                content = ''.join(self._inline[start + 1:])
+                opening = self._inline[start]
+                self._inline[start:] = [
+                    content[:len(content) - len(content.lstrip())],
+                    opening, content.strip(), mark,
+                    content[len(content.rstrip()):]
+                ]
+            else:
+                self._inline[start] = ''
+            return
+    
+    def handle_data(self, data):
+        if self._skip:
+            return
+        if self._pre:
+            self._add(data)
+            return
+        # 合并空白（包括&nbsp;）
+        self._add(_escape_markdown(re.sub(r'\s+', ' ', data)))
+
+
+def write_article_markdown(article_data, path):
+    """
+    将文章流式写出为Markdown文件
+    :param article_data: 文章数据（图片信息中已下载的图片引用本地文件）
+    :param path: Markdown文件路径
+    """
+    with atomic_write(path) as f:
+        f.write(f"# {article_data.get('title', '')}\n\n")
+        for label, key in (('作者', 'author'), ('发布时间', 'publish_time'), ('链接', 'url')):
+            if article_data.get(key):
+                f.write(f"> {label}: {article_data[key]}  \n")
+        f.write(f"> 抓取时间: {article_data.get('crawl_time', '')}\n\n")
+        
+        writer = MarkdownWriter(f, article_data.get('images'), os.path.dirname(path))
+        if article_data.get('content_html'):
+            writer.write_html(article_data['content_html'])
+        else:
+            # 没有正文HTML时按行输出纯文本
+            for line in article_data.get('content_text', '').split('\n'):
+                writer.handle_starttag('p', [])
+                writer.handle_data(line)
+                writer.handle_endtag('p')
+            writer.close()
+        f.write('\n')
+
+
+def _in_event_loop():
+    """当前线程是否有正在运行的事件循环"""
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+class AsyncHttpClient:
+    """
+    基于httpx的异步HTTP客户端
+    
+    同一主机的请求复用连接池；安装 h2 时使用HTTP/2，多个下载在同一连接上并发复用。
+    请求同样经过共享限速器，429和5xx响应按退避时间重试。
+    客户端绑定到创建它的事件循环，应在 async with 块中使用。
+    """
+    
+    def __init__(self, headers=None, max_connections=16, max_keepalive_connections=8,
+                 keepalive_expiry=30.0, concurrency=8, timeout=30.0, limiter=None, max_retries=3):
+        """
+        :param headers: 默认请求头
+        :param max_connections: 连接池最大连接数
+        :param max_keepalive_connections: 最多保持的空闲连接数
+        :param keepalive_expiry: 空闲连接保持时间（秒）
+        :param concurrency: 同时进行的请求数量
+        :param timeout: 单个请求超时时间（秒）
+        :param limiter: 限速器，默认使用进程共享的 rate_limiter
+        :param max_retries: 被限流时的最大重试次数
+        """
+        if httpx is None:
+            raise RuntimeError("未安装httpx，无法使用异步HTTP客户端")
+        self.limiter = limiter or rate_limiter
+        self.max_retries = max_retries
+        self.concurrency = concurrency
+        self._semaphore = None
+        self._client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            headers=headers,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry
+            ),
+            timeout=httpx.Timeout(timeout, connect=10.0),
+            follow_redirects=True
+        )
+    
+    async def __aenter__(self):
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+    
+    async def aclose(self):
+        """关闭连接池"""
+        await self._client.aclose()
+    
+    async def get(self, url, **kwargs):
+        """
+        发送GET请求（经过限速器，被限流时自动重试）
+        :param url: 请求URL
+        :return: httpx.Response，内容已读取
+        """
+        host = urlparse(url).hostname or ''
+        attempt = 0
+        while True:
+            await self.limiter.acquire_async(host)
+            async with self._semaphore:
+                response = await self._client.get(url, **kwargs)
+            throttled = response.status_code == 429 or response.status_code >= 500
+            self.limiter.report(
+                host, throttled=throttled,
+                retry_after=_parse_retry_after(response.headers.get('Retry-After')) if throttled else None
+            )
+            if not throttled or attempt >= self.max_retries:
+                return response
+            attempt += 1
+            logger.info(f"请求被限流（HTTP {response.status_code}），第 {attempt} 次重试: {url}")
+    
+    async def fetch_bytes(self, url):
+        """
+        下载URL内容
+        :param url: 请求URL
+        :return: 响应内容，HTTP错误时抛出异常
+        """
+        response = await self.get(url)
+        response.raise_for_status()
+        return response.content
+
+
 class WeixinSpiderWithImages:
-    def __init__(self, headless=True, wait_time=10, download_images=True):
+    def __init__(self, headless=True, wait_time=10, download_images=True, async_http=True, image_options=None,
+                 page_load_strategy='normal', single_process=True, extract_mode='js',
+                 compact_json=True, compression=None, stage_timeouts=None, browser=True):
         """
         初始化爬虫
         :param headless: 是否使用无头模式
         :param wait_time: 页面等待时间
         :param download_images: 是否下载图片
+        :param async_http: 安装httpx时是否使用异步客户端并发下载图片
+        :param image_options: 图片保存设置，可选键见 DEFAULT_IMAGE_OPTIONS
+        :param page_load_strategy: 页面加载策略（normal/eager/none），多标签页并发时使用none
+        :param single_process: 是否以单进程模式启动Chrome；多标签页并发时需关闭，
+                               使每个标签页有独立的渲染进程，单个标签页崩溃不影响其他标签页
+        :param extract_mode: 正文提取方式，js 在页面内一次性提取，legacy 取 innerHTML 后在Python中提取文本
+        :param compact_json: 是否以紧凑格式（无缩进）保存文章JSON
+        :param compression: 大字段（见 COMPRESSIBLE_FIELDS）单独压缩保存的方式，gzip、zstd 或 None（直接保存在JSON中）；
+                            压缩后JSON中只有 <字段>_file，需通过 storage.load_article_file 读取
+        :param stage_timeouts: 各阶段时限（秒），覆盖 DEFAULT_STAGE_TIMEOUTS 中的对应项，None 表示不限制
+        :param browser: 是否启动浏览器；只下载图片、写文章文件的实例（如后台补充下载图片）传入False
         """
+        if extract_mode not in EXTRACT_MODES:
+            raise ValueError(f"不支持的提取方式: {extract_mode}，可选: {', '.join(EXTRACT_MODES)}")
+        if compression is not None and compression not in COMPRESSION_EXTENSIONS:
+            raise ValueError(f"不支持的压缩方式: {compression}，可选: {', '.join(COMPRESSION_EXTENSIONS)}")
+        if compression == 'zstd' and zstandard is None:
+            logger.warning("未安装zstandard，改用gzip压缩")
+            compression = 'gzip'
+        unknown_stages = set(stage_timeouts or {}) - set(DEFAULT_STAGE_TIMEOUTS)
+        if unknown_stages:
+            raise ValueError(f"未知的阶段: {', '.join(sorted(unknown_stages))}，可选: {', '.join(DEFAULT_STAGE_TIMEOUTS)}")
         self.driver = None
+        self.headless = headless
         self.wait_time = wait_time
         self.download_images = download_images
-        self.session = requests.Session()
+        self.async_http = async_http
+        self.image_options = normalize_image_options(image_options)
+        self.page_load_strategy = page_load_strategy
+        self.single_process = single_process
+        self.extract_mode = extract_mode
+        self.compact_json = compact_json
+        self.compression = compression
+        self.stage_timeouts = {**DEFAULT_STAGE_TIMEOUTS, **(stage_timeouts or {})}
+        if self.stage_timeouts['wait'] is None:
+            self.stage_timeouts['wait'] = wait_time
+        self.watchdog = Watchdog(self._kill_browser)
+        self.session = RateLimitedSession()
         self.setup_session()
-        self.setup_driver(headless)
+        if browser:
+            self.setup_driver(headless)
         
     def setup_session(self):
         """设置requests会话"""
@@ -129,7 +1267,8 @@ class WeixinSpiderWithImages:
             options.add_argument('--disable-blink-features=AutomationControlled')
             
             # 解决渲染器连接问题的关键参数
-            options.add_argument('--single-process')  # 使用单进程模式
+            if self.single_process:
+                options.add_argument('--single-process')  # 使用单进程模式
             options.add_argument('--disable-gpu-sandbox')
             options.add_argument('--disable-software-rasterizer')
             options.add_argument('--remote-debugging-port=0')  # 禁用远程调试端口
@@ -157,6 +1296,7 @@ class WeixinSpiderWithImages:
                 "profile.managed_default_content_settings.images": 2 if not self.download_images else 1
             }
             options.add_experimental_option("prefs", prefs)
+            options.page_load_strategy = self.page_load_strategy
             
             # 优先尝试使用系统ChromeDriver
             try:
@@ -203,6 +1343,15 @@ class WeixinSpiderWithImages:
             except Exception as window_error:
                 logger.warning(f"设置窗口大小失败: {window_error}")
             
+            # WebDriver自身的页面加载和脚本超时，看门狗只处理浏览器不再响应的情况
+            try:
+                if self.stage_timeouts['page_load']:
+                    self.driver.set_page_load_timeout(self.stage_timeouts['page_load'])
+                if self.stage_timeouts['script']:
+                    self.driver.set_script_timeout(self.stage_timeouts['script'])
+            except Exception as timeout_error:
+                logger.warning(f"设置超时失败: {timeout_error}")
+            
             logger.info("Chrome浏览器驱动设置完成")
             
         except Exception as e:
@@ -212,63 +1361,160 @@ class WeixinSpiderWithImages:
             raise RuntimeError(f"无法初始化Chrome浏览器驱动: {e}")
     
     def crawl_article_by_url(self, url, retry_times=3):
-        """通过URL抓取文章内容，支持重试"""
+        """
+        通过URL抓取文章内容，支持重试
+        每个阶段受 stage_timeouts 时限约束，浏览器卡住时由看门狗结束并重建后重试；
+        各阶段耗时记录在返回数据的 timings 中
+        """
         if not self.driver:
             raise RuntimeError("浏览器驱动未初始化")
             
+        host = urlparse(url).hostname or ''
+        timeouts = self.stage_timeouts
+        timings = {'stages': {}, 'deadlines': dict(timeouts), 'timed_out': [], 'attempts': 0}
+        started = time.monotonic()
         for attempt in range(retry_times):
+            stages = timings['stages'] = {}
+            timings['attempts'] = attempt + 1
             try:
                 logger.info(f"第 {attempt + 1} 次尝试访问文章: {url}")
                 
-                # 访问页面
-                self.driver.get(url)
+                # 访问页面（与其他驱动、会话共用主机限速）
+                rate_limiter.acquire(host)
+                with self.watchdog.stage('page_load', timeouts['page_load'], stages):
+                    self._load_page(url)
                 
-                # 等待页面加载
-                wait = WebDriverWait(self.driver, self.wait_time)
+                # 等待文章标题加载，或识别出删除、屏蔽、验证等不可访问页面
+                with self.watchdog.stage('wait', timeouts['wait'], stages):
+                    wait = WebDriverWait(self.driver, timeouts['wait'])
+                    reason = wait.until(self._page_state)
+                if reason == 'rate_limited':
+                    raise RuntimeError("触发微信访问频率限制")
+                if reason != 'article':
+                    raise ArticleUnavailableError(reason, url)
                 
-                # 等待文章标题加载
-                try:
-                    title_element = wait.until(
-                        EC.presence_of_element_located((By.ID, "activity-name"))
-                    )
-                except:
-                    # 尝试其他可能的标题元素
-                    title_element = wait.until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, "h1, .rich_media_title, #js_title"))
-                    )
+                rate_limiter.report(host)
                 
                 # 滚动页面确保内容完全加载
-                self._scroll_page()
+                with self.watchdog.stage('scroll', timeouts['scroll'], stages):
+                    self._scroll_page()
                 
                 # 提取文章信息
-                article_data = self._extract_article_content()
+                with self.watchdog.stage('extract', timeouts['extract'], stages):
+                    article_data = self._extract_article_content()
                 
                 if article_data and article_data.get('title'):
                     logger.info(f"成功抓取文章: {article_data['title']}")
+                    timings['total'] = round(time.monotonic() - started, 3)
+                    article_data['timings'] = timings
                     return article_data
                 else:
                     logger.warning(f"第 {attempt + 1} 次尝试未能获取完整文章内容")
                     
+            except ArticleUnavailableError as e:
+                # 文章本身不可访问，重试只会再次等待超时
+                logger.warning(str(e))
+                raise
+            except StageTimeoutError as e:
+                # 浏览器已被看门狗结束，重建后再重试
+                logger.error(f"第 {attempt + 1} 次尝试超时: {e}")
+                timings['timed_out'].append(e.stage)
+                self._restart_driver()
+                if attempt == retry_times - 1:
+                    raise
             except Exception as e:
                 logger.error(f"第 {attempt + 1} 次尝试失败: {str(e)}")
                 if attempt == retry_times - 1:
                     raise
-                time.sleep(2)
+                if self._is_frequency_limited():
+                    # 降低主机速率并暂停，下一次 acquire 会等待退避结束
+                    rate_limiter.report(host, throttled=True)
+                else:
+                    time.sleep(rate_limiter.backoff_delay(attempt))
         
         raise Exception("所有重试都失败了")
     
+    def _load_page(self, url):
+        """
+        打开页面；超过页面加载时限时停止加载，使用已加载的内容
+        （文章正文通常先于图片等资源加载完成，是否可用由随后的等待阶段判断）
+        """
+        try:
+            self.driver.get(url)
+        except TimeoutException:
+            logger.warning(f"页面加载超过 {self.stage_timeouts['page_load']} 秒，停止加载: {url}")
+            self.driver.execute_script("window.stop();")
+    
+    def _kill_browser(self, stage=None):
+        """
+        结束chromedriver及其启动的Chrome进程树（看门狗超时回调）
+        :param stage: 超时的阶段名称
+        """
+        service = getattr(self.driver, 'service', None)
+        process = getattr(service, 'process', None)
+        if process is None:
+            return
+        logger.warning(f"结束浏览器进程树 (pid={process.pid})")
+        kill_process_tree(process.pid)
+    
+    def _restart_driver(self):
+        """结束当前浏览器并重新创建驱动"""
+        logger.info("正在重建浏览器驱动...")
+        self._kill_browser()
+        if self.driver:
+            try:
+                # 进程已结束，quit 只用于清理驱动对象和服务状态
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
+        self.setup_driver(self.headless)
+    
+    def _page_state(self, driver):
+        """
+        WebDriverWait 等待条件：判断页面是正常文章还是不可访问页面
+        :return: 'article'、不可访问原因、'rate_limited'，或None（继续等待）
+        """
+        text = driver.execute_script(_PAGE_STATE_SCRIPT)
+        if text == _PAGE_STATE_ARTICLE:
+            return 'article'
+        if not text or not text.strip():
+            # 页面仍在加载（没有body或body为空），继续等待
+            return None
+        reason = classify_page_text(text)
+        if reason is None and text and any(marker in text for marker in FREQUENCY_LIMIT_MARKERS):
+            return 'rate_limited'
+        return reason
+    
+    def _is_frequency_limited(self):
+        """检查当前页面是否为微信频率限制页面"""
+        try:
+            text = self.driver.execute_script("return document.body ? document.body.innerText : '';") or ''
+        except Exception:
+            return False
+        return any(marker in text for marker in FREQUENCY_LIMIT_MARKERS)
+    
     def _scroll_page(self):
-        """滚动页面以加载所有内容"""
+        """
+        滚动页面以加载所有内容
+        最多滚动 MAX_SCROLL_STEPS 次，且总时长不超过 scroll 阶段时限，避免无限加载的页面一直滚动
+        """
+        timeout = self.stage_timeouts['scroll']
+        deadline = time.monotonic() + timeout if timeout else None
         try:
             # 获取页面高度
             last_height = self.driver.execute_script("return document.body.scrollHeight")
             
-            while True:
+            for _ in range(MAX_SCROLL_STEPS):
                 # 滚动到页面底部
                 self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
                 
-                # 等待新内容加载
-                time.sleep(2)
+                # 等待新内容加载，不超过截止时间
+                pause = 2 if deadline is None else min(2, deadline - time.monotonic())
+                if pause <= 0:
+                    logger.info(f"滚动加载超过 {timeout} 秒，停止滚动")
+                    break
+                time.sleep(pause)
                 
                 # 计算新的页面高度
                 new_height = self.driver.execute_script("return document.body.scrollHeight")
@@ -277,6 +1523,8 @@ class WeixinSpiderWithImages:
                     break
                     
                 last_height = new_height
+            else:
+                logger.info(f"滚动加载达到最大次数 {MAX_SCROLL_STEPS}，停止滚动")
                 
             # 滚动回顶部
             self.driver.execute_script("window.scrollTo(0, 0);")
@@ -285,8 +1533,117 @@ class WeixinSpiderWithImages:
         except Exception as e:
             logger.warning(f"滚动页面时出错: {e}")
     
+    def collect_article_links(self, page_url):
+        """
+        打开公众号主页/合集页，收集其中的文章链接
+        :param page_url: 页面URL
+        :return: [{'url': 文章URL, 'title': 标题}]，按页面顺序
+        """
+        if not self.driver:
+            raise RuntimeError("浏览器驱动未初始化")
+        
+        rate_limiter.acquire(urlparse(page_url).hostname or '')
+        self.driver.get(page_url)
+        WebDriverWait(self.driver, self.wait_time).until(
+            lambda d: d.execute_script("return document.readyState") == "complete"
+        )
+        self._scroll_page()
+        
+        links = self.driver.execute_script("""
+            var result = [];
+            var nodes = document.querySelectorAll('a[href*="mp.weixin.qq.com/s"], [data-link*="mp.weixin.qq.com/s"]');
+            for (var i = 0; i < nodes.length; i++) {
+                var node = nodes[i];
+                var url = node.getAttribute('data-link') || node.href;
+                var title = node.getAttribute('data-title') || node.innerText || '';
+                result.push({url: url, title: title.trim()});
+            }
+            return result;
+        """) or []
+        
+        seen = set()
+        article_links = []
+        for link in links:
+            url = (link.get('url') or '').replace('http://', 'https://', 1)
+            if url.startswith('https://mp.weixin.qq.com/s') and url not in seen:
+                seen.add(url)
+                article_links.append({'url': url, 'title': link.get('title', '')})
+        
+        logger.info(f"页面中发现 {len(article_links)} 个文章链接: {page_url}")
+        return article_links
+    
     def _extract_article_content(self):
         """提取文章内容"""
+        if self.extract_mode == 'js':
+            try:
+                return self._extract_article_content_js()
+            except Exception as e:
+                logger.warning(f"页面内提取失败，改用逐元素提取: {e}")
+        return self._extract_article_content_legacy()
+    
+    def _extract_article_content_js(self):
+        """
+        在页面内一次性提取标题、作者、时间、正文HTML、正文文本和图片属性
+        只需一次WebDriver往返，正文文本直接由DOM得到，不再用BeautifulSoup重新解析
+        :return: 文章数据，格式与 _extract_article_content_legacy 相同
+        """
+        result = self.driver.execute_script(_EXTRACT_ARTICLE_SCRIPT, bool(self.download_images))
+        
+        article_data = {
+            'title': result['title'].strip(),
+            'author': result['author'].strip(),
+            'publish_time': result['publish_time'].strip()
+        }
+        logger.info(f"提取到标题: {article_data['title']}")
+        
+        if result.get('found'):
+            article_data['content_html'] = result['content_html']
+            article_data['content_text'] = result['content_text']
+            if self.download_images:
+                article_data['images'] = self._build_images_info(result['images'], result['url'])
+                logger.info(f"发现 {len(article_data['images'])} 张图片")
+            logger.info(f"提取到内容长度: {len(article_data['content_text'])} 字符")
+        else:
+            logger.warning("未能找到文章正文内容")
+            article_data['content_html'] = ""
+            article_data['content_text'] = ""
+            article_data['images'] = []
+        
+        article_data['url'] = result['url']
+        article_data['crawl_time'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        return article_data
+    
+    def _build_images_info(self, raw_images, page_url):
+        """
+        将页面内提取的图片属性整理为图片信息列表
+        :param raw_images: [{'index', 'src', 'alt', 'title'}]，src 优先取 data-src
+        :param page_url: 页面URL，用于补全相对地址
+        """
+        images_info = []
+        for raw in raw_images:
+            img_url = raw['src']
+            if not img_url:
+                continue
+            
+            # 处理相对URL
+            if img_url.startswith('//'):
+                img_url = 'https:' + img_url
+            elif img_url.startswith('/'):
+                img_url = urljoin(page_url, img_url)
+            
+            images_info.append({
+                'index': raw['index'],
+                'url': img_url,
+                'alt': raw['alt'] or f"图片_{raw['index']}",
+                'title': raw['title'],
+                'filename': None,  # 将在下载时设置
+                'local_path': None,  # 将在下载时设置
+                'download_success': False
+            })
+        return images_info
+    
+    def _extract_article_content_legacy(self):
+        """逐元素提取文章内容（innerHTML + html_to_text）"""
         try:
             article_data = {}
             
@@ -344,14 +1701,8 @@ class WeixinSpiderWithImages:
                     article_data['images'] = images_info
                     logger.info(f"发现 {len(images_info)} 张图片")
                 
-                # 使用BeautifulSoup解析HTML，提取纯文本
-                soup = BeautifulSoup(content_html, 'html.parser')
-                
-                # 移除脚本和样式标签
-                for script in soup(["script", "style"]):
-                    script.decompose()
-                
-                content_text = soup.get_text(separator='\n', strip=True)
+                # 解析HTML，提取纯文本（优先使用lxml）
+                content_text = html_to_text(content_html)
                 article_data['content_text'] = content_text
                 
                 logger.info(f"提取到内容长度: {len(content_text)} 字符")
@@ -449,49 +1800,119 @@ class WeixinSpiderWithImages:
                 return self._save_data_url_image_as_png(img_url, save_dir, filename_prefix)
             
             # 发送请求下载图片
-            response = self.session.get(img_url, timeout=30, stream=True)
-            response.raise_for_status()
+            image_data = self._fetch_image(img_url, self.stage_timeouts['image'])
             
-            # 生成PNG文件名（使用前缀，确保唯一性）
-            filename = f"{filename_prefix}.png"
-            filepath = os.path.join(save_dir, filename)
+            return self._save_image_bytes(image_data, save_dir, filename_prefix)
             
-            # 先保存原始文件到临时位置
-            temp_filepath = filepath + ".temp"
-            with open(temp_filepath, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-            
-            # 转换为PNG格式
-            try:
-                from PIL import Image
-                # 打开图片并转换为PNG
-                with Image.open(temp_filepath) as img:
-                    # 如果是RGBA模式，保持透明度；否则转换为RGB
-                    if img.mode in ('RGBA', 'LA', 'P'):
-                        img = img.convert('RGBA')
-                    else:
-                        img = img.convert('RGB')
-                    img.save(filepath, 'PNG')
+        except Exception as e:
+            logger.error(f"下载图片失败 {img_url}: {str(e)}")
+            return None, None
+    
+    def _fetch_image(self, img_url, timeout=None):
+        """
+        下载图片内容，整个下载不超过时限（requests 的超时只限制单次读取的间隔）
+        :param img_url: 图片URL
+        :param timeout: 时限（秒），None 表示只使用默认的30秒读取超时
+        :return: 图片原始字节
+        """
+        if not timeout:
+            response = self.session.get(img_url, timeout=30)
+            response.raise_for_status()
+            return response.content
+        
+        deadline = time.monotonic() + timeout
+        with self.session.get(img_url, timeout=(min(10, timeout), timeout), stream=True) as response:
+            response.raise_for_status()
+            # read1 返回已到达的数据，不等凑满整块，数据缓慢到达时也能及时检查截止时间；
+            # 旧版urllib3没有 read1，改用小块读取
+            raw = response.raw
+            read1 = getattr(raw, 'read1', None)
+            chunks = []
+            while True:
+                if read1 is not None:
+                    chunk = read1(64 * 1024, decode_content=True)
+                else:
+                    chunk = raw.read(4 * 1024, decode_content=True)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                if time.monotonic() > deadline:
+                    raise StageTimeoutError('image', timeout)
+        return b''.join(chunks)
+    
+    def _save_image_bytes(self, image_data, save_dir, filename_prefix="img"):
+        """
+        按图片设置缩放、转换格式并保存下载的图片，需要时生成缩略图
+        :param image_data: 图片原始字节
+        :param save_dir: 保存目录
+        :param filename_prefix: 文件名前缀
+        :return: (文件名, 文件路径)
+        """
+        options = self.image_options
+        image_format = options['format'].upper()
+        extension = IMAGE_EXTENSIONS[image_format]
+        
+        # 生成文件名（使用前缀，确保唯一性）
+        filename = f"{filename_prefix}.{extension}"
+        filepath = os.path.join(save_dir, filename)
+        
+        try:
+            with Image.open(io.BytesIO(image_data)) as img:
+                img = _decode_image_reduced(img, options['max_width'], options['max_height'])
                 
-                # 删除临时文件
-                os.remove(temp_filepath)
+                if image_format == 'JPEG':
+                    img = _flatten_to_rgb(img)
+                elif img.mode in ('RGBA', 'LA', 'P'):
+                    # 如果是RGBA模式，保持透明度；否则转换为RGB
+                    img = img.convert('RGBA')
+                else:
+                    img = img.convert('RGB')
                 
-                logger.info(f"图片下载并转换为PNG成功: {filename}")
-                return filename, filepath
+                # 默认的PNG保存方式保持不变；optimize 只用于JPEG
+                save_kwargs = {}
+                if image_format in ('JPEG', 'WEBP'):
+                    save_kwargs['quality'] = options['quality']
+                if image_format == 'JPEG':
+                    save_kwargs['optimize'] = True
+                img.save(filepath, image_format, **save_kwargs)
                 
-            except Exception as convert_error:
-                # 如果转换失败，保留原始文件但重命名为PNG
-                logger.warning(f"图片转换失败，保存原始文件: {str(convert_error)}")
-                os.rename(temp_filepath, filepath)
-                return filename, filepath
+                if options['thumbnail_size']:
+                    self._save_thumbnail(img, save_dir, filename_prefix)
             
-        except Exception as e:
-            logger.error(f"下载图片失败 {img_url}: {str(e)}")
-            return None, None
+            logger.info(f"图片保存成功: {filename}")
+            
+        except Exception as convert_error:
+            # 如果转换失败，保留原始数据
+            logger.warning(f"图片转换失败，保存原始文件: {str(convert_error)}")
+            with open(filepath, 'wb') as f:
+                f.write(image_data)
+        
+        return filename, filepath
+    
+    def _save_thumbnail(self, img, save_dir, filename_prefix):
+        """由已解码的图片生成JPEG缩略图，保存到 images/thumbs/<前缀>.jpg"""
+        size = self.image_options['thumbnail_size']
+        thumbnail = _flatten_to_rgb(img.copy())
+        thumbnail.thumbnail((size, size))
+        thumbs_dir = os.path.join(save_dir, "thumbs")
+        os.makedirs(thumbs_dir, exist_ok=True)
+        thumbnail.save(os.path.join(thumbs_dir, f"{filename_prefix}.jpg"), 'JPEG',
+                       quality=self.image_options['quality'], optimize=True)
+    
+    def _record_image_result(self, img_info, images_dir, filename, filepath):
+        """将单张图片的下载结果写回图片信息"""
+        if filename and filepath:
+            img_info['filename'] = filename
+            img_info['local_path'] = filepath
+            img_info['download_success'] = True
+            thumbnail_path = os.path.join(images_dir, "thumbs", f"img_{img_info['index']:03d}.jpg")
+            if self.image_options['thumbnail_size'] and os.path.exists(thumbnail_path):
+                img_info['thumbnail'] = thumbnail_path
+        else:
+            img_info['download_success'] = False
     
     def _save_data_url_image_as_png(self, data_url, save_dir, filename_prefix="img"):
-        """保存 data: URL 格式的内联图片并转换为PNG"""
+        """保存 data: URL 格式的内联图片（按图片设置转换格式）"""
         try:
             # 解析 data URL
             if not data_url.startswith('data:'):
@@ -524,43 +1945,23 @@ class WeixinSpiderWithImages:
                     logger.warning(f"URL解码失败: {data_url[:100]}...")
                     return None, None
             
-            # 生成PNG文件名
-            filename = f"{filename_prefix}.png"
-            filepath = os.path.join(save_dir, filename)
-            
-            # 处理不同格式
-            try:
-                from PIL import Image
-                import io
-                
-                # 从字节数据创建图片
-                img = Image.open(io.BytesIO(image_data))
-                
-                # 转换为PNG格式
-                if img.mode in ('RGBA', 'LA', 'P'):
-                    img = img.convert('RGBA')
-                else:
-                    img = img.convert('RGB')
-                
-                img.save(filepath, 'PNG')
-                logger.info(f"内联图片转换为PNG成功: {filename}")
-                
-            except Exception:
-                # 如果转换失败，直接保存原始数据
-                with open(filepath, 'wb') as f:
-                    f.write(image_data)
-                logger.info(f"内联图片保存为PNG文件名: {filename}")
-            
-            return filename, filepath
+            # 与下载的图片使用相同的格式、尺寸设置
+            return self._save_image_bytes(image_data, save_dir, filename_prefix)
             
         except Exception as e:
             logger.error(f"保存内联图片失败: {str(e)}")
             return None, None
     
-    def _download_all_images(self, images_info, save_dir):
-        """下载所有图片"""
+    def _download_all_images(self, images_info, save_dir, progress_callback=None):
+        """
+        下载所有图片
+        :param images_info: 图片信息列表，下载结果直接写回其中
+        :param save_dir: 文章目录
+        :param progress_callback: 进度回调 callback(已完成数量, 总数量)
+        :return: 因超过 images 时限而未下载的图片数量
+        """
         if not images_info:
-            return
+            return 0
         
         # 创建图片保存目录
         images_dir = os.path.join(save_dir, "images")
@@ -568,37 +1969,115 @@ class WeixinSpiderWithImages:
         
         logger.info(f"开始下载 {len(images_info)} 张图片...")
         
-        for img_info in images_info:
+        # 不在事件循环中时使用异步客户端并发下载；已有事件循环时无法嵌套 asyncio.run，按顺序下载
+        if self.async_http and httpx is not None and not _in_event_loop():
+            skipped = asyncio.run(self._download_all_images_async(images_info, images_dir, progress_callback))
+            success_count = sum(1 for img in images_info if img['download_success'])
+            logger.info(f"图片下载完成: {success_count}/{len(images_info)} 张成功")
+            return skipped
+        
+        timeout = self.stage_timeouts['images']
+        deadline = time.monotonic() + timeout if timeout else None
+        skipped = 0
+        for done, img_info in enumerate(images_info, 1):
+            if deadline is not None and time.monotonic() > deadline:
+                # 超过全部图片的时限，剩余图片保持未下载，可通过 complete_article_images 继续下载
+                skipped = len(images_info) - done + 1
+                logger.warning(f"图片下载超过 {timeout} 秒，跳过剩余 {skipped} 张")
+                break
             try:
                 filename, filepath = self._download_image(
                     img_info['url'], 
                     images_dir, 
                     f"img_{img_info['index']:03d}"
                 )
-                
-                if filename and filepath:
-                    img_info['filename'] = filename
-                    img_info['local_path'] = filepath
-                    img_info['download_success'] = True
-                else:
-                    img_info['download_success'] = False
-                
-                # 添加延时避免请求过快
-                time.sleep(0.5)
+                self._record_image_result(img_info, images_dir, filename, filepath)
                 
             except Exception as e:
                 logger.error(f"下载图片 {img_info['url']} 时出错: {str(e)}")
                 img_info['download_success'] = False
+            
+            if progress_callback:
+                progress_callback(done, len(images_info))
         
         success_count = sum(1 for img in images_info if img['download_success'])
         logger.info(f"图片下载完成: {success_count}/{len(images_info)} 张成功")
+        return skipped
+    
+    def http_client(self, **kwargs):
+        """
+        创建使用本爬虫请求头的异步HTTP客户端
+        :param kwargs: 传给 AsyncHttpClient 的连接池参数
+        :return: AsyncHttpClient，需在 async with 块中使用
+        """
+        # 压缩编码交给httpx协商，避免未安装brotli时收到无法解码的响应
+        headers = {k: v for k, v in self.session.headers.items() if k.lower() != 'accept-encoding'}
+        return AsyncHttpClient(headers=headers, **kwargs)
     
-    def save_article_to_file(self, article_data, custom_filename=None):
-        """保存文章到文件"""
+    async def _download_all_images_async(self, images_info, images_dir, progress_callback=None):
+        """
+        并发下载所有图片（同一连接上复用多个请求）
+        :param images_info: 图片信息列表，下载结果直接写回其中
+        :param images_dir: 图片保存目录
+        :param progress_callback: 进度回调 callback(已完成数量, 总数量)
+        :return: 因超过 images 时限而取消的图片数量
+        """
+        done = 0
+        image_timeout = self.stage_timeouts['image']
+        
+        async with self.http_client() as client:
+            async def download(img_info):
+                nonlocal done
+                prefix = f"img_{img_info['index']:03d}"
+                filename = filepath = None
+                try:
+                    if img_info['url'].startswith('data:'):
+                        filename, filepath = self._save_data_url_image_as_png(img_info['url'], images_dir, prefix)
+                    else:
+                        image_data = await asyncio.wait_for(client.fetch_bytes(img_info['url']), image_timeout)
+                        # 图片格式转换占用CPU，放到线程中执行，不阻塞其他下载
+                        filename, filepath = await asyncio.to_thread(
+                            self._save_image_bytes, image_data, images_dir, prefix
+                        )
+                except asyncio.TimeoutError:
+                    logger.error(f"下载图片 {img_info['url']} 超过 {image_timeout} 秒")
+                except Exception as e:
+                    logger.error(f"下载图片 {img_info['url']} 时出错: {str(e)}")
+                
+                self._record_image_result(img_info, images_dir, filename, filepath)
+                
+                done += 1
+                if progress_callback:
+                    progress_callback(done, len(images_info))
+            
+            # 超过全部图片的时限时取消未完成的下载，这些图片保持未下载
+            tasks = [asyncio.ensure_future(download(img_info)) for img_info in images_info]
+            _, pending = await asyncio.wait(tasks, timeout=self.stage_timeouts['images'])
+            if pending:
+                logger.warning(f"图片下载超过 {self.stage_timeouts['images']} 秒，取消剩余 {len(pending)} 张")
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+                if progress_callback:
+                    # 取消的图片不计入已完成数量，总数中保留以便调用方看到未完成的部分
+                    progress_callback(done, len(images_info))
+            return len(pending)
+    
+    def save_article_to_file(self, article_data, custom_filename=None, download_images=None):
+        """
+        保存文章到文件
+        :param article_data: 文章数据
+        :param custom_filename: 自定义文件名
+        :param download_images: 是否在保存前下载图片，默认跟随 self.download_images；
+                                传入False时图片可稍后通过 complete_article_images 补充下载
+        """
         if not article_data:
             logger.warning("没有文章数据可保存")
             return False
         
+        if download_images is None:
+            download_images = self.download_images
+        
         try:
             # 创建保存目录
             save_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "articles")
@@ -619,47 +2098,143 @@ class WeixinSpiderWithImages:
             article_dir = os.path.join(save_dir, safe_filename)
             os.makedirs(article_dir, exist_ok=True)
             
+            # 记录保存位置，便于服务器按文章ID读取
+            article_data['files'] = {
+                'dir': article_dir,
+                'json': os.path.join(article_dir, f"{safe_filename}.json"),
+                'txt': os.path.join(article_dir, f"{safe_filename}.txt"),
+                'md': os.path.join(article_dir, f"{safe_filename}.md")
+            }
+            
             # 下载图片
-            if self.download_images and article_data.get('images'):
-                self._download_all_images(article_data['images'], article_dir)
-            
-            # 保存JSON格式
-            json_filepath = os.path.join(article_dir, f"{safe_filename}.json")
-            with open(json_filepath, 'w', encoding='utf-8') as f:
-                json.dump(article_data, f, ensure_ascii=False, indent=2)
-            logger.info(f"JSON文件已保存: {json_filepath}")
-            
-            # 保存TXT格式
-            txt_filepath = os.path.join(article_dir, f"{safe_filename}.txt")
-            with open(txt_filepath, 'w', encoding='utf-8') as f:
-                f.write(f"标题: {article_data.get('title', '')}\n")
-                f.write(f"作者: {article_data.get('author', '')}\n")
-                f.write(f"发布时间: {article_data.get('publish_time', '')}\n")
-                f.write(f"抓取时间: {article_data.get('crawl_time', '')}\n")
-                f.write(f"链接: {article_data.get('url', '')}\n")
-                f.write("\n" + "="*80 + "\n\n")
-                f.write(article_data.get('content_text', ''))
-                
-                # 添加图片信息
-                if article_data.get('images'):
-                    f.write("\n\n" + "="*80 + "\n")
-                    f.write("图片信息:\n")
-                    for img in article_data['images']:
-                        f.write(f"\n图片 {img['index']}: {img['alt']}\n")
-                        f.write(f"原始URL: {img['url']}\n")
-                        if img['download_success']:
-                            f.write(f"本地文件: {img['filename']}\n")
-                        else:
-                            f.write("下载失败\n")
-            
-            logger.info(f"TXT文件已保存: {txt_filepath}")
+            if download_images and article_data.get('images'):
+                started = time.monotonic()
+                skipped = self._download_all_images(article_data['images'], article_dir)
+                self._record_images_timing(article_data, started)
+                # 超过时限未下载的图片可通过 complete_article_images 继续下载
+                article_data['images_pending'] = skipped > 0
+            else:
+                article_data['images_pending'] = bool(self.download_images and article_data.get('images'))
             
+            self._write_article_files(article_data)
             return True
             
         except Exception as e:
             logger.error(f"保存文件失败: {str(e)}")
             return False
     
+    def _record_images_timing(self, article_data, started):
+        """将图片下载耗时写入文章数据的 timings"""
+        timings = article_data.get('timings') or {'stages': {}, 'deadlines': dict(self.stage_timeouts)}
+        timings.setdefault('stages', {})['images'] = round(time.monotonic() - started, 3)
+        article_data['timings'] = timings
+    
+    def complete_article_images(self, article_data, progress_callback=None):
+        """
+        为已保存的文章补充下载尚未成功下载的图片，并更新文章文件
+        超过 images 时限时 images_pending 保持为True，可再次调用继续下载
+        :param article_data: 已由 save_article_to_file 保存的文章数据
+        :param progress_callback: 进度回调 callback(已完成数量, 本次需下载的数量)
+        :return: 是否成功
+        """
+        return (self.download_missing_images(article_data, progress_callback)
+                and self.rewrite_article_files(article_data))
+    
+    def download_missing_images(self, article_data, progress_callback=None):
+        """
+        下载已保存文章中尚未成功下载的图片，结果写回 article_data，不写文件
+        与 rewrite_article_files 分开调用时，调用方可以只在重写文件时加锁
+        :param article_data: 已由 save_article_to_file 保存的文章数据
+        :param progress_callback: 进度回调 callback(已完成数量, 本次需下载的数量)
+        :return: 是否成功
+        """
+        files = article_data.get('files') if article_data else None
+        if not files:
+            logger.warning("文章尚未保存，无法补充下载图片")
+            return False
+        
+        try:
+            started = time.monotonic()
+            missing = [img for img in article_data.get('images', []) if not img.get('download_success')]
+            skipped = self._download_all_images(missing, files['dir'], progress_callback)
+            self._record_images_timing(article_data, started)
+            article_data['images_pending'] = skipped > 0
+            return True
+        except Exception as e:
+            logger.error(f"补充下载图片失败: {str(e)}")
+            return False
+    
+    def rewrite_article_files(self, article_data):
+        """
+        按 article_data 重写已保存文章的JSON、TXT和Markdown文件
+        :param article_data: 已由 save_article_to_file 保存的文章数据
+        :return: 是否成功
+        """
+        try:
+            self._write_article_files(article_data)
+            return True
+        except Exception as e:
+            logger.error(f"更新文章文件失败: {str(e)}")
+            return False
+    
+    def _write_article_files(self, article_data):
+        """将文章写入JSON、TXT和Markdown文件（路径由 article_data['files'] 指定）"""
+        files = article_data['files']
+        
+        # 计算统计信息，随文章一起保存
+        article_data['statistics'] = compute_article_statistics(article_data)
+        
+        # 大字段压缩后单独保存，JSON中只记录文件名
+        stored = dict(article_data)
+        if self.compression:
+            base_name = os.path.splitext(os.path.basename(files['json']))[0]
+            for field in COMPRESSIBLE_FIELDS:
+                if not stored.get(field):
+                    continue
+                filename = f"{base_name}.{field}{COMPRESSION_EXTENSIONS[self.compression]}"
+                with atomic_write(os.path.join(files['dir'], filename), 'wb') as f:
+                    f.write(compress_bytes(stored.pop(field).encode('utf-8'), self.compression))
+                stored[f'{field}_file'] = filename
+        
+        # 保存JSON格式
+        with atomic_write(files['json']) as f:
+            if self.compact_json:
+                json.dump(stored, f, ensure_ascii=False, separators=(',', ':'))
+            else:
+                json.dump(stored, f, ensure_ascii=False, indent=2)
+        logger.info(f"JSON文件已保存: {files['json']}")
+        
+        # 保存TXT格式
+        with atomic_write(files['txt']) as f:
+            f.write(f"标题: {article_data.get('title', '')}\n")
+            f.write(f"作者: {article_data.get('author', '')}\n")
+            f.write(f"发布时间: {article_data.get('publish_time', '')}\n")
+            f.write(f"抓取时间: {article_data.get('crawl_time', '')}\n")
+            f.write(f"链接: {article_data.get('url', '')}\n")
+            f.write("\n" + "="*80 + "\n\n")
+            f.write(article_data.get('content_text', ''))
+            
+            # 添加图片信息
+            if article_data.get('images'):
+                f.write("\n\n" + "="*80 + "\n")
+                f.write("图片信息:\n")
+                for img in article_data['images']:
+                    f.write(f"\n图片 {img['index']}: {img['alt']}\n")
+                    f.write(f"原始URL: {img['url']}\n")
+                    if img['download_success']:
+                        f.write(f"本地文件: {img['filename']}\n")
+                    elif article_data.get('images_pending'):
+                        f.write("等待下载\n")
+                    else:
+                        f.write("下载失败\n")
+        
+        logger.info(f"TXT文件已保存: {files['txt']}")
+        
+        # 保存Markdown格式（早期保存的文章没有md路径）
+        if files.get('md'):
+            write_article_markdown(article_data, files['md'])
+            logger.info(f"Markdown文件已保存: {files['md']}")
+    
     def close(self):
         """关闭浏览器和会话"""
         if self.driver: